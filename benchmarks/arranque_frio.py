@@ -0,0 +1,85 @@
+"""Arranque en frío: desde que se lanza uvicorn hasta la primera respuesta de /.
+
+Lanza el servidor N veces (cada vez con un directorio de bytecode de Jinja
+vacío, como una instancia nueva de Vercel) y mide cuánto tarda en responder
+200 a GET /. Compara el modo servidor (catálogo y exámenes al arrancar) con
+el de Vercel (VERCEL=1: nada de BD al arrancar).
+
+Uso: python -m benchmarks.arranque_frio [--repeticiones 10] [--modos servidor,vercel]
+Con BENCH_DATABASE=postgresql://... usa Postgres; si no, un SQLite temporal.
+Para ver en qué se va el tiempo: python -m benchmarks.perfil_arranque
+"""
+import os
+import sys
+import time
+import socket
+import tempfile
+import argparse
+import statistics
+import subprocess
+import http.client
+from benchmarks.datos import crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODOS = {
+    "servidor": {},
+    "vercel": {"VERCEL": "1"},
+}
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _responde(puerto: int) -> bool:
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=5)
+    try:
+        conexion.request("GET", "/")
+        return conexion.getresponse().status == 200
+    except OSError:
+        return False
+    finally:
+        conexion.close()
+
+def medir(url_bd: str, variables: dict, limite: float = 60) -> float:
+    """Segundos desde el spawn hasta el primer 200 de /"""
+    puerto = _puerto_libre()
+    with tempfile.TemporaryDirectory() as bytecode:
+        entorno = {**os.environ, "URL_DATABASE": url_bd, "SECRET_KEY": os.getenv("SECRET_KEY", "bench"),
+                   "PLANTILLAS_BYTECODE_DIR": bytecode, **variables}
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(puerto),
+                                    "--log-level", "warning"], cwd=RAIZ, env=entorno)
+        try:
+            while time.perf_counter() - inicio < limite:
+                if _responde(puerto):
+                    return time.perf_counter() - inicio
+                if proceso.poll() is not None:
+                    raise SystemExit(f"El servidor terminó con código {proceso.returncode}")
+                time.sleep(0.005)
+            raise SystemExit("El servidor no respondió a tiempo")
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--modos", default=",".join(MODOS))
+    parser.add_argument("--preguntas", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = crear_engine("arranque")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, args.preguntas)
+    url_bd = engine.url.render_as_string(hide_password=False)
+
+    for modo in args.modos.split(","):
+        medir(url_bd, MODOS[modo])  # calienta la caché de disco del SO
+        tiempos = [medir(url_bd, MODOS[modo]) * 1000 for _ in range(args.repeticiones)]
+        print(f"{modo:>9}: mediana {statistics.median(tiempos):.0f} ms, "
+              f"min {min(tiempos):.0f} ms, max {max(tiempos):.0f} ms ({args.repeticiones} arranques)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Costo de autenticar una petición con y sin la caché de JWT.
+
+Uso: python -m benchmarks.auth [--iteraciones 20000]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "clave-de-benchmark")
+
+from seguridad import autenticacion
+
+def medir(funcion, token: str, iteraciones: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion(token)
+    return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iteraciones", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = autenticacion.crear_token({"user_id": 1, "grado": "10"})
+    sin_cache = medir(autenticacion._decodificar_token, token, args.iteraciones)
+    autenticacion.verificar_token(token)
+    con_cache = medir(autenticacion.verificar_token, token, args.iteraciones)
+    print(f"sin caché: {sin_cache:.1f} µs/petición | con caché: {con_cache:.1f} µs/petición "
+          f"({sin_cache / con_cache:.0f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Costo de calificar en el servidor con la clave de respuestas en memoria.
+
+Uso: python -m benchmarks.calificacion [--tamanos 6,100] [--repeticiones 20000]
+No necesita BD: la clave se arma en memoria como la dejaría servicios.examenes.
+"""
+import argparse
+import random
+import time
+from servicios.ingesta import calificar
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", default="6,100")
+    parser.add_argument("--repeticiones", type=int, default=20_000)
+    args = parser.parse_args()
+
+    clave = {i: (1, 1, random.choice("ABCD")) for i in range(1, 100_001)}
+    for n in (int(t) for t in args.tamanos.split(",")):
+        ids = random.sample(list(clave), n)
+        lotes = [[{"id_pregunta": i, "respuesta": random.choice("ABCD")} for i in ids]
+                 for _ in range(args.repeticiones)]
+        inicio = time.perf_counter()
+        for respuestas in lotes:
+            calificar(respuestas, clave)
+        us = (time.perf_counter() - inicio) / args.repeticiones * 1e6
+        print(f"{n:>5} respuestas: {us:.2f} µs por intento")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
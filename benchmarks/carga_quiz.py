@@ -0,0 +1,149 @@
+"""Prueba de carga: N cargas concurrentes de /api/preguntas/{materia}, sync vs async.
+
+Siembra una BD sintética y, para cada versión, saca ese commit en un git
+worktree temporal, lo levanta con uvicorn sobre la misma BD, registra un
+usuario y mide la latencia. Por defecto compara el commit anterior al paso a
+sesiones async (sync), ese commit (async) y HEAD (actual). El commit async se
+busca en el log por su etiqueta de pedido; --sync y --async lo sustituyen:
+
+    python -m benchmarks.carga_quiz --concurrencia 200 --rondas 5
+    python -m benchmarks.carga_quiz --sync v1.2 --async v1.3
+    python -m benchmarks.carga_quiz --version actual=HEAD --version otra=mi-rama
+
+Con BENCH_DATABASE=postgresql://... usa Postgres; si no, un SQLite temporal.
+Con --url se mide un servidor ya levantado (hacen falta --email y --password).
+"""
+import shutil
+import argparse
+import asyncio
+import tempfile
+import statistics
+import subprocess
+import time
+import httpx
+from benchmarks.flujo_quiz import RAIZ, levantar_servidor
+
+# Etiqueta del pedido que pasó las rutas a AsyncSession: su primer commit (los
+# siguientes son correcciones) es la versión async y su padre la sync. Se busca
+# por el mensaje para que no dependa de un SHA que cambia al hacer rebase
+ETIQUETA_ASYNC = "[user-003]"
+PASSWORD = "bench-password"
+
+async def iniciar_sesion(url: str, email: str, password: str, registrar: bool = False) -> httpx.Cookies:
+    async with httpx.AsyncClient(base_url=url) as client:
+        if registrar:
+            await client.post("/registrar", data={"email": email, "password": password, "grado": "10"})
+        r = await client.post("/login", data={"email": email, "password": password})
+        if "access_token" not in r.cookies:
+            raise SystemExit("No se pudo iniciar sesión con esas credenciales")
+        return r.cookies
+
+async def cargar_quiz(client: httpx.AsyncClient, materia: str) -> float:
+    inicio = time.perf_counter()
+    r = await client.get(f"/api/preguntas/{materia}")
+    r.raise_for_status()
+    return (time.perf_counter() - inicio) * 1000
+
+def percentil(tiempos: list[float], p: float) -> float:
+    return round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * p))], 2)
+
+async def medir(url: str, cookies: httpx.Cookies, args) -> dict:
+    limites = httpx.Limits(max_connections=args.concurrencia)
+    tiempos = []
+    async with httpx.AsyncClient(base_url=url, cookies=cookies, limits=limites, timeout=60) as client:
+        await cargar_quiz(client, args.materia)  # calentamiento (catálogo, pools)
+        inicio = time.perf_counter()
+        for _ in range(args.rondas):
+            tiempos += await asyncio.gather(*(cargar_quiz(client, args.materia)
+                                              for _ in range(args.concurrencia)))
+        total = time.perf_counter() - inicio
+    tiempos.sort()
+    return {"n": len(tiempos), "req_s": round(len(tiempos) / total, 1), "p50_ms": percentil(tiempos, 0.50),
+            "p95_ms": percentil(tiempos, 0.95), "p99_ms": percentil(tiempos, 0.99),
+            "media_ms": round(statistics.mean(tiempos), 2)}
+
+def commit_async() -> str:
+    """Primer commit con ETIQUETA_ASYNC en el asunto"""
+    log = subprocess.run(["git", "log", "--reverse", "--format=%H %s", "HEAD"], cwd=RAIZ, check=True,
+                         capture_output=True, text=True).stdout
+    for linea in log.splitlines():
+        sha, _, asunto = linea.partition(" ")
+        if asunto.startswith(ETIQUETA_ASYNC):
+            return sha
+    raise SystemExit(f"No hay ningún commit {ETIQUETA_ASYNC} en la historia; indique --sync y --async")
+
+def versiones_por_defecto(args) -> list[tuple[str, str]]:
+    ref_async = args.ref_async or commit_async()
+    return [("sync", args.sync or f"{ref_async}^"), ("async", ref_async), ("actual", "HEAD")]
+
+def sacar_version(ref: str) -> str:
+    """Worktree temporal con el código de ref"""
+    destino = tempfile.mkdtemp(prefix="carga-quiz-")
+    subprocess.run(["git", "worktree", "add", "--detach", destino, ref], cwd=RAIZ, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return destino
+
+def quitar_version(destino: str):
+    subprocess.run(["git", "worktree", "remove", "--force", destino], cwd=RAIZ,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    shutil.rmtree(destino, ignore_errors=True)
+
+async def medir_version(nombre: str, ref: str, url_bd: str, args) -> dict:
+    raiz = sacar_version(ref)
+    proceso = None
+    try:
+        proceso, url = levantar_servidor(url_bd, raiz=raiz)
+        cookies = await iniciar_sesion(url, f"carga-{nombre}@bench.local", PASSWORD, registrar=True)
+        return await medir(url, cookies, args)
+    finally:
+        if proceso:
+            proceso.terminate()
+            proceso.wait()
+        quitar_version(raiz)
+
+def imprimir(resultados: dict[str, dict], concurrencia: int):
+    print(f"{concurrencia} concurrentes")
+    print(f"{'versión':<10}{'n':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'media':>9}")
+    for nombre, r in resultados.items():
+        print(f"{nombre:<10}{r['n']:>7}{r['req_s']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+              f"{r['p99_ms']:>9}{r['media_ms']:>9}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="servidor ya levantado; no se siembra ni se arranca uno")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--version", action="append", metavar="NOMBRE=REF",
+                        help="versión a medir (se puede repetir); por defecto sync, async y actual")
+    parser.add_argument("--sync", metavar="REF", help="versión sync (por defecto, el padre de la async)")
+    parser.add_argument("--async", dest="ref_async", metavar="REF",
+                        help=f"versión async (por defecto, el primer commit {ETIQUETA_ASYNC})")
+    parser.add_argument("--preguntas", type=int, default=10_000)
+    parser.add_argument("--materia", default="matematicas")
+    parser.add_argument("--concurrencia", type=int, default=200)
+    parser.add_argument("--rondas", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.url:
+        if not (args.email and args.password):
+            parser.error("--url necesita --email y --password")
+        cookies = await iniciar_sesion(args.url, args.email, args.password)
+        imprimir({"servidor": await medir(args.url, cookies, args)}, args.concurrencia)
+        return
+
+    from benchmarks.datos import crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas
+    versiones = [tuple(v.split("=", 1)) for v in args.version] if args.version else versiones_por_defecto(args)
+    engine = crear_engine("carga")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, args.preguntas)
+    url_bd = engine.url.render_as_string(hide_password=False)
+
+    resultados = {}
+    for nombre, ref in versiones:
+        print(f"Midiendo {nombre} ({ref})...")
+        resultados[nombre] = await medir_version(nombre, ref, url_bd, args)
+    imprimir(resultados, args.concurrencia)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""Bytes enviados y CPU de la compresión por respuesta.
+
+Siembra una BD (con enunciados largos, como los reales), inicia sesión y
+toma el cuerpo sin comprimir de las respuestas principales. Para cada una
+mide el tamaño y el tiempo de comprimir con cada codificación disponible, al
+nivel de cada respuesta y al de las que se guardan en caché
+(compresion.NIVELES). Después mide la petición completa con TestClient según
+el Accept-Encoding.
+
+Uso: python -m benchmarks.compresion [--repeticiones 200]
+Con BENCH_DATABASE=postgresql://... usa Postgres; si no, un SQLite temporal.
+"""
+import os
+import time
+import argparse
+from sqlalchemy import text
+from benchmarks.datos import crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas
+
+PASSWORD = "bench-password"
+RUTAS = ("/", "/preguntas/matematicas", "/Resul", "/api/preguntas/matematicas")
+ENUNCIADO = ("Lea el siguiente texto y responda. En una encuesta realizada a los estudiantes de un "
+             "colegio se preguntó por el tiempo que dedican a leer cada semana; los resultados se "
+             "resumen en la tabla y la gráfica adjuntas, donde cada barra representa un curso. ") * 4
+
+def _medir(funcion, repeticiones: int) -> float:
+    """Microsegundos por llamada"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "bench")
+    engine = crear_engine("compresion")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, 3000)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE preguntas SET enunciado = enunciado || ' ' || :t, "
+                          "opcion_a = :o, opcion_b = :o, opcion_c = :o, opcion_d = :o"),
+                     {"t": ENUNCIADO, "o": "Una opción de respuesta de longitud habitual en el examen"})
+
+    from fastapi.testclient import TestClient
+    from main import app
+    import compresion
+    with TestClient(app) as cliente:
+        cliente.post("/registrar", data={"email": "bench@bench.local", "password": PASSWORD, "grado": "10"})
+        cliente.post("/login", data={"email": "bench@bench.local", "password": PASSWORD})
+        examen = cliente.get("/api/preguntas/matematicas").json()
+        cliente.post("/api/guardar-respuestas", json={
+            "materia": "matematicas", "examen": examen["firma"],
+            "respuestas": [{"pregunta_id": p["id"], "respuesta": "A"} for p in examen["preguntas"]]})
+
+        print("Compresión de cada cuerpo (bytes, µs por respuesta)")
+        for ruta in RUTAS:
+            cuerpo = cliente.get(ruta, headers={"Accept-Encoding": "identity"}).content
+            print(f"\n{ruta}: {len(cuerpo)} bytes sin comprimir")
+            for codificacion, funcion in compresion.codificadores().items():
+                for perfil, niveles in compresion.NIVELES.items():
+                    nivel = niveles[codificacion]
+                    tamano = len(funcion(cuerpo, nivel))
+                    us = _medir(lambda: funcion(cuerpo, nivel), args.repeticiones)
+                    print(f"  {codificacion:>5} {perfil:>8} (nivel {nivel:>2}): {tamano:>7} bytes "
+                          f"({tamano / len(cuerpo):6.1%})  {us:9.1f} µs")
+
+        print("\nPetición completa (media por petición, bytes enviados)")
+        for ruta in RUTAS:
+            for aceptar in ("identity", "gzip", "br"):
+                bytes_ = []
+                def pedir():
+                    r = cliente.get(ruta, headers={"Accept-Encoding": aceptar})
+                    bytes_.append(int(r.headers.get("content-length", len(r.content))))
+                us = _medir(pedir, args.repeticiones)
+                print(f"  {ruta:<28} {aceptar:>8}: {us / 1000:7.2f} ms  {sum(bytes_) / len(bytes_):8.0f} bytes")
+        print(f"\nCaché de comprimidos: {len(compresion.comprimidos._datos)} cuerpos, "
+              f"{compresion.comprimidos._total} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import random
+import tempfile
+import itertools
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+import configuracion
+from migraciones import migrar
+from servicios.catalogo import MATERIAS_BD
+from servicios.resumen_resultados import backfill
+from servicios import estadisticas
+
+def crear_engine(nombre: str = "bench"):
+    """Engine de BENCH_DATABASE o, si no está, un SQLite temporal.
+
+    También apunta URL_DATABASE a esa BD (en vez de la de .env), porque db.py
+    crea sus engines con ella.
+    """
+    url = os.getenv("BENCH_DATABASE") or f"sqlite:///{tempfile.gettempdir()}/{nombre}.sqlite3"
+    os.environ["URL_DATABASE"] = url
+    configuracion.recargar()
+    return create_engine(url)
+
+def url_async(url):
+    """URL con driver asíncrono (ver db.url_async)"""
+    from db import url_async
+    return url_async(url)
+
+def crear_esquema(engine, limpiar: bool = True):
+    """Crea las tablas que usa la app con las migraciones de sql/ (SQLite o Postgres)"""
+    if limpiar:
+        with engine.begin() as conn:
+            for tabla in ("respuestas", "estadisticas_area", "mejores_resultados", "ultimos_resultados",
+                          "resultados", "preguntas", "estudiantes", "areas", "grado", "usuarios",
+                          "esquema_migraciones"):
+                conn.execute(text(f"DROP TABLE IF EXISTS {tabla}"))
+    migrar(engine, verbose=False)
+
+def sembrar_catalogo(engine):
+    """Inserta una fila de areas por materia y los grados 9 a 11"""
+    with engine.begin() as conn:
+        for nombres in MATERIAS_BD.values():
+            conn.execute(text("INSERT INTO areas (nombre_materia) VALUES (:n)"), {"n": nombres[0]})
+        for numero in (9, 10, 11):
+            conn.execute(text("INSERT INTO grado (numero_grado) VALUES (:n)"), {"n": numero})
+
+def sembrar_preguntas(engine, total: int, lote: int = 10_000):
+    """Reparte total preguntas sintéticas entre todas las áreas y grados"""
+    with engine.begin() as conn:
+        areas = conn.execute(text("SELECT id FROM areas")).scalars().all()
+        grados = conn.execute(text("SELECT id FROM grado")).scalars().all()
+        for inicio in range(0, total, lote):
+            conn.execute(text("""
+                INSERT INTO preguntas (enunciado, opcion_a, opcion_b, opcion_c, opcion_d,
+                                       imagen, respuesta_correcta, id_areas, id_grado)
+                VALUES (:e, 'A', 'B', 'C', 'D', NULL, :r, :a, :g)
+            """), [{"e": f"Pregunta {i}", "r": random.choice("ABCD"),
+                    "a": areas[i % len(areas)], "g": grados[(i // len(areas)) % len(grados)]}
+                   for i in range(inicio, min(inicio + lote, total))])
+
+def sembrar_usuarios(engine, total: int, password_hash: str, lote: int = 10_000):
+    """Crea usuarioN@bench.local (N = 0..total-1), todos con el mismo hash de contraseña"""
+    ahora = datetime.now()
+    with engine.begin() as conn:
+        for inicio in range(0, total, lote):
+            conn.execute(text("""
+                INSERT INTO usuarios (email, password, grado, fecha_registro)
+                VALUES (:email, :password, :grado, :fecha)
+            """), [{"email": f"usuario{i}@bench.local", "password": password_hash,
+                    "grado": str(9 + i % 3), "fecha": ahora}
+                   for i in range(inicio, min(inicio + lote, total))])
+
+def sembrar_resultados(engine, por_estudiante: int, lote: int = 10_000):
+    """Crea un estudiante por usuario con por_estudiante resultados históricos"""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO estudiantes (id_usuario, id_grado)
+            SELECT u.id, g.id FROM usuarios u JOIN grado g ON g.numero_grado = CAST(u.grado AS INTEGER)
+        """))
+        estudiantes = conn.execute(text("SELECT id FROM estudiantes")).scalars().all()
+        areas = conn.execute(text("SELECT id FROM areas")).scalars().all()
+        ahora = datetime.now()
+        filas = ({"est": est, "area": areas[i % len(areas)], "fecha": ahora - timedelta(hours=i),
+                  "puntaje": random.randint(0, 100)}
+                 for est in estudiantes for i in range(por_estudiante))
+        while bloque := list(itertools.islice(filas, lote)):
+            conn.execute(text("""
+                INSERT INTO resultados (id_estudiantes, id_areas, fecha, puntaje_final)
+                VALUES (:est, :area, :fecha, :puntaje)
+            """), bloque)
+        conn.execute(text("""
+            UPDATE resultados SET id_grado = (SELECT e.id_grado FROM estudiantes e
+                                              WHERE e.id = resultados.id_estudiantes)
+        """))
+    backfill(engine)
+    estadisticas.backfill(engine)
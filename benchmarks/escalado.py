@@ -0,0 +1,60 @@
+"""Throughput del flujo del quiz con 1..N workers de uvicorn.
+
+Siembra una vez la BD sintética y, para cada cantidad de workers, levanta
+`uvicorn --workers N` con la caché compartida (CACHE_BACKEND, sqlite por
+defecto) y recorre el mismo flujo que benchmarks.flujo_quiz. Reporta req/s
+total y por paso, y la aceleración respecto a la primera corrida.
+
+Uso: python -m benchmarks.escalado --workers 1,2,4 --concurrencia 100
+Con BENCH_DATABASE=postgresql://... usa Postgres (recomendado: con SQLite
+las escrituras de guardar-respuestas se serializan y limitan el escalado).
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import httpx
+from benchmarks.flujo_quiz import PASOS, sembrar, levantar_servidor, usuario_virtual, resumir
+
+async def correr(url: str, args) -> tuple[dict, float]:
+    tiempos = {nombre: [] for nombre in PASOS}
+    errores = {nombre: 0 for nombre in PASOS}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(usuario_virtual(url, i, args, tiempos, errores) for i in range(args.concurrencia)))
+    duracion = time.perf_counter() - inicio
+    pasos = {nombre: resumir(tiempos[nombre], errores[nombre], duracion) for nombre in PASOS}
+    return pasos, sum(len(t) for t in tiempos.values()) / duracion
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})))
+    parser.add_argument("--backend", default="sqlite", help="valor de CACHE_BACKEND para los workers")
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--preguntas", type=int, default=10_000)
+    parser.add_argument("--resultados", type=int, default=5)
+    parser.add_argument("--concurrencia", type=int, default=100)
+    parser.add_argument("--iteraciones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=1234)
+    args = parser.parse_args()
+    random.seed(args.semilla)
+
+    engine = sembrar(args)
+    url_bd = engine.url.render_as_string(hide_password=False)
+    base = None
+    print(f"{'workers':>7}{'req/s':>9}{'x':>7}" + "".join(f"{p[:18]:>20}" for p in PASOS))
+    for workers in (int(w) for w in args.workers.split(",")):
+        proceso, url = levantar_servidor(url_bd, workers, CACHE_BACKEND=args.backend)
+        try:
+            # Que todos los workers terminen de arrancar antes de medir
+            async with httpx.AsyncClient(base_url=url) as client:
+                await asyncio.gather(*(client.get("/") for _ in range(workers * 4)))
+            pasos, total = await correr(url, args)
+        finally:
+            proceso.terminate()
+            proceso.wait()
+        base = base or total
+        print(f"{workers:>7}{total:>9.1f}{total / base:>7.2f}" + "".join(f"{pasos[p]['req_s']:>20}" for p in PASOS))
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
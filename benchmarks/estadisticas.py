@@ -0,0 +1,88 @@
+"""Compara calcular estadísticas y ranking sobre resultados con las tablas resumen.
+
+Uso: python -m benchmarks.estadisticas [--usuarios 10000] [--por-estudiante 20] [--repeticiones 100]
+Con BENCH_DATABASE=postgresql://... se mide contra Postgres; si no, contra SQLite.
+Mide tres caminos para un (grado, área): agregar todo el historial en cada
+petición, leer las tablas resumen (tablero recién cargado) y el tablero en memoria.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from benchmarks.datos import (crear_engine, crear_esquema, sembrar_catalogo, sembrar_usuarios,
+                              sembrar_resultados, url_async)
+from servicios import estadisticas
+
+async def consulta_original(session: AsyncSession, grado_id: int, area_id: int):
+    params = {"g": grado_id, "a": area_id}
+    await session.execute(text("""
+        SELECT COUNT(*), AVG(r.puntaje_final)
+        FROM resultados r JOIN estudiantes e ON e.id = r.id_estudiantes
+        WHERE e.id_grado = :g AND r.id_areas = :a
+    """), params)
+    await session.execute(text("""
+        SELECT r.puntaje_final / 10, COUNT(*)
+        FROM resultados r JOIN estudiantes e ON e.id = r.id_estudiantes
+        WHERE e.id_grado = :g AND r.id_areas = :a
+        GROUP BY r.puntaje_final / 10
+    """), params)
+    return (await session.execute(text("""
+        SELECT u.email, MAX(r.puntaje_final) AS mejor
+        FROM resultados r
+        JOIN estudiantes e ON e.id = r.id_estudiantes
+        JOIN usuarios u ON u.id = e.id_usuario
+        WHERE e.id_grado = :g AND r.id_areas = :a
+        GROUP BY u.id, u.email
+        ORDER BY mejor DESC LIMIT 20
+    """), params)).fetchall()
+
+async def desde_resumen(session: AsyncSession, grado_id: int, area_id: int):
+    estadisticas.invalidar_estadisticas()
+    tablero = await estadisticas.obtener_tablero(session, grado_id, area_id)
+    return estadisticas.resumen(tablero), estadisticas.ranking(tablero)
+
+async def en_memoria(session: AsyncSession, grado_id: int, area_id: int):
+    tablero = await estadisticas.obtener_tablero(session, grado_id, area_id)
+    return estadisticas.resumen(tablero), estadisticas.ranking(tablero)
+
+async def medir(funcion, repeticiones: int) -> dict:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        await funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {"p50_ms": round(statistics.median(tiempos), 3),
+            "p95_ms": round(tiempos[int(len(tiempos) * 0.95) - 1], 3)}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--usuarios", type=int, default=10_000)
+    parser.add_argument("--por-estudiante", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=100)
+    args = parser.parse_args()
+
+    engine = crear_engine("estadisticas")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_usuarios(engine, args.usuarios, "x")
+    inicio = time.perf_counter()
+    sembrar_resultados(engine, args.por_estudiante)
+    print(f"{args.usuarios * args.por_estudiante} resultados sembrados y resumidos "
+          f"en {time.perf_counter() - inicio:.1f} s")
+    async_engine = create_async_engine(url_async(engine.url))
+
+    async with AsyncSession(async_engine) as session:
+        grado_id, area_id = (await session.execute(
+            text("SELECT id_grado, id_areas FROM estadisticas_area LIMIT 1"))).one()
+        for nombre, funcion in (("historial completo", consulta_original),
+                                ("tablas resumen", desde_resumen),
+                                ("tablero en memoria", en_memoria)):
+            resultado = await medir(lambda: funcion(session, grado_id, area_id), args.repeticiones)
+            print(f"{nombre:>18}: {resultado}")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
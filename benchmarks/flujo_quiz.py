@@ -0,0 +1,175 @@
+"""Benchmark reproducible del flujo completo del quiz.
+
+Siembra una BD sintética, levanta la app con uvicorn y recorre con N usuarios
+concurrentes: /login -> /preguntas/{materia} -> /api/preguntas/{materia}
+-> /api/guardar-respuestas -> /Resul. Reporta req/s y p50/p95/p99 por paso y
+guarda el resultado en JSON para comparar entre commits.
+
+Uso:
+    python -m benchmarks.flujo_quiz --usuarios 200 --preguntas 10000 --concurrencia 50
+    python -m benchmarks.flujo_quiz --comparar benchmarks/resultados/anterior.json
+
+Con BENCH_DATABASE=postgresql://... usa Postgres; si no, un SQLite temporal.
+Con --url se usa un servidor ya levantado (y ya sembrado) en vez de uno propio.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+import httpx
+from benchmarks.datos import (crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas,
+                              sembrar_usuarios, sembrar_resultados)
+from servicios.catalogo import MATERIAS_BD
+
+PASSWORD = "bench-password"
+PASOS = ("login", "pagina_preguntas", "api_preguntas", "guardar_respuestas", "resultados")
+RESULTADOS_DIR = os.path.join(os.path.dirname(__file__), "resultados")
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def sembrar(args):
+    from seguridad.contrasenas import hash_password
+    engine = crear_engine("flujo")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, args.preguntas)
+    sembrar_usuarios(engine, args.usuarios, hash_password(PASSWORD))
+    sembrar_resultados(engine, args.resultados)
+    return engine
+
+def levantar_servidor(url_bd: str, workers: int = 1, raiz: str = RAIZ, **variables) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+    entorno = {**os.environ, "URL_DATABASE": url_bd, "SECRET_KEY": os.getenv("SECRET_KEY", "bench"),
+               "WEB_CONCURRENCY": str(workers), **variables}
+    proceso = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(puerto),
+                                "--workers", str(workers), "--log-level", "warning"], cwd=raiz, env=entorno)
+    url = f"http://127.0.0.1:{puerto}"
+    for _ in range(100):
+        try:
+            httpx.get(url + "/", timeout=1)
+            return proceso, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proceso.kill()
+    raise SystemExit("El servidor no arrancó")
+
+async def paso(tiempos: dict, errores: dict, nombre: str, peticion) -> httpx.Response | None:
+    inicio = time.perf_counter()
+    try:
+        r = await peticion
+        if r.status_code >= 400:
+            raise httpx.HTTPStatusError(str(r.status_code), request=r.request, response=r)
+        tiempos[nombre].append((time.perf_counter() - inicio) * 1000)
+        return r
+    except httpx.HTTPError:
+        errores[nombre] += 1
+        return None
+
+async def usuario_virtual(url: str, indice: int, args, tiempos: dict, errores: dict):
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        datos = {"email": f"usuario{indice % args.usuarios}@bench.local", "password": PASSWORD}
+        r = await paso(tiempos, errores, "login", client.post("/login", data=datos))
+        if r is None or "access_token" not in client.cookies:
+            return
+        for _ in range(args.iteraciones):
+            materia = random.choice(list(MATERIAS_BD))
+            await paso(tiempos, errores, "pagina_preguntas", client.get(f"/preguntas/{materia}"))
+            r = await paso(tiempos, errores, "api_preguntas", client.get(f"/api/preguntas/{materia}"))
+            examen = r.json() if r is not None else {"preguntas": []}
+            respuestas = [{"pregunta_id": p["id"], "respuesta": random.choice("ABCD")} for p in examen["preguntas"]]
+            if respuestas:
+                await paso(tiempos, errores, "guardar_respuestas", client.post(
+                    "/api/guardar-respuestas",
+                    json={"materia": materia, "examen": examen["firma"], "respuestas": respuestas}))
+            await paso(tiempos, errores, "resultados", client.get("/Resul"))
+
+def resumir(tiempos: list[float], errores: int, duracion: float) -> dict:
+    ordenados = sorted(tiempos)
+    def p(q):
+        return round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * q))], 2) if ordenados else None
+    return {"n": len(ordenados), "errores": errores, "req_s": round(len(ordenados) / duracion, 1),
+            "p50_ms": p(0.50), "p95_ms": p(0.95), "p99_ms": p(0.99),
+            "media_ms": round(statistics.mean(ordenados), 2) if ordenados else None}
+
+def commit_actual() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(actual: dict, anterior: dict):
+    print(f"\nvs {anterior.get('commit')} ({anterior.get('fecha')})")
+    for nombre in PASOS:
+        a, b = actual["pasos"].get(nombre), anterior["pasos"].get(nombre)
+        if a and b and a["p95_ms"] and b["p95_ms"]:
+            cambio = (a["p95_ms"] - b["p95_ms"]) / b["p95_ms"] * 100
+            print(f"  {nombre:<20} p95 {b['p95_ms']:>9} -> {a['p95_ms']:>9} ms ({cambio:+.1f}%)")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--preguntas", type=int, default=10_000)
+    parser.add_argument("--resultados", type=int, default=20, help="resultados previos por estudiante")
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--iteraciones", type=int, default=3, help="quizzes por usuario virtual")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--url", help="servidor ya levantado; no se siembra ni se arranca uno")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+    random.seed(args.semilla)
+
+    proceso, bd = None, "externa"
+    if args.url:
+        url = args.url
+    else:
+        engine = sembrar(args)
+        bd = engine.dialect.name
+        proceso, url = levantar_servidor(engine.url.render_as_string(hide_password=False))
+
+    tiempos = {nombre: [] for nombre in PASOS}
+    errores = {nombre: 0 for nombre in PASOS}
+    try:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario_virtual(url, i, args, tiempos, errores)
+                               for i in range(args.concurrencia)))
+        duracion = time.perf_counter() - inicio
+    finally:
+        if proceso:
+            proceso.terminate()
+            proceso.wait()
+
+    resultado = {
+        "commit": commit_actual(), "fecha": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("salida", "comparar")},
+        "bd": bd,
+        "duracion_s": round(duracion, 2),
+        "pasos": {nombre: resumir(tiempos[nombre], errores[nombre], duracion) for nombre in PASOS},
+    }
+
+    print(f"{'paso':<20}{'n':>7}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for nombre, r in resultado["pasos"].items():
+        print(f"{nombre:<20}{r['n']:>7}{r['errores']:>6}{r['req_s']:>9}{r['p50_ms']!s:>9}"
+              f"{r['p95_ms']!s:>9}{r['p99_ms']!s:>9}")
+
+    salida = args.salida or os.path.join(
+        RESULTADOS_DIR, f"flujo-{resultado['commit'] or 'sin-git'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(salida), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=1)
+    print(f"\nGuardado en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultado, json.load(f))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""Throughput de verificación de contraseñas con el costo configurado.
+
+Uso: python -m benchmarks.hash_login [--segundos 5]
+Respeta SCRYPT_N / SCRYPT_R / SCRYPT_P y HASH_WORKERS, igual que la app.
+"""
+import argparse
+import asyncio
+import os
+import time
+from seguridad import contrasenas
+
+async def logins_por_segundo(hashed: str, segundos: float, concurrencia: int) -> float:
+    hechos = 0
+    fin = time.perf_counter() + segundos
+
+    async def cliente():
+        nonlocal hechos
+        while time.perf_counter() < fin:
+            await contrasenas.verify_password_async("contraseña-de-prueba", hashed)
+            hechos += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    return hechos / (time.perf_counter() - inicio)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segundos", type=float, default=5)
+    args = parser.parse_args()
+
+    hashed = contrasenas.hash_password("contraseña-de-prueba")
+    nucleos = os.cpu_count() or 1
+    print(f"scrypt n={contrasenas.SCRYPT_N} r={contrasenas.SCRYPT_R} p={contrasenas.SCRYPT_P}, "
+          f"{contrasenas.HASH_WORKERS} hilos, {nucleos} núcleos")
+
+    inicio = time.perf_counter()
+    contrasenas.verify_password("contraseña-de-prueba", hashed)
+    print(f"un hash: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    uno = await logins_por_segundo(hashed, args.segundos, 1)
+    todos = await logins_por_segundo(hashed, args.segundos, contrasenas.HASH_WORKERS * 2)
+    print(f"1 cliente: {uno:.1f} logins/s | {contrasenas.HASH_WORKERS * 2} clientes: {todos:.1f} logins/s "
+          f"({todos / min(nucleos, contrasenas.HASH_WORKERS):.1f} por núcleo)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+"""Tamaño y costo de generar las variantes de una imagen de pregunta.
+
+Para cada ancho y formato de servicios.imagenes mide los bytes frente al
+original y el tiempo de generarla (solo pasa la primera vez: después se sirve
+desde la caché en disco).
+
+Uso: python -m benchmarks.imagenes [--imagen static/Galeria/1.png] [--repeticiones 3]
+"""
+import os
+import time
+import argparse
+from servicios.imagenes import ANCHOS, formatos, redimensionar
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--imagen", default=os.path.join("static", "Galeria", "1.png"))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.imagen, "rb") as f:
+        original = f.read()
+    print(f"original: {len(original):,} bytes")
+    print(f"{'ancho':>6}" + "".join(f"{f:>22}" for f in formatos()))
+    for ancho in ANCHOS:
+        celdas = []
+        for formato in formatos():
+            inicio = time.perf_counter()
+            for _ in range(args.repeticiones):
+                datos = redimensionar(original, ancho, formato)
+            ms = (time.perf_counter() - inicio) / args.repeticiones * 1000
+            celdas.append(f"{len(datos):>8,} B {len(datos) / len(original):>4.0%} {ms:>4.0f}ms")
+        print(f"{ancho:>6}" + "".join(f"{c:>22}" for c in celdas))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Throughput de la importación masiva del banco de preguntas.
+
+Genera un CSV sintético (con un porcentaje de filas inválidas y materias
+escritas con distintos alias) y lo importa con servicios.importacion.
+
+Uso: python -m benchmarks.importacion [--filas 100000] [--invalidas 0.01] [--lote 5000]
+Con BENCH_DATABASE=postgresql://... se mide COPY; si no, INSERT multi-fila en SQLite.
+"""
+import os
+import csv
+import random
+import argparse
+import tempfile
+from benchmarks.datos import crear_engine, crear_esquema, sembrar_catalogo
+from servicios.catalogo import MATERIAS_BD
+from servicios.importacion import importar
+
+def generar_csv(ruta: str, filas: int, invalidas: float):
+    nombres = [n for alias in MATERIAS_BD.values() for n in alias] + [n.lower() for n in MATERIAS_BD]
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(("enunciado", "opcion_a", "opcion_b", "opcion_c", "opcion_d", "imagen",
+                           "respuesta_correcta", "materia", "grado"))
+        for i in range(filas):
+            respuesta = random.choice("ABCD") if random.random() >= invalidas else "E"
+            escritor.writerow((f"¿Pregunta importada número {i}?", "Primera opción", "Segunda opción",
+                               "Tercera opción", "Cuarta opción", "" if i % 5 else f"/static/p/{i}.webp",
+                               respuesta, random.choice(nombres), random.choice((9, 10, 11))))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--invalidas", type=float, default=0.01, help="fracción de filas con errores")
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = crear_engine("importacion")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    ruta = os.path.join(tempfile.gettempdir(), "preparicfes-banco-bench.csv")
+    generar_csv(ruta, args.filas, args.invalidas)
+
+    with open(ruta, encoding="utf-8", newline="") as archivo:
+        reporte = importar(engine, archivo, "csv", args.lote)
+    print(f"{engine.dialect.name}: {reporte['leidas']} filas en {reporte['segundos']} s "
+          f"({reporte['filas_s']} filas/s), importadas {reporte['importadas']}, "
+          f"rechazadas {reporte['rechazadas']}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Tiempo de ingesta de un lote de intentos con guardar_intentos.
+
+Uso: python -m benchmarks.ingesta_lote [--intentos 1000] [--preguntas 6]
+Objetivo: 1.000 intentos en menos de un segundo contra un Postgres local
+(BENCH_DATABASE=postgresql://...); sin BENCH_DATABASE usa SQLite.
+"""
+import argparse
+import asyncio
+import random
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from benchmarks.datos import (crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas,
+                              sembrar_usuarios, url_async)
+from servicios.catalogo import MATERIAS_BD
+from servicios.ingesta import guardar_intentos
+from servicios.clave_respuestas import firmar_examen
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--intentos", type=int, default=1000)
+    parser.add_argument("--preguntas", type=int, default=6)
+    args = parser.parse_args()
+
+    engine = crear_engine("ingesta")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, 1000)
+    sembrar_usuarios(engine, 1, "x")  # user_id 1
+    async_engine = create_async_engine(url_async(engine.url))
+
+    # Cada intento usa preguntas distintas de su materia en grado 10, como un examen real
+    with engine.connect() as conn:
+        area = dict(conn.execute(text("SELECT nombre_materia, id FROM areas")).fetchall())
+        grado_10 = conn.execute(text("SELECT id FROM grado WHERE numero_grado = 10")).scalar()
+        pools = {materia: conn.execute(text("""
+                     SELECT p.id FROM preguntas p JOIN grado g ON g.id = p.id_grado
+                     WHERE p.id_areas = :a AND g.numero_grado = 10
+                 """), {"a": area[nombres[0]]}).scalars().all()
+                 for materia, nombres in MATERIAS_BD.items()}
+    materias = list(MATERIAS_BD)
+    intentos = []
+    for _ in range(args.intentos):
+        materia = random.choice(materias)
+        ids = random.sample(pools[materia], min(args.preguntas, len(pools[materia])))
+        intentos.append({"materia": materia, "examen": firmar_examen(area[MATERIAS_BD[materia][0]], grado_10, ids),
+                         "respuestas": [{"pregunta_id": i, "respuesta": random.choice("ABCD")} for i in ids]})
+
+    async with AsyncSession(async_engine) as session:
+        # Calienta el catálogo para medir solo la ingesta
+        await guardar_intentos(session, {"user_id": 1, "grado": "10"}, intentos[:1])
+        await session.rollback()
+
+        inicio = time.perf_counter()
+        await guardar_intentos(session, {"user_id": 1, "grado": "10"}, intentos)
+        await session.commit()
+        total = time.perf_counter() - inicio
+
+        filas = (await session.execute(text("SELECT COUNT(*) FROM respuestas"))).scalar()
+    await async_engine.dispose()
+    print(f"{args.intentos} intentos ({filas} respuestas) en {total * 1000:.1f} ms "
+          f"= {args.intentos / total:.0f} intentos/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""Costo del límite de intentos por petición de login, con cada backend.
+
+Llama al middleware directamente (sin red ni servidor) con una app vacía
+detrás, así que lo medido es solo leer el formulario y actualizar los
+contadores de IP y de cuenta.
+
+Uso: python -m benchmarks.limite_login [--backends memoria,sqlite] [--peticiones 20000]
+"""
+import asyncio
+import argparse
+import time
+import cache_compartido
+from seguridad import limite_intentos
+
+async def _app_vacia(scope, receive, send):
+    await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def medir(app, peticiones: int) -> float:
+    async def enviar(mensaje):
+        pass
+
+    inicio = time.perf_counter()
+    for i in range(peticiones):
+        # Cada petición con IP y cuenta distintas para que nunca llegue al límite
+        cuerpo = f"email=usuario{i}@colegio.edu.co&password=123".encode()
+        scope = {"type": "http", "method": "POST", "path": "/login", "headers": [],
+                 "client": (f"10.0.{i // 250 % 250}.{i % 250}", 1234)}
+
+        async def recibir(cuerpo=cuerpo):
+            return {"type": "http.request", "body": cuerpo, "more_body": False}
+
+        await app(scope, recibir, enviar)
+    return (time.perf_counter() - inicio) / peticiones * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="memoria,sqlite")
+    parser.add_argument("--peticiones", type=int, default=20_000)
+    args = parser.parse_args()
+
+    base = asyncio.run(medir(_app_vacia, args.peticiones))
+    print(f"{'sin límite':>10}: {base:.1f} µs por petición")
+    for nombre in args.backends.split(","):
+        limite_intentos._backend = cache_compartido.crear_backend(nombre)
+        us = asyncio.run(medir(limite_intentos.LimiteIntentos(_app_vacia), args.peticiones))
+        print(f"{nombre:>10}: {us:.1f} µs por petición (+{us - base:.1f})")
+
+if __name__ == "__main__":
+    main()
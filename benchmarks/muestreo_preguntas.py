@@ -0,0 +1,63 @@
+"""Compara ORDER BY RANDOM() con el muestreo por pool de ids.
+
+Uso: python -m benchmarks.muestreo_preguntas [--tamanos 1000,100000,1000000] [--repeticiones 200]
+Con BENCH_DATABASE=postgresql://... se mide contra Postgres; si no, contra SQLite.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from benchmarks.datos import crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas, url_async
+from servicios import muestreo
+
+async def consulta_original(session: AsyncSession, area_id: int, grado_id: int):
+    return (await session.execute(text("""
+        SELECT id, enunciado, opcion_a, opcion_b, opcion_c, opcion_d,
+               imagen, respuesta_correcta
+        FROM preguntas WHERE id_areas = :area AND id_grado = :grado
+        ORDER BY RANDOM() LIMIT 6
+    """), {"area": area_id, "grado": grado_id})).fetchall()
+
+async def medir(funcion, repeticiones: int) -> dict:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        await funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {"p50_ms": round(statistics.median(tiempos), 3),
+            "p95_ms": round(tiempos[int(len(tiempos) * 0.95) - 1], 3)}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanos", default="1000,100000,1000000")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = crear_engine("muestreo")
+    async_engine = create_async_engine(url_async(engine.url))
+    for total in (int(t) for t in args.tamanos.split(",")):
+        crear_esquema(engine)
+        sembrar_catalogo(engine)
+        sembrar_preguntas(engine, total)
+        muestreo.invalidar_pool()
+
+        async with AsyncSession(async_engine) as session:
+            area_id, grado_id = (await session.execute(
+                text("SELECT id_areas, id_grado FROM preguntas LIMIT 1"))).one()
+            original = await medir(lambda: consulta_original(session, area_id, grado_id),
+                                   args.repeticiones)
+            inicio = time.perf_counter()
+            await muestreo.cargar_pool(session, area_id, grado_id)
+            carga_ms = round((time.perf_counter() - inicio) * 1000, 3)
+            pool = await medir(lambda: muestreo.preguntas_aleatorias(session, area_id, grado_id, 6),
+                               args.repeticiones)
+
+        print(f"{total:>9} preguntas | ORDER BY RANDOM(): {original} | "
+              f"pool: {pool} (carga inicial {carga_ms} ms)")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""Perfil del arranque: tiempo de import por módulo y fases hasta la primera respuesta.
+
+Corre `python -X importtime -c "import main"` en un proceso nuevo y agrupa el
+resultado por módulo de la app: cuánto tarda cada uno contando las librerías
+que importa por primera vez (las que ya cargó otro módulo no se le cuentan).
+Después, en otro proceso, mide las fases import de main -> lifespan -> primera
+respuesta de GET /.
+
+Uso: python -m benchmarks.perfil_arranque [--vercel] [--top 15]
+Con BENCH_DATABASE=postgresql://... usa Postgres; si no, un SQLite temporal.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+from benchmarks.datos import crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAQUETES_APP = {"rutas", "servicios", "seguridad"}
+
+FASES = """
+import json, time
+from fastapi.testclient import TestClient
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+with TestClient(main.app) as cliente:
+    t2 = time.perf_counter()
+    estado = cliente.get("/").status_code
+    t3 = time.perf_counter()
+print(json.dumps({"import main": t1 - t0, "lifespan": t2 - t1, "primera respuesta": t3 - t2, "estado": estado}))
+"""
+
+def es_de_la_app(modulo: str) -> bool:
+    raiz = modulo.split(".")[0]
+    return raiz in PAQUETES_APP or os.path.isfile(os.path.join(RAIZ, f"{raiz}.py"))
+
+def leer_importtime(salida: str) -> list[tuple[int, str, int, int]]:
+    """(profundidad, módulo, propio_us, acumulado_us) en el orden de -X importtime"""
+    filas = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        profundidad = (len(nombre) - len(nombre.lstrip())) // 2
+        filas.append((profundidad, nombre.strip(), int(propio), int(acumulado)))
+    return filas
+
+def agrupar(filas) -> tuple[dict, dict]:
+    """Tiempo por módulo de la app (con sus dependencias nuevas) y tiempo propio por librería"""
+    por_modulo, por_libreria = defaultdict(int), defaultdict(int)
+    # -X importtime imprime cada módulo después de sus hijos, así que se
+    # recorre al revés para conocer al padre antes que a los hijos
+    pila = []
+    for profundidad, nombre, propio, _ in reversed(filas):
+        del pila[profundidad:]
+        pila.append(nombre)
+        responsable = next((m for m in reversed(pila) if es_de_la_app(m)), "(antes de main)")
+        por_modulo[responsable] += propio
+        if not es_de_la_app(nombre):
+            por_libreria[nombre.split(".")[0]] += propio
+    return por_modulo, por_libreria
+
+def _imprimir(titulo: str, tiempos: dict, top: int):
+    total = sum(tiempos.values())
+    print(f"\n{titulo} (total {total / 1000:.0f} ms)")
+    for nombre, us in sorted(tiempos.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {us / 1000:8.1f} ms  {us / total:6.1%}  {nombre}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vercel", action="store_true", help="arranca como en Vercel (VERCEL=1)")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    engine = crear_engine("arranque")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, 1000)
+    entorno = {**os.environ, "SECRET_KEY": os.getenv("SECRET_KEY", "bench"), **({"VERCEL": "1"} if args.vercel else {})}
+
+    importtime = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                                cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True)
+    por_modulo, por_libreria = agrupar(leer_importtime(importtime.stderr))
+    _imprimir("Import por módulo de la app (con las librerías que carga primero)", por_modulo, args.top)
+    _imprimir("Import por librería (tiempo propio)", por_libreria, args.top)
+
+    fases = subprocess.run([sys.executable, "-c", FASES], cwd=RAIZ, env=entorno,
+                           capture_output=True, text=True, check=True)
+    resultado = json.loads(fases.stdout.strip().splitlines()[-1])
+    print(f"\nFases (GET / -> {resultado.pop('estado')})")
+    for fase, segundos in resultado.items():
+        print(f"  {segundos * 1000:8.1f} ms  {fase}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Revisa que ninguna consulta de las rutas recorra una tabla completa.
+
+Siembra una BD con las migraciones de sql/, recorre con TestClient todas las
+rutas que tocan la BD (registro, login, quiz, resultados, estadísticas,
+imágenes, exportar, importar, editar y eliminar cuenta) y guarda cada
+sentencia que llega al driver con sus parámetros. Después corre EXPLAIN sobre
+cada una y falla (código 1) si alguna hace un Seq Scan (Postgres) o un SCAN
+sin índice (SQLite) sobre una tabla que no esté en PERMITIDAS. Las consultas
+de RUTAS_EXENTAS (la exportación completa) no se revisan.
+
+En Postgres el EXPLAIN va con enable_seqscan = off: con pocas filas el
+planificador prefiere un Seq Scan aunque haya índice, así que solo queda el
+Seq Scan cuando no hay ningún índice que sirva.
+
+Uso: python -m benchmarks.planes_consultas [--verbose]
+Con BENCH_DATABASE=postgresql://... usa Postgres; si no, un SQLite temporal.
+"""
+import io
+import os
+import re
+import sys
+import json
+import argparse
+from sqlalchemy import event, inspect
+
+# Catálogos de pocas filas que se leen enteros (y se guardan en memoria)
+PERMITIDAS = {"areas", "grado"}
+# Rutas que recorren tablas completas a propósito
+RUTAS_EXENTAS = {"/api/exportar/resultados"}
+PASSWORD = "planes-password"
+_ruta_actual = ["(arranque)"]
+
+def _alias(sentencia: str) -> dict[str, str]:
+    """alias -> tabla de los FROM/JOIN/UPDATE/INTO de la sentencia"""
+    alias = {}
+    for tabla, nombre in re.findall(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?",
+                                    sentencia, re.IGNORECASE):
+        alias[tabla] = tabla
+        if nombre and nombre.upper() not in {"WHERE", "JOIN", "ON", "SET", "LEFT", "INNER", "GROUP",
+                                             "ORDER", "LIMIT", "VALUES", "USING", "AS", "SELECT"}:
+            alias[nombre] = tabla
+    return alias
+
+def _seq_scans_postgres(conn, sentencia: str, parametros) -> list[str]:
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sentencia}", parametros).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    tablas, pendientes = [], [plan[0]["Plan"]]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo["Node Type"] == "Seq Scan":
+            tablas.append(nodo["Relation Name"])
+        pendientes.extend(nodo.get("Plans", []))
+    return tablas
+
+def _seq_scans_sqlite(conn, sentencia: str, parametros) -> list[str]:
+    alias = _alias(sentencia)
+    tablas = []
+    for *_, detalle in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sentencia}", parametros).fetchall():
+        if (m := re.fullmatch(r"SCAN (\w+)", detalle)) and m[1] in alias:
+            tablas.append(alias[m[1]])
+    return tablas
+
+def recorrer_rutas(app, materia: str) -> None:
+    """Pasa por todas las rutas que consultan la BD, con un usuario nuevo"""
+    from fastapi.testclient import TestClient
+    from configuracion import ajustes
+    with TestClient(app) as cliente:
+        def pedir(metodo: str, ruta: str, **kwargs):
+            _ruta_actual[0] = ruta
+            return cliente.request(metodo, ruta, **kwargs)
+
+        pedir("POST", "/registrar", data={"email": "planes@bench.local", "password": PASSWORD, "grado": "10"})
+        pedir("POST", "/login", data={"email": "planes@bench.local", "password": PASSWORD})
+        pedir("GET", "/usuario")
+        examen = pedir("GET", f"/api/preguntas/{materia}").json()
+        respuestas = [{"pregunta_id": p["id"], "respuesta": "A"} for p in examen["preguntas"]]
+        intento = {"materia": materia, "examen": examen["firma"], "respuestas": respuestas}
+        pedir("POST", "/api/guardar-respuestas", json=intento)
+        pedir("POST", "/api/guardar-respuestas/lote", json={"intentos": [intento] * 2})
+        pedir("GET", "/Resul")
+        pedir("GET", f"/api/estadisticas/{materia}")
+        pedir("GET", f"/api/ranking/{materia}")
+        pedir("GET", f"/imagenes/preguntas/{examen['preguntas'][0]['id']}/000000000000/640.jpeg")
+        pedir("GET", "/api/exportar/resultados", params={"grado": 10, "materia": materia},
+              headers={"Authorization": f"Bearer {ajustes.exportar_token}"})
+        banco = ("enunciado,opcion_a,opcion_b,opcion_c,opcion_d,imagen,respuesta_correcta,materia,grado\n"
+                 f"¿Pregunta?,a,b,c,d,,A,{materia},10\n")
+        pedir("POST", "/api/admin/preguntas/importar", files={"archivo": ("banco.csv", io.BytesIO(banco.encode()))},
+              headers={"Authorization": f"Bearer {ajustes.admin_token}"})
+        pedir("POST", "/editar-usuario", data={"new_email": "planes2@bench.local", "new_grado": "10"})
+        pedir("POST", "/eliminar-usuario", data={"confirm_password": PASSWORD})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="imprime también las consultas que pasan")
+    args = parser.parse_args()
+
+    for variable in ("SECRET_KEY", "EXPORTAR_TOKEN", "ADMIN_TOKEN"):
+        os.environ.setdefault(variable, "planes")
+    from benchmarks.datos import (crear_engine, crear_esquema, sembrar_catalogo, sembrar_preguntas,
+                                  sembrar_usuarios, sembrar_resultados)
+    from servicios.catalogo import MATERIAS_BD
+    engine = crear_engine("planes")
+    crear_esquema(engine)
+    sembrar_catalogo(engine)
+    sembrar_preguntas(engine, 3000)
+    sembrar_usuarios(engine, 300, "x")
+    sembrar_resultados(engine, 5)
+
+    import db
+    from main import app
+    vistas: dict[str, tuple] = {}  # sentencia -> (parámetros, ruta que la hizo primero)
+
+    def capturar(conn, cursor, sentencia, parametros, context, executemany):
+        if executemany:
+            parametros = parametros[0]
+        vistas.setdefault(sentencia, (parametros, _ruta_actual[0]))
+
+    for motor in (db.engine, db.async_engine.sync_engine):
+        event.listen(motor, "before_cursor_execute", capturar)
+    recorrer_rutas(app, next(iter(MATERIAS_BD)))
+
+    tablas_app = set(inspect(engine).get_table_names())
+    postgres = engine.dialect.name == "postgresql"
+    fallas = 0
+    with engine.connect() as conn:
+        if postgres:
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for sentencia, (parametros, ruta) in vistas.items():
+            if ruta in RUTAS_EXENTAS:
+                continue
+            primera = sentencia.lstrip().split(None, 1)[0].upper() if sentencia.strip() else ""
+            if primera not in ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT"):
+                continue
+            if not tablas_app & {t.lower() for t in re.findall(r"\w+", sentencia)}:
+                continue
+            revisar = _seq_scans_postgres if postgres else _seq_scans_sqlite
+            tablas = sorted(set(revisar(conn, sentencia, parametros)) - PERMITIDAS)
+            resumen = " ".join(sentencia.split())
+            if tablas:
+                fallas += 1
+                print(f"❌ {ruta} recorre {', '.join(tablas)}: {resumen}")
+            elif args.verbose:
+                print(f"✅ {resumen[:150]}")
+        conn.rollback()
+
+    print(f"\n{len(vistas)} sentencias distintas, {fallas} con recorrido completo ({engine.dialect.name})")
+    sys.exit(1 if fallas else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Costo de codificar la respuesta de /api/preguntas según el camino usado.
+
+- original: dicts por índice + jsonable_encoder + JSONResponse (json.dumps)
+- modelo: Examen (Pydantic) serializado por FastAPI + ORJSONResponse
+- pregenerado: model_dump_json de una vez (lo que guarda servicios.examenes)
+
+Reporta tiempo por respuesta y pico de memoria asignada (tracemalloc) al
+codificar exámenes de 6, 50 y 500 preguntas. No necesita BD.
+
+Uso: python -m benchmarks.serializacion [--tamanos 6,50,500] [--repeticiones 2000]
+"""
+import argparse
+import time
+import tracemalloc
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from esquemas import Examen
+
+COLUMNAS = ("id", "enunciado", "opcion_a", "opcion_b", "opcion_c", "opcion_d",
+            "imagen", "respuesta_correcta")
+
+class Fila(tuple):
+    """Imita una fila de SQLAlchemy (acceso por posición y por _mapping)"""
+
+    @property
+    def _mapping(self):
+        return dict(zip(COLUMNAS, self))
+
+def filas_de_prueba(n: int) -> list[Fila]:
+    return [Fila((i, f"¿Cuál es el resultado del ejercicio número {i} de la guía de práctica?",
+                  "Opción A con algo de texto", "Opción B con algo de texto",
+                  "Opción C con algo de texto", "Opción D con algo de texto",
+                  None if i % 3 else f"/static/preguntas/{i}.webp", "ABCD"[i % 4]))
+            for i in range(1, n + 1)]
+
+def original(filas) -> bytes:
+    contenido = {
+        "preguntas": [{
+            "id": p[0], "numero": i+1, "enunciado": p[1],
+            "opcion_a": p[2], "opcion_b": p[3], "opcion_c": p[4], "opcion_d": p[5],
+            "imagen": p[6], "respuesta_correcta": p[7]
+        } for i, p in enumerate(filas)],
+        "total": len(filas)
+    }
+    return JSONResponse(jsonable_encoder(contenido)).body
+
+_adaptador = TypeAdapter(Examen)
+FIRMA = "0" * 32
+
+def modelo(filas) -> bytes:
+    # Lo que hace FastAPI con response_model: validar y volcar en modo json
+    examen = _adaptador.validate_python(Examen.de_filas(filas, FIRMA))
+    return ORJSONResponse(_adaptador.dump_python(examen, mode="json")).body
+
+def pregenerado(filas) -> bytes:
+    return Examen.de_filas(filas, FIRMA).model_dump_json().encode()
+
+def medir(funcion, filas, repeticiones: int) -> dict:
+    funcion(filas)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        cuerpo = funcion(filas)
+    us = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    funcion(filas)
+    pico = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {"us": round(us, 1), "pico_kb": round(pico / 1024, 1), "bytes": len(cuerpo)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", default="6,50,500")
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'preguntas':>9} {'camino':<12}{'µs/resp':>10}{'pico KB':>10}{'bytes':>9}")
+    for n in (int(t) for t in args.tamanos.split(",")):
+        filas = filas_de_prueba(n)
+        repeticiones = max(20, args.repeticiones * 6 // n)
+        for nombre, funcion in (("original", original), ("modelo", modelo), ("pregenerado", pregenerado)):
+            r = medir(funcion, filas, repeticiones)
+            print(f"{n:>9} {nombre:<12}{r['us']:>10}{r['pico_kb']:>10}{r['bytes']:>9}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
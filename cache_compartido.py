@@ -0,0 +1,215 @@
+"""Caché de pools, catálogo y páginas que pueden compartir varios workers.
+
+CACHE_BACKEND elige dónde viven los datos:
+- "memoria": un dict por proceso (lo de siempre; default con un solo worker)
+- "sqlite" o "sqlite:///ruta": un archivo SQLite en WAL que leen todos los
+  workers de la máquina (default si WEB_CONCURRENCY > 1)
+- "redis://...": Redis, para varios servidores (necesita el paquete redis)
+
+Con un backend compartido cada proceso guarda además una copia local por
+CACHE_LOCAL_TTL segundos, así que una invalidación tarda como mucho eso en
+verse en los demás workers.
+"""
+import os
+import time
+import pickle
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from configuracion import ajustes
+
+CACHE_MEMORIA_TAMANO = int(os.getenv("CACHE_MEMORIA_TAMANO", "5000"))
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "5"))
+
+class Backend:
+    """Almacén clave -> objeto con vencimiento"""
+
+    def obtener(self, clave: str):
+        raise NotImplementedError
+
+    def guardar(self, clave: str, valor, ttl: float):
+        raise NotImplementedError
+
+    def borrar_prefijo(self, prefijo: str):
+        raise NotImplementedError
+
+    def incrementar(self, clave: str, ttl: float) -> int:
+        """Suma 1 al contador (creándolo con ese ttl) y devuelve el valor nuevo, de forma atómica"""
+        raise NotImplementedError
+
+    def contador(self, clave: str) -> int:
+        raise NotImplementedError
+
+class BackendMemoria(Backend):
+    """LRU en memoria del proceso"""
+
+    def __init__(self, tamano: int = CACHE_MEMORIA_TAMANO):
+        self.tamano = tamano
+        self._lock = threading.Lock()
+        self._datos: OrderedDict[str, tuple[object, float]] = OrderedDict()
+
+    def obtener(self, clave: str):
+        with self._lock:
+            if (guardado := self._datos.get(clave)) is None:
+                return None
+            if guardado[1] < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return guardado[0]
+
+    def guardar(self, clave: str, valor, ttl: float):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + ttl)
+            self._datos.move_to_end(clave)
+            if len(self._datos) > self.tamano:
+                self._datos.popitem(last=False)
+
+    def borrar_prefijo(self, prefijo: str):
+        with self._lock:
+            for clave in [c for c in self._datos if c.startswith(prefijo)]:
+                del self._datos[clave]
+
+    def incrementar(self, clave: str, ttl: float) -> int:
+        with self._lock:
+            ahora = time.monotonic()
+            guardado = self._datos.get(clave)
+            valor, vence = (guardado[0] + 1, guardado[1]) if guardado and guardado[1] >= ahora else (1, ahora + ttl)
+            self._datos[clave] = (valor, vence)
+            self._datos.move_to_end(clave)
+            if len(self._datos) > self.tamano:
+                self._datos.popitem(last=False)
+            return valor
+
+    def contador(self, clave: str) -> int:
+        return self.obtener(clave) or 0
+
+class BackendSQLite(Backend):
+    """Archivo SQLite compartido por los procesos de la máquina (sin servicios externos)"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._escrituras = 0
+        conn = self._conexion()
+        conn.execute("""CREATE TABLE IF NOT EXISTS cache (
+            clave TEXT PRIMARY KEY, valor BLOB NOT NULL, vence REAL NOT NULL) WITHOUT ROWID""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS contadores (
+            clave TEXT PRIMARY KEY, valor INTEGER NOT NULL, vence REAL NOT NULL) WITHOUT ROWID""")
+
+    def _conexion(self) -> sqlite3.Connection:
+        # Una conexión por hilo; autocommit y WAL para que las lecturas no esperen a las escrituras
+        if (conn := getattr(self._local, "conn", None)) is None:
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def obtener(self, clave: str):
+        fila = self._conexion().execute("SELECT valor FROM cache WHERE clave = ? AND vence > ?",
+                                        (clave, time.time())).fetchone()
+        return pickle.loads(fila[0]) if fila else None
+
+    def guardar(self, clave: str, valor, ttl: float):
+        conn = self._conexion()
+        ahora = time.time()
+        conn.execute("INSERT OR REPLACE INTO cache (clave, valor, vence) VALUES (?, ?, ?)",
+                     (clave, pickle.dumps(valor, pickle.HIGHEST_PROTOCOL), ahora + ttl))
+        self._escrituras += 1
+        if self._escrituras % 100 == 0:
+            conn.execute("DELETE FROM cache WHERE vence < ?", (ahora,))
+
+    def borrar_prefijo(self, prefijo: str):
+        self._conexion().execute("DELETE FROM cache WHERE clave >= ? AND clave < ?",
+                                 (prefijo, prefijo + "\U0010ffff"))
+
+    def incrementar(self, clave: str, ttl: float) -> int:
+        conn = self._conexion()
+        ahora = time.time()
+        valor = conn.execute("""
+            INSERT INTO contadores (clave, valor, vence) VALUES (?, 1, ?)
+            ON CONFLICT (clave) DO UPDATE SET
+                valor = CASE WHEN vence < ? THEN 1 ELSE valor + 1 END,
+                vence = CASE WHEN vence < ? THEN excluded.vence ELSE vence END
+            RETURNING valor
+        """, (clave, ahora + ttl, ahora, ahora)).fetchone()[0]
+        self._escrituras += 1
+        if self._escrituras % 1000 == 0:
+            conn.execute("DELETE FROM contadores WHERE vence < ?", (ahora,))
+        return valor
+
+    def contador(self, clave: str) -> int:
+        fila = self._conexion().execute("SELECT valor FROM contadores WHERE clave = ? AND vence > ?",
+                                        (clave, time.time())).fetchone()
+        return fila[0] if fila else 0
+
+class BackendRedis(Backend):
+    """Redis, para compartir la caché entre varias máquinas"""
+
+    def __init__(self, url: str, prefijo: str = "preparicfes:"):
+        import redis
+        self.cliente = redis.Redis.from_url(url)
+        self.prefijo = prefijo
+
+    def obtener(self, clave: str):
+        valor = self.cliente.get(self.prefijo + clave)
+        return pickle.loads(valor) if valor is not None else None
+
+    def guardar(self, clave: str, valor, ttl: float):
+        self.cliente.set(self.prefijo + clave, pickle.dumps(valor, pickle.HIGHEST_PROTOCOL),
+                         px=max(1, int(ttl * 1000)))
+
+    def borrar_prefijo(self, prefijo: str):
+        claves = list(self.cliente.scan_iter(match=f"{self.prefijo}{prefijo}*", count=500))
+        if claves:
+            self.cliente.delete(*claves)
+
+    def incrementar(self, clave: str, ttl: float) -> int:
+        pipe = self.cliente.pipeline()
+        pipe.incr(self.prefijo + clave)
+        pipe.pexpire(self.prefijo + clave, max(1, int(ttl * 1000)), nx=True)
+        return pipe.execute()[0]
+
+    def contador(self, clave: str) -> int:
+        return int(self.cliente.get(self.prefijo + clave) or 0)
+
+def crear_backend(url: str) -> Backend:
+    """Backend a partir de CACHE_BACKEND"""
+    if url == "memoria":
+        return BackendMemoria()
+    if url == "sqlite" or url.startswith("sqlite:///"):
+        ruta = url[len("sqlite:///"):] or os.path.join(tempfile.gettempdir(), "preparicfes-cache.sqlite3")
+        return BackendSQLite(ruta)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return BackendRedis(url)
+    raise ValueError(f"CACHE_BACKEND desconocido: {url}")
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite" if ajustes.workers > 1 else "memoria")
+
+backend = crear_backend(CACHE_BACKEND)
+# Copia local delante de un backend compartido para no deserializar en cada petición
+_local = None if isinstance(backend, BackendMemoria) else BackendMemoria()
+
+def obtener(espacio: str, clave: str):
+    """Valor guardado o None si no está o venció"""
+    clave = f"{espacio}:{clave}"
+    if _local is None:
+        return backend.obtener(clave)
+    if (valor := _local.obtener(clave)) is None and (valor := backend.obtener(clave)) is not None:
+        _local.guardar(clave, valor, CACHE_LOCAL_TTL)
+    return valor
+
+def guardar(espacio: str, clave: str, valor, ttl: float):
+    clave = f"{espacio}:{clave}"
+    backend.guardar(clave, valor, ttl)
+    if _local is not None:
+        _local.guardar(clave, valor, min(ttl, CACHE_LOCAL_TTL))
+
+def invalidar(espacio: str, prefijo: str = ""):
+    """Borra las claves del espacio que empiezan por prefijo (todas si no se indica)"""
+    prefijo = f"{espacio}:{prefijo}"
+    backend.borrar_prefijo(prefijo)
+    if _local is not None:
+        _local.borrar_prefijo(prefijo)
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""Compresión de respuestas (brotli, zstd o gzip) y GET condicional con ETag.
+
+Es un middleware ASGI que mira cada respuesta completa (no las que llegan en
+varios trozos, como la exportación o los archivos estáticos) y:
+- si es un GET 200 sin ETag, le pone uno débil con el hash del cuerpo y
+  responde 304 si coincide con If-None-Match;
+- si el tipo es de texto o JSON y pasa de COMPRESION_MIN_BYTES, la comprime
+  con la mejor codificación que acepte el navegador. br y zstd solo se usan
+  si está instalado el paquete (brotli; zstandard o compression.zstd).
+
+Las respuestas con un ETag fuerte puesto por la ruta (páginas de
+pagina_cacheada, exámenes pregenerados) tienen siempre el mismo cuerpo para
+ese ETag, así que se comprimen una sola vez con más nivel y se guardan en una
+LRU por proceso de COMPRESION_CACHE_MB. Al comprimir, el ETag pasa a débil
+(W/"..."), como hace nginx: la comparación de If-None-Match es débil.
+"""
+import os
+import gzip
+import hashlib
+from functools import cache
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", "1024"))
+COMPRESION_CACHE_BYTES = int(os.getenv("COMPRESION_CACHE_MB", "32")) * 1024 * 1024
+COMPRIMIBLES = ("text/html", "text/plain", "text/css", "text/csv", "application/json",
+                "application/javascript", "text/javascript", "image/svg+xml")
+# En orden de preferencia cuando el navegador acepta varias con el mismo q
+PREFERENCIA = ("br", "zstd", "gzip")
+# Nivel para cada respuesta (rápido) y para las que se guardan en caché (se comprimen una vez)
+NIVELES = {
+    "dinamico": {"br": 4, "zstd": 3, "gzip": 6},
+    "cacheado": {"br": 9, "zstd": 19, "gzip": 9},
+}
+
+@cache
+def codificadores() -> dict:
+    """codificación -> función(datos, nivel) con las librerías disponibles"""
+    funciones = {"gzip": lambda datos, nivel: gzip.compress(datos, compresslevel=nivel, mtime=0)}
+    try:
+        import brotli
+        funciones["br"] = lambda datos, nivel: brotli.compress(datos, quality=nivel)
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+        funciones["zstd"] = lambda datos, nivel: zstd.compress(datos, level=nivel)
+    except ImportError:
+        try:
+            import zstandard
+            funciones["zstd"] = lambda datos, nivel: zstandard.ZstdCompressor(level=nivel).compress(datos)
+        except ImportError:
+            pass
+    return funciones
+
+def elegir_codificacion(accept_encoding: str) -> str | None:
+    """La codificación disponible con mayor q en Accept-Encoding (None = sin comprimir)"""
+    aceptadas = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        q = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                q = float(parametros.strip()[2:])
+            except ValueError:
+                continue
+        if nombre:
+            aceptadas[nombre] = q
+    disponibles = codificadores()
+    candidatas = [(aceptadas.get(c, aceptadas.get("*", 0)), -i, c)
+                  for i, c in enumerate(PREFERENCIA) if c in disponibles]
+    q, _, codificacion = max(candidatas)
+    return codificacion if q > 0 else None
+
+def etag(datos: bytes) -> str:
+    """ETag fuerte de un cuerpo (el mismo formato que usa pagina_cacheada)"""
+    return f'"{hashlib.blake2b(datos, digest_size=12).hexdigest()}"'
+
+def coincide(if_none_match: str | None, etag_: str) -> bool:
+    """Comparación débil de If-None-Match (W/"x" coincide con "x")"""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag_.removeprefix("W/") in (e.strip().removeprefix("W/") for e in if_none_match.split(","))
+
+class CacheComprimidos:
+    """LRU (ETag, codificación) -> cuerpo comprimido, limitada en bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._datos: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._total = 0
+
+    def obtener(self, clave: tuple[str, str]) -> bytes | None:
+        if (datos := self._datos.get(clave)) is not None:
+            self._datos.move_to_end(clave)
+        return datos
+
+    def guardar(self, clave: tuple[str, str], datos: bytes):
+        if len(datos) > self.max_bytes:
+            return
+        if (anterior := self._datos.pop(clave, None)) is not None:
+            self._total -= len(anterior)
+        self._datos[clave] = datos
+        self._total += len(datos)
+        while self._total > self.max_bytes:
+            _, viejo = self._datos.popitem(last=False)
+            self._total -= len(viejo)
+
+    def limpiar(self):
+        self._datos.clear()
+        self._total = 0
+
+comprimidos = CacheComprimidos(COMPRESION_CACHE_BYTES)
+
+def comprimir(cuerpo: bytes, codificacion: str, etag_fuerte: str | None = None) -> bytes:
+    """Cuerpo comprimido; si hay ETag fuerte se comprime con más nivel y se guarda"""
+    if etag_fuerte is None:
+        return codificadores()[codificacion](cuerpo, NIVELES["dinamico"][codificacion])
+    clave = (etag_fuerte, codificacion)
+    if (datos := comprimidos.obtener(clave)) is None:
+        datos = codificadores()[codificacion](cuerpo, NIVELES["cacheado"][codificacion])
+        comprimidos.guardar(clave, datos)
+    return datos
+
+def _es_comprimible(cabeceras: MutableHeaders) -> bool:
+    tipo = cabeceras.get("content-type", "").split(";")[0].strip().lower()
+    return tipo in COMPRIMIBLES and "content-encoding" not in cabeceras
+
+class Compresion:
+    """Middleware ASGI de compresión y ETag (ver el docstring del módulo)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST"):
+            await self.app(scope, receive, send)
+            return
+
+        peticion = Headers(scope=scope)
+        es_get = scope["method"] == "GET"
+        inicio = None
+        pasar = False
+
+        async def enviar(mensaje):
+            nonlocal inicio, pasar
+            if pasar or mensaje["type"] not in ("http.response.start", "http.response.body"):
+                # Ya decidido, o mensajes de extensiones (p. ej. http.response.debug de las plantillas)
+                await send(mensaje)
+                return
+            if mensaje["type"] == "http.response.start":
+                inicio = mensaje
+                if mensaje["status"] != 200 or not _es_comprimible(MutableHeaders(scope=mensaje)):
+                    pasar = True
+                    await send(mensaje)
+                return
+            if mensaje.get("more_body"):
+                # Respuesta en trozos (streaming): sale tal cual
+                pasar = True
+                await send(inicio)
+                await send(mensaje)
+                return
+            await self._responder(inicio, mensaje.get("body", b""), peticion, es_get, send)
+
+        await self.app(scope, receive, enviar)
+
+    async def _responder(self, inicio, cuerpo: bytes, peticion: Headers, es_get: bool, send):
+        cabeceras = MutableHeaders(scope=inicio)
+        cabeceras.add_vary_header("Accept-Encoding")
+        etag_fuerte = None
+        if es_get:
+            actual = cabeceras.get("etag")
+            if actual is None:
+                actual = cabeceras["ETag"] = f"W/{etag(cuerpo)}"
+            elif not actual.startswith("W/"):
+                etag_fuerte = actual
+            if coincide(peticion.get("if-none-match"), actual):
+                for nombre in ("content-length", "content-type"):
+                    del cabeceras[nombre]
+                await send({**inicio, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        codificacion = elegir_codificacion(peticion.get("accept-encoding", ""))
+        if codificacion is not None and len(cuerpo) >= COMPRESION_MIN_BYTES:
+            comprimido = comprimir(cuerpo, codificacion, etag_fuerte)
+            if len(comprimido) < len(cuerpo):
+                cuerpo = comprimido
+                cabeceras["Content-Encoding"] = codificacion
+                cabeceras["Content-Length"] = str(len(cuerpo))
+                if etag_fuerte is not None:
+                    cabeceras["ETag"] = f"W/{etag_fuerte}"
+        await send(inicio)
+        await send({"type": "http.response.body", "body": cuerpo})
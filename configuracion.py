@@ -0,0 +1,55 @@
+"""Configuración de despliegue, leída una sola vez del entorno (y de .env).
+
+Este módulo es el único que carga .env, y main lo importa antes que el resto
+para que todos los módulos vean las mismas variables. Los ajustes propios de
+un módulo (tamaños de caché, TTL...) siguen junto a su código; aquí va lo que
+comparten varios.
+"""
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def _bool(nombre: str, defecto: bool) -> bool:
+    return os.getenv(nombre, "1" if defecto else "0") == "1"
+
+@dataclass
+class Configuracion:
+    url_database: str | None
+    secret_key: str | None
+    algoritmo_jwt: str
+    # En Vercel cada instancia es un proceso nuevo: lo que se haga al arrancar se paga en cada arranque en frío
+    vercel: bool
+    workers: int
+    catalogo_al_arrancar: bool
+    metricas_token: str | None
+    exportar_token: str | None
+    admin_token: str | None
+    sentry_dsn: str | None
+    sentry_traces: float
+    sentry_entorno: str
+
+    @classmethod
+    def desde_entorno(cls) -> "Configuracion":
+        vercel = bool(os.getenv("VERCEL"))
+        return cls(
+            url_database=os.getenv("URL_DATABASE"),
+            secret_key=os.getenv("SECRET_KEY"),
+            algoritmo_jwt=os.getenv("ALGORITHM", "HS256"),
+            vercel=vercel,
+            workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+            catalogo_al_arrancar=_bool("CATALOGO_AL_ARRANCAR", not vercel),
+            metricas_token=os.getenv("METRICAS_TOKEN"),
+            exportar_token=os.getenv("EXPORTAR_TOKEN"),
+            admin_token=os.getenv("ADMIN_TOKEN"),
+            sentry_dsn=os.getenv("SENTRY_DSN"),
+            sentry_traces=float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.1")),
+            sentry_entorno=os.getenv("SENTRY_ENVIRONMENT", "produccion"),
+        )
+
+ajustes = Configuracion.desde_entorno()
+
+def recargar():
+    """Vuelve a leer el entorno en el mismo objeto (para scripts que cambian variables después de importar)"""
+    vars(ajustes).update(vars(Configuracion.desde_entorno()))
@@ -0,0 +1,167 @@
+"""Genera static/dist: imágenes WebP/AVIF redimensionadas, CSS con hash y
+precomprimido, y el manifest.json que usa asset() en las plantillas.
+
+Uso: python construir_estaticos.py
+Necesita Pillow (y brotli para los .br); solo se usa al construir, no en la app.
+"""
+import os
+import re
+import io
+import gzip
+import json
+import shutil
+import hashlib
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ESTATICOS_DIR = "static"
+DIST_DIR = os.path.join(ESTATICOS_DIR, "dist")
+PLANTILLAS_DIR = "templates"
+IMAGENES = (".png", ".jpg", ".jpeg", ".webp")
+# Anchos generados para cada imagen (nunca más que el original)
+ANCHOS = (96, 192, 384, 768, 1280)
+CALIDAD = {"webp": 82, "avif": 60}
+
+def _hash(datos: bytes) -> str:
+    return hashlib.sha256(datos).hexdigest()[:10]
+
+def _escribir(ruta_relativa: str, nombre: str, extension: str, datos: bytes) -> str:
+    """Guarda datos en dist/ como nombre.<hash>.ext y devuelve la ruta bajo static/"""
+    carpeta = os.path.dirname(ruta_relativa)
+    archivo = f"{nombre}.{_hash(datos)}{extension}"
+    destino = os.path.join(DIST_DIR, carpeta, archivo)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with open(destino, "wb") as f:
+        f.write(datos)
+    return "/".join(p for p in ("dist", carpeta, archivo) if p)
+
+def _codificar(imagen: Image.Image, formato: str) -> bytes:
+    salida = io.BytesIO()
+    if formato == "webp":
+        imagen.save(salida, format="WEBP", quality=CALIDAD["webp"], method=6)
+    else:
+        imagen.save(salida, format="AVIF", quality=CALIDAD["avif"])
+    return salida.getvalue()
+
+def procesar_imagen(ruta_relativa: str) -> dict:
+    """Genera las variantes de una imagen y devuelve su entrada del manifiesto"""
+    original = Image.open(os.path.join(ESTATICOS_DIR, ruta_relativa))
+    original.load()
+    nombre = os.path.splitext(os.path.basename(ruta_relativa))[0].replace(" ", "-")
+    anchos = sorted({a for a in ANCHOS if a < original.width} | {min(original.width, ANCHOS[-1])})
+
+    variantes = {"webp": [], "avif": []}
+    for ancho in anchos:
+        alto = round(original.height * ancho / original.width)
+        imagen = original if ancho == original.width else original.resize((ancho, alto), Image.LANCZOS)
+        for formato, lista in variantes.items():
+            lista.append([ancho, _escribir(ruta_relativa, f"{nombre}-{ancho}", f".{formato}",
+                                           _codificar(imagen, formato))])
+    return {"variantes": variantes}
+
+def procesar_css(ruta_relativa: str, manifiesto: dict) -> dict:
+    """Reescribe las url() hacia las imágenes optimizadas y guarda .css, .br y .gz"""
+    with open(os.path.join(ESTATICOS_DIR, ruta_relativa), encoding="utf-8") as f:
+        css = f.read()
+    carpeta = os.path.dirname(ruta_relativa)
+
+    def optimizada(url: str, formato: str) -> str | None:
+        destino = os.path.normpath(os.path.join(carpeta, url)).replace(os.sep, "/")
+        if url.startswith(("/", "http", "data:")) or destino not in manifiesto:
+            return None
+        # dist/ tiene la misma estructura, así que la URL relativa sigue siendo válida
+        archivo = manifiesto[destino]["variantes"][formato][-1][1]
+        return f'url("{os.path.relpath(archivo, os.path.join("dist", carpeta)).replace(os.sep, "/")}")'
+
+    def reemplazar_fondo(m):
+        if (webp := optimizada(m.group(3), "webp")) is None:
+            return m.group(0)
+        # La primera declaración es para los navegadores sin image-set(); las demás eligen AVIF
+        avif = optimizada(m.group(3), "avif")
+        return (f'{m.group(1)}{webp};{m.group(1)}image-set({avif} type("image/avif"), '
+                f'{webp} type("image/webp"))')
+
+    def reemplazar(m):
+        return optimizada(m.group(2), "webp") or m.group(0)
+
+    css = re.sub(r"""(background-image:\s*)url\((['"]?)([^'")]+)\2\)(?=\s*[;}])""", reemplazar_fondo, css)
+    # Las url() que ya apuntan a dist/ no están en el manifiesto y quedan igual
+    datos = re.sub(r"""url\((['"]?)([^'")]+)\1\)""", reemplazar, css).encode()
+    nombre = os.path.splitext(os.path.basename(ruta_relativa))[0]
+    archivo = _escribir(ruta_relativa, nombre, ".css", datos)
+    destino = os.path.join(ESTATICOS_DIR, archivo)
+    with open(destino + ".gz", "wb") as f:
+        f.write(gzip.compress(datos, compresslevel=9, mtime=0))
+    if brotli:
+        with open(destino + ".br", "wb") as f:
+            f.write(brotli.compress(datos, quality=11))
+    return {"archivo": archivo}
+
+def _tamano(ruta: str) -> int:
+    return os.path.getsize(os.path.join(ESTATICOS_DIR, ruta))
+
+def _tamano_optimo(ruta: str, manifiesto: dict, ancho: int | None = None) -> int:
+    entrada = manifiesto[ruta]
+    if "variantes" in entrada:
+        variantes = entrada["variantes"]["webp"]
+        archivo = next((r for w, r in variantes if ancho and w >= ancho), variantes[-1][1])
+        return _tamano(archivo)
+    comprimido = os.path.join(ESTATICOS_DIR, entrada["archivo"])
+    return min(os.path.getsize(p) for p in (comprimido, comprimido + ".br", comprimido + ".gz")
+               if os.path.exists(p))
+
+def reporte(manifiesto: dict) -> list[dict]:
+    """Bytes de static/ en la primera carga de cada plantilla, antes y después"""
+    filas = []
+    for plantilla in sorted(os.listdir(PLANTILLAS_DIR)):
+        with open(os.path.join(PLANTILLAS_DIR, plantilla), encoding="utf-8") as f:
+            html = f.read()
+        usados = [(ruta, int(ancho) if ancho else None) for ruta, ancho in
+                  re.findall(r"""(?:asset|imagen)\(\s*'([^']+)'(?:\s*,\s*(\d+))?""", html)]
+        # Imágenes que pide cada CSS enlazado
+        for ruta, _ in list(usados):
+            if ruta.endswith(".css"):
+                with open(os.path.join(ESTATICOS_DIR, ruta), encoding="utf-8") as f:
+                    for url in re.findall(r"""url\(['"]?([^'")]+)""", f.read()):
+                        destino = os.path.normpath(os.path.join(os.path.dirname(ruta), url)).replace(os.sep, "/")
+                        if destino in manifiesto:
+                            usados.append((destino, None))
+        usados = [(r, a) for r, a in dict.fromkeys(usados) if r in manifiesto]
+        antes = sum(_tamano(r) for r, _ in usados)
+        despues = sum(_tamano_optimo(r, manifiesto, a) for r, a in usados)
+        filas.append({"plantilla": plantilla, "archivos": len(usados), "antes": antes,
+                      "despues": despues, "ahorro": antes - despues})
+    return filas
+
+def main():
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    manifiesto = {}
+    archivos = sorted(
+        os.path.relpath(os.path.join(raiz, nombre), ESTATICOS_DIR).replace(os.sep, "/")
+        for raiz, _, nombres in os.walk(ESTATICOS_DIR) for nombre in nombres
+    )
+    for ruta in archivos:
+        if ruta.lower().endswith(IMAGENES):
+            manifiesto[ruta] = procesar_imagen(ruta)
+    for ruta in archivos:
+        if ruta.endswith(".css"):
+            manifiesto[ruta] = procesar_css(ruta, manifiesto)
+
+    with open(os.path.join(DIST_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    filas = reporte(manifiesto)
+    with open(os.path.join(DIST_DIR, "reporte.json"), "w", encoding="utf-8") as f:
+        json.dump(filas, f, indent=1)
+    print(f"{'plantilla':<28}{'archivos':>9}{'antes':>12}{'después':>12}{'ahorro':>8}")
+    for fila in filas:
+        porcentaje = fila["ahorro"] / fila["antes"] * 100 if fila["antes"] else 0
+        print(f"{fila['plantilla']:<28}{fila['archivos']:>9}{fila['antes']:>12,}"
+              f"{fila['despues']:>12,}{porcentaje:>7.0f}%")
+
+if __name__ == "__main__":
+    main()
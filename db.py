@@ -1,20 +1,152 @@
 import os
+import time
+import threading
 from typing import Annotated
 from fastapi import Depends
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
-from dotenv import load_dotenv
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, NullPool
+from configuracion import ajustes
+import metricas
 
-load_dotenv()
+# Driver asíncrono equivalente a cada driver síncrono
+DRIVERS_ASYNC = {
+    "postgres": "postgresql+psycopg",
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-if not (DB_URL := os.getenv("URL_DATABASE")):
-    raise ValueError("URL_DATABASE no configurada")
+# Configuración del pool. En Vercel cada instancia abre su propio pool, así que
+# por defecto no se guardan conexiones ("null") y se deja el pooling a PgBouncer.
+POOL_MODO = os.getenv("DB_POOL_MODO", "null" if ajustes.vercel else "queue")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# PgBouncer en modo transacción no soporta prepared statements del servidor
+PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
 
-engine = create_engine(DB_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Métricas por pool: conexiones en uso y espera al pedir una conexión
+metricas_pool: dict[str, dict] = {}
+
+def url_async(url: str | URL) -> URL:
+    """Convierte la URL de la BD a su driver asíncrono"""
+    u = make_url(url)
+    return u.set(drivername=DRIVERS_ASYNC.get(u.drivername, u.drivername))
+
+def _pool_medido(base, nombre: str):
+    """Subclase del pool que mide cuánto se espera por cada conexión"""
+    stats = metricas_pool.setdefault(nombre, {
+        "modo": POOL_MODO, "en_uso": 0, "checkouts": 0,
+        "espera_total_s": 0.0, "espera_max_s": 0.0
+    })
+
+    class PoolMedido(base):
+        def connect(self):
+            inicio = time.perf_counter()
+            try:
+                return super().connect()
+            finally:
+                espera = time.perf_counter() - inicio
+                stats["checkouts"] += 1
+                stats["espera_total_s"] += espera
+                stats["espera_max_s"] = max(stats["espera_max_s"], espera)
+
+    return PoolMedido
+
+def _opciones_pool(base, nombre: str) -> dict:
+    if POOL_MODO == "null":
+        return {"poolclass": _pool_medido(NullPool, nombre)}
+    return {
+        "poolclass": _pool_medido(base, nombre),
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+def _contar_en_uso(engine, nombre: str):
+    stats = metricas_pool[nombre]
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(*_):
+        stats["en_uso"] += 1
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(*_):
+        stats["en_uso"] -= 1
+
+def estadisticas_pool() -> dict:
+    """Copia de las métricas de los pools de conexiones"""
+    return {nombre: {**stats, "espera_media_s": stats["espera_total_s"] / stats["checkouts"]
+                     if stats["checkouts"] else 0.0}
+            for nombre, stats in metricas_pool.items()}
+
+def _url_database() -> str:
+    if not ajustes.url_database:
+        raise ValueError("URL_DATABASE no configurada")
+    return ajustes.url_database
+
+def _crear_engine():
+    engine = create_engine(_url_database(), **_opciones_pool(QueuePool, "sync"))
+    _contar_en_uso(engine, "sync")
+    metricas.instrumentar_engine(engine)
+    return engine
+
+def _crear_async_engine():
+    url = url_async(_url_database())
+    async_engine = create_async_engine(
+        url, **_opciones_pool(AsyncAdaptedQueuePool, "async"),
+        connect_args={"prepare_threshold": None} if PGBOUNCER and url.drivername == "postgresql+psycopg" else {}
+    )
+    _contar_en_uso(async_engine.sync_engine, "async")
+    metricas.instrumentar_engine(async_engine.sync_engine)
+    return async_engine
+
+# Los engines se crean al primer uso y no al importar: crearlos importa el
+# driver (psycopg, aiosqlite) y en Vercel eso se pagaría en cada arranque en
+# frío aunque la petición no toque la BD. `from db import engine` sigue
+# funcionando; solo hay que hacerlo dentro de la función que lo usa.
+_FABRICAS = {
+    "engine": _crear_engine,
+    "async_engine": _crear_async_engine,
+    "SessionLocal": lambda: sessionmaker(autocommit=False, autoflush=False, bind=_perezoso("engine")),
+    "AsyncSessionLocal": lambda: async_sessionmaker(_perezoso("async_engine"), autoflush=False,
+                                                    expire_on_commit=False),
+}
+_fabricas_lock = threading.RLock()
+
+def _perezoso(nombre: str):
+    if (valor := globals().get(nombre)) is None:
+        with _fabricas_lock:
+            if (valor := globals().get(nombre)) is None:
+                valor = globals()[nombre] = _FABRICAS[nombre]()
+    return valor
+
+def __getattr__(nombre: str):
+    if nombre in _FABRICAS:
+        return _perezoso(nombre)
+    raise AttributeError(f"module 'db' has no attribute '{nombre}'")
+
+async def cerrar():
+    """Cierra los pools de los engines que se hayan creado"""
+    if (async_engine := globals().get("async_engine")) is not None:
+        await async_engine.dispose()
+    if (engine := globals().get("engine")) is not None:
+        engine.dispose()
 
 def get_db():
-    with SessionLocal() as session:
+    with _perezoso("SessionLocal")() as session:
+        yield session
+
+async def get_async_db():
+    async with _perezoso("AsyncSessionLocal")() as session:
         yield session
 
-SessionDepends = Annotated[Session, Depends(get_db)]
\ No newline at end of file
+SessionDepends = Annotated[Session, Depends(get_db)]
+AsyncSessionDepends = Annotated[AsyncSession, Depends(get_async_db)]
\ No newline at end of file
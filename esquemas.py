@@ -0,0 +1,86 @@
+from datetime import datetime
+from pydantic import BaseModel
+from servicios import imagenes
+
+class Pregunta(BaseModel):
+    """Pregunta tal como la recibe el navegador (sin la respuesta correcta)"""
+    id: int
+    numero: int
+    enunciado: str | None
+    opcion_a: str | None
+    opcion_b: str | None
+    opcion_c: str | None
+    opcion_d: str | None
+    # URL de /imagenes/preguntas (ver servicios.imagenes), o la original si el servicio no la puede leer
+    imagen: str | None
+    imagen_srcset: str | None = None
+    imagen_srcset_avif: str | None = None
+
+    @classmethod
+    def de_fila(cls, fila, numero: int) -> "Pregunta":
+        """Arma la pregunta desde una fila de COLUMNAS_PREGUNTA (por nombre, no por posición)"""
+        datos = dict(fila._mapping)
+        original = datos.pop("imagen", None)
+        if original and imagenes.resoluble(original):
+            id_ = datos["id"]
+            datos["imagen"] = imagenes.url(id_, original)
+            datos["imagen_srcset"] = imagenes.srcset(id_, original)
+            if "avif" in imagenes.formatos():
+                datos["imagen_srcset_avif"] = imagenes.srcset(id_, original, "avif")
+        else:
+            datos["imagen"] = original or None
+        return cls(numero=numero, **datos)
+
+class Examen(BaseModel):
+    """Respuesta de /api/preguntas/{materia}"""
+    preguntas: list[Pregunta]
+    total: int
+    # Se devuelve con las respuestas (ver servicios.clave_respuestas.firmar_examen)
+    firma: str
+
+    @classmethod
+    def de_filas(cls, filas: list, firma: str) -> "Examen":
+        return cls(preguntas=[Pregunta.de_fila(f, i+1) for i, f in enumerate(filas)], total=len(filas),
+                   firma=firma)
+
+class ResumenIntento(BaseModel):
+    """Calificación de un intento guardado"""
+    correctas: int
+    total: int
+    puntaje: float
+
+class RespuestasGuardadas(ResumenIntento):
+    """Respuesta de /api/guardar-respuestas"""
+    success: bool = True
+
+class LoteGuardado(BaseModel):
+    """Respuesta de /api/guardar-respuestas/lote"""
+    success: bool = True
+    guardados: int
+    resultados: list[ResumenIntento]
+
+class Tramo(BaseModel):
+    desde: int
+    hasta: int
+    intentos: int
+
+class EstadisticasArea(BaseModel):
+    """Respuesta de /api/estadisticas/{materia}"""
+    materia: str
+    grado: int
+    intentos: int
+    promedio: float | None
+    histograma: list[Tramo]
+
+class PuestoRanking(BaseModel):
+    posicion: int
+    nombre: str
+    puntaje: int
+    fecha: datetime
+    es_usted: bool
+
+class Ranking(BaseModel):
+    """Respuesta de /api/ranking/{materia}"""
+    materia: str
+    grado: int
+    mejores: list[PuestoRanking]
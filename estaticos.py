@@ -0,0 +1,80 @@
+import os
+import json
+from urllib.parse import quote
+from markupsafe import Markup, escape
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+
+ESTATICOS_DIR = "static"
+MANIFIESTO = os.path.join(ESTATICOS_DIR, "dist", "manifest.json")
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+CACHE_NORMAL = "public, max-age=3600"
+# Archivos de texto que construir_estaticos.py guarda también en .br y .gz
+PRECOMPRIMIDOS = (".css", ".js", ".svg")
+
+def cargar_manifiesto() -> dict:
+    """Lee static/dist/manifest.json; sin él se sirven los originales"""
+    try:
+        with open(MANIFIESTO, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+_manifiesto = cargar_manifiesto()
+
+def asset(ruta: str, ancho: int | None = None, formato: str = "webp") -> str:
+    """URL de la versión optimizada de un archivo de static/.
+
+    Para imágenes elige la variante más pequeña de al menos `ancho` px en el
+    formato pedido (webp o avif).
+    """
+    entrada = _manifiesto.get(ruta)
+    if entrada is None:
+        return f"/static/{quote(ruta)}"
+    if "variantes" in entrada:
+        variantes = entrada["variantes"].get(formato) or entrada["variantes"]["webp"]
+        archivo = next((r for w, r in variantes if ancho and w >= ancho), variantes[-1][1])
+    else:
+        archivo = entrada["archivo"]
+    return f"/static/{quote(archivo)}"
+
+def imagen(ruta: str, ancho: int | None = None, **atributos) -> Markup:
+    """<img> con asset(); si el manifiesto tiene AVIF, dentro de un <picture> con su <source>.
+
+    Los atributos van al <img> (class_ se escribe class).
+    """
+    extra = "".join(f' {nombre.rstrip("_")}="{escape(valor)}"' for nombre, valor in atributos.items())
+    img = Markup(f'<img src="{escape(asset(ruta, ancho))}"{extra}>')
+    if not _manifiesto.get(ruta, {}).get("variantes", {}).get("avif"):
+        # Sin AVIF no hay <source>: uno con otro formato el navegador no lo sabría descartar
+        return img
+    return Markup(f'<picture><source type="image/avif" srcset="{escape(asset(ruta, ancho, "avif"))}">'
+                  f'{img}</picture>')
+
+class Estaticos(StaticFiles):
+    """StaticFiles con Cache-Control y CSS/JS precomprimidos (brotli o gzip)"""
+
+    async def get_response(self, path: str, scope):
+        respuesta = None
+        if path.endswith(PRECOMPRIMIDOS):
+            aceptadas = {c.split(";")[0].strip()
+                         for c in Headers(scope=scope).get("accept-encoding", "").split(",")}
+            for codificacion, extension in (("br", ".br"), ("gzip", ".gz")):
+                if codificacion not in aceptadas:
+                    continue
+                try:
+                    respuesta = await super().get_response(path + extension, scope)
+                except HTTPException:
+                    continue
+                respuesta.headers["Content-Encoding"] = codificacion
+                break
+            if respuesta is None:
+                respuesta = await super().get_response(path, scope)
+            respuesta.headers["Vary"] = "Accept-Encoding"
+        else:
+            respuesta = await super().get_response(path, scope)
+
+        respuesta.headers["Cache-Control"] = CACHE_INMUTABLE if path.startswith("dist/") else CACHE_NORMAL
+        return respuesta
\ No newline at end of file
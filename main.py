@@ -1,14 +1,62 @@
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import RedirectResponse, PlainTextResponse, ORJSONResponse
+from configuracion import ajustes
+import metricas
+
+metricas.iniciar_sentry()
+
 from rutas.autenticacion import router as router_autenticacion
 from rutas.paginas import router as router_paginas
 from rutas.usuario import router as router_usuario
 from rutas.preguntas import router as router_preguntas
+from rutas.exportacion import router as router_exportacion
+from rutas.importacion import router as router_importacion
+from rutas.imagenes import router as router_imagenes
+from rutas.estadisticas import router as router_estadisticas
+import db
+from servicios.catalogo import cargar_catalogo
+from servicios.examenes import generar_todos, EXAMENES_AL_ARRANCAR
+from estaticos import Estaticos
+from seguridad.limite_intentos import LimiteIntentos
+from compresion import Compresion
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carga el catálogo de áreas y grados al arrancar (falla si falta un área) y genera los exámenes.
 
-app = FastAPI(title="PREPARICFES")
+    En Vercel no se hace ninguna de las dos cosas por defecto: el catálogo se
+    carga en la primera petición que lo usa y el arranque en frío no abre la BD.
+    """
+    if ajustes.catalogo_al_arrancar or EXAMENES_AL_ARRANCAR:
+        async with db.AsyncSessionLocal() as session:
+            catalogo = await cargar_catalogo(session, estricto=True)
+            if EXAMENES_AL_ARRANCAR:
+                await generar_todos(session, catalogo["areas"].values(), catalogo["grados"].values())
+    yield
+    await db.cerrar()
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app = FastAPI(title="PREPARICFES", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+app.mount("/static", Estaticos(directory="static"), name="static")
+# Compresion va por dentro para que las métricas cuenten el tiempo de comprimir
+app.add_middleware(Compresion)
+app.add_middleware(LimiteIntentos)
+
+@app.middleware("http")
+async def medir_peticiones(request: Request, call_next):
+    """Latencia, consultas SQL y render de plantillas de cada petición"""
+    stats = metricas.iniciar_peticion()
+    inicio = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        ruta = getattr(request.scope.get("route"), "path", "sin_ruta")
+        metricas.registrar_peticion(request.method, ruta, status, time.perf_counter() - inicio, stats)
 
 # Manejador de excepciones para redirección
 @app.exception_handler(HTTPException)
@@ -29,4 +77,16 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
 app.include_router(router_autenticacion, tags=["Autenticación"])
 app.include_router(router_paginas, tags=["Páginas"])
 app.include_router(router_usuario, tags=["Usuario"])
-app.include_router(router_preguntas, tags=["Preguntas"])
\ No newline at end of file
+app.include_router(router_preguntas, tags=["Preguntas"])
+app.include_router(router_exportacion, tags=["Exportación"])
+app.include_router(router_importacion, tags=["Importación"])
+app.include_router(router_imagenes, tags=["Imágenes"])
+app.include_router(router_estadisticas, tags=["Estadísticas"])
+
+@app.get("/metrics", include_in_schema=False)
+async def exportar_metricas(request: Request):
+    """Métricas en formato Prometheus (protegidas con METRICAS_TOKEN si está definido)"""
+    if (token := ajustes.metricas_token) and request.headers.get("authorization") != f"Bearer {token}":
+        return PlainTextResponse("No autorizado", status_code=401)
+    return PlainTextResponse(metricas.exportar(db.estadisticas_pool()),
+                             media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,147 @@
+import os
+import re
+import time
+import logging
+import threading
+from contextvars import ContextVar
+from collections import defaultdict
+import jinja2
+from sqlalchemy import event
+
+logger = logging.getLogger("preparicfes.metricas")
+
+# Peticiones más lentas que esto se registran con el desglose de sus consultas
+LENTO_MS = float(os.getenv("METRICAS_LENTO_MS", "500"))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+# (método, ruta) -> contadores acumulados desde el arranque
+_rutas = defaultdict(lambda: {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0,
+                              "sql_count": 0, "sql_sum": 0.0, "errores": 0})
+# plantilla -> (renders, segundos)
+_plantillas = defaultdict(lambda: [0, 0.0])
+
+# Estadísticas de la petición en curso (las llenan los eventos del engine y Jinja)
+_peticion: ContextVar[dict | None] = ContextVar("metricas_peticion", default=None)
+
+def iniciar_peticion() -> dict:
+    """Empieza a acumular consultas y renders de la petición actual"""
+    stats = {"sql_count": 0, "sql_sum": 0.0, "render_sum": 0.0, "consultas": defaultdict(lambda: [0, 0.0])}
+    _peticion.set(stats)
+    return stats
+
+def registrar_peticion(metodo: str, ruta: str, status: int, duracion: float, stats: dict):
+    """Acumula la petición terminada y la registra en el log si fue lenta"""
+    with _lock:
+        r = _rutas[(metodo, ruta)]
+        r["count"] += 1
+        r["sum"] += duracion
+        r["sql_count"] += stats["sql_count"]
+        r["sql_sum"] += stats["sql_sum"]
+        r["errores"] += status >= 500
+        for i, limite in enumerate(BUCKETS):
+            if duracion <= limite:
+                r["buckets"][i] += 1
+                break
+
+    if duracion * 1000 >= LENTO_MS:
+        desglose = "; ".join(
+            f"{n}x {s * 1000:.1f}ms {sql}" for sql, (n, s) in
+            sorted(stats["consultas"].items(), key=lambda c: -c[1][1])[:10]
+        )
+        logger.warning("Petición lenta %s %s: %.1f ms, %d consultas (%.1f ms), render %.1f ms | %s",
+                       metodo, ruta, duracion * 1000, stats["sql_count"], stats["sql_sum"] * 1000,
+                       stats["render_sum"] * 1000, desglose)
+
+def _sql_corto(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()[:120]
+
+def instrumentar_engine(engine):
+    """Cuenta sentencias SQL y su tiempo por petición (engine síncrono o .sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info["metricas_inicio"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - conn.info.pop("metricas_inicio", time.perf_counter())
+        if (stats := _peticion.get()) is not None:
+            stats["sql_count"] += 1
+            stats["sql_sum"] += duracion
+            consulta = stats["consultas"][_sql_corto(statement)]
+            consulta[0] += 1
+            consulta[1] += duracion
+
+class PlantillaMedida(jinja2.Template):
+    """Template de Jinja que mide cuánto tarda cada render"""
+
+    def render(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            duracion = time.perf_counter() - inicio
+            with _lock:
+                medida = _plantillas[self.name]
+                medida[0] += 1
+                medida[1] += duracion
+            if (stats := _peticion.get()) is not None:
+                stats["render_sum"] += duracion
+
+def _etiquetas(**valores) -> str:
+    return ",".join(f'{k}="{str(v)}"' for k, v in valores.items())
+
+def exportar(pools: dict) -> str:
+    """Todas las métricas en formato de texto de Prometheus"""
+    lineas = [
+        "# HELP http_request_duration_seconds Latencia de las peticiones por ruta",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with _lock:
+        rutas = {k: {**v, "buckets": list(v["buckets"])} for k, v in _rutas.items()}
+        plantillas = {k: list(v) for k, v in _plantillas.items()}
+
+    for (metodo, ruta), r in sorted(rutas.items()):
+        acumulado = 0
+        for limite, n in zip(BUCKETS, r["buckets"]):
+            acumulado += n
+            lineas.append(f"http_request_duration_seconds_bucket{{{_etiquetas(method=metodo, route=ruta, le=limite)}}} {acumulado}")
+        lineas.append(f"http_request_duration_seconds_bucket{{{_etiquetas(method=metodo, route=ruta, le='+Inf')}}} {r['count']}")
+        lineas.append(f"http_request_duration_seconds_sum{{{_etiquetas(method=metodo, route=ruta)}}} {r['sum']:.6f}")
+        lineas.append(f"http_request_duration_seconds_count{{{_etiquetas(method=metodo, route=ruta)}}} {r['count']}")
+
+    for nombre, tipo, clave, ayuda in (
+        ("http_request_sql_statements_total", "counter", "sql_count", "Sentencias SQL ejecutadas por ruta"),
+        ("http_request_sql_seconds_total", "counter", "sql_sum", "Tiempo en la BD por ruta"),
+        ("http_request_errors_total", "counter", "errores", "Respuestas 5xx por ruta"),
+    ):
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+        lineas += [f"{nombre}{{{_etiquetas(method=m, route=ruta)}}} {r[clave]}"
+                   for (m, ruta), r in sorted(rutas.items())]
+
+    lineas += ["# HELP template_render_seconds Tiempo de render de plantillas",
+               "# TYPE template_render_seconds summary"]
+    for plantilla, (n, s) in sorted(plantillas.items()):
+        lineas.append(f"template_render_seconds_sum{{{_etiquetas(template=plantilla)}}} {s:.6f}")
+        lineas.append(f"template_render_seconds_count{{{_etiquetas(template=plantilla)}}} {n}")
+
+    for nombre, tipo, clave, ayuda in (
+        ("db_pool_in_use", "gauge", "en_uso", "Conexiones prestadas por el pool"),
+        ("db_pool_checkouts_total", "counter", "checkouts", "Conexiones pedidas al pool"),
+        ("db_pool_wait_seconds_total", "counter", "espera_total_s", "Espera acumulada por una conexión"),
+        ("db_pool_wait_seconds_max", "gauge", "espera_max_s", "Mayor espera por una conexión"),
+    ):
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+        lineas += [f"{nombre}{{{_etiquetas(pool=pool)}}} {stats[clave]}" for pool, stats in sorted(pools.items())]
+
+    return "\n".join(lineas) + "\n"
+
+def iniciar_sentry():
+    """Activa Sentry (errores y trazas de rendimiento) si SENTRY_DSN está configurado"""
+    from configuracion import ajustes
+    if not ajustes.sentry_dsn:
+        return
+    import sentry_sdk
+    sentry_sdk.init(dsn=ajustes.sentry_dsn, traces_sample_rate=ajustes.sentry_traces,
+                    environment=ajustes.sentry_entorno)
@@ -0,0 +1,132 @@
+"""Migraciones versionadas del esquema (archivos sql/NNNN_nombre.sql).
+
+Cada archivo se aplica una sola vez, en orden de versión y en su propia
+transacción, y queda anotado en esquema_migraciones con un hash de su
+contenido. Las migraciones usan IF NOT EXISTS, así que en una BD creada antes
+de que existieran solo agregan lo que falta.
+
+Se escriben para Postgres; en SQLite (benchmarks) SERIAL PRIMARY KEY se
+cambia por INTEGER PRIMARY KEY y ADD COLUMN IF NOT EXISTS por ADD COLUMN
+(la migración se aplica una sola vez de todos modos).
+
+Uso: python migraciones.py [--estado] [--hasta N]
+"""
+import os
+import re
+import hashlib
+import argparse
+from datetime import datetime
+from dataclasses import dataclass
+from sqlalchemy import text
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql")
+# Evita que dos despliegues migren a la vez (pg_advisory_lock)
+CLAVE_LOCK = 7_240_001
+
+TABLA = """
+CREATE TABLE IF NOT EXISTS esquema_migraciones (
+    version INTEGER PRIMARY KEY,
+    nombre VARCHAR(255) NOT NULL,
+    hash VARCHAR(64) NOT NULL,
+    aplicada TIMESTAMP NOT NULL
+)
+"""
+
+@dataclass(frozen=True)
+class Migracion:
+    version: int
+    nombre: str
+    sql: str
+
+    @property
+    def hash(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+def migraciones() -> list[Migracion]:
+    """Todas las migraciones de SQL_DIR ordenadas por versión"""
+    encontradas = []
+    for archivo in os.listdir(SQL_DIR):
+        if m := re.fullmatch(r"(\d+)_(\w+)\.sql", archivo):
+            with open(os.path.join(SQL_DIR, archivo), encoding="utf-8") as f:
+                encontradas.append(Migracion(int(m[1]), m[2], f.read()))
+    encontradas.sort(key=lambda m: m.version)
+    versiones = [m.version for m in encontradas]
+    if len(set(versiones)) != len(versiones):
+        raise ValueError(f"Hay versiones de migración repetidas en {SQL_DIR}")
+    return encontradas
+
+def sentencias(sql: str, dialecto: str) -> list[str]:
+    """Sentencias de un archivo, sin comentarios y adaptadas al dialecto"""
+    sin_comentarios = "\n".join(l for l in sql.splitlines() if not l.lstrip().startswith("--"))
+    if dialecto == "sqlite":
+        sin_comentarios = sin_comentarios.replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY")
+        sin_comentarios = sin_comentarios.replace("ADD COLUMN IF NOT EXISTS", "ADD COLUMN")
+    return [s.strip() for s in sin_comentarios.split(";") if s.strip()]
+
+def aplicadas(conn) -> dict[int, str]:
+    """version -> hash de las migraciones ya aplicadas"""
+    conn.execute(text(TABLA))
+    return dict(conn.execute(text("SELECT version, hash FROM esquema_migraciones")).fetchall())
+
+def migrar(engine, hasta: int | None = None, verbose: bool = True) -> list[Migracion]:
+    """Aplica las migraciones pendientes (hasta la versión `hasta`) y las devuelve"""
+    postgres = engine.dialect.name == "postgresql"
+    nuevas = []
+    with engine.connect() as conn:
+        if postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": CLAVE_LOCK})
+            conn.commit()
+        try:
+            with conn.begin():
+                hechas = aplicadas(conn)
+            for migracion in migraciones():
+                if hasta is not None and migracion.version > hasta:
+                    break
+                if migracion.version in hechas:
+                    if verbose and hechas[migracion.version] != migracion.hash:
+                        print(f"⚠️  {migracion.version:04d}_{migracion.nombre} cambió después de aplicarse")
+                    continue
+                with conn.begin():
+                    for sentencia in sentencias(migracion.sql, engine.dialect.name):
+                        conn.execute(text(sentencia))
+                    conn.execute(text("""
+                        INSERT INTO esquema_migraciones (version, nombre, hash, aplicada)
+                        VALUES (:version, :nombre, :hash, :aplicada)
+                    """), {"version": migracion.version, "nombre": migracion.nombre,
+                           "hash": migracion.hash, "aplicada": datetime.now()})
+                nuevas.append(migracion)
+                if verbose:
+                    print(f"✅ {migracion.version:04d}_{migracion.nombre}")
+        finally:
+            if postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": CLAVE_LOCK})
+                conn.commit()
+    return nuevas
+
+def estado(engine):
+    """Imprime cada migración como aplicada, pendiente o modificada"""
+    with engine.begin() as conn:
+        hechas = aplicadas(conn)
+    for migracion in migraciones():
+        if migracion.version not in hechas:
+            marca = "pendiente"
+        elif hechas[migracion.version] != migracion.hash:
+            marca = "aplicada (el archivo cambió después)"
+        else:
+            marca = "aplicada"
+        print(f"{migracion.version:04d}_{migracion.nombre}: {marca}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estado", action="store_true", help="solo muestra qué migraciones faltan")
+    parser.add_argument("--hasta", type=int, help="aplica hasta esta versión")
+    args = parser.parse_args()
+
+    from db import engine
+    if args.estado:
+        estado(engine)
+    elif not migrar(engine, args.hasta):
+        print("El esquema ya está al día")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Migra todas las contraseñas del formato antiguo salt:sha256 a scrypt.
+
+Como no se conoce la contraseña, el hash antiguo se pasa por scrypt
+(formato scrypt-sha256, ver seguridad.contrasenas.envolver_legado) y al
+siguiente inicio de sesión se reemplaza por un scrypt normal.
+
+Los usuarios se leen por lotes ordenados por id, se hashean en un pool de
+procesos y cada lote se guarda en su propia transacción con un solo UPDATE.
+Si se interrumpe, al volver a correrlo sigue con los que faltan (solo toma
+los que aún no empiezan por "scrypt").
+
+Uso: python migrar_passwords.py [--lote 1000] [--procesos N] [--limite N] [--dry-run]
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text
+from seguridad.contrasenas import envolver_legado
+
+PENDIENTES = "password NOT LIKE 'scrypt%'"
+
+def _migrar(hashed: str) -> str | None:
+    try:
+        return envolver_legado(hashed)
+    except (ValueError, AttributeError):
+        return None
+
+def contar_pendientes(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM usuarios WHERE {PENDIENTES}")).scalar()
+
+def lotes(engine, tamano: int):
+    """Lotes de (id, password) pendientes, por id creciente"""
+    ultimo = 0
+    while True:
+        with engine.connect() as conn:
+            filas = conn.execute(text(f"""
+                SELECT id, password FROM usuarios
+                WHERE id > :ultimo AND {PENDIENTES}
+                ORDER BY id LIMIT :lote
+            """), {"ultimo": ultimo, "lote": tamano}).fetchall()
+        if not filas:
+            return
+        yield filas
+        ultimo = filas[-1][0]
+
+def actualizar(engine, cambios: list[tuple[int, str, str]]) -> int:
+    """Guarda (id, nuevo, anterior) en un solo UPDATE; no pisa hashes que cambiaron mientras tanto"""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            valores = ", ".join(f"(CAST(:i{n} AS INTEGER), :p{n}, :a{n})" for n in range(len(cambios)))
+            params = {}
+            for n, (id_, nuevo, anterior) in enumerate(cambios):
+                params.update({f"i{n}": id_, f"p{n}": nuevo, f"a{n}": anterior})
+            return conn.execute(text(f"""
+                UPDATE usuarios AS u SET password = v.password
+                FROM (VALUES {valores}) AS v(id, password, anterior)
+                WHERE u.id = v.id AND u.password = v.anterior
+            """), params).rowcount
+        return conn.execute(text("UPDATE usuarios SET password = :p WHERE id = :i AND password = :a"),
+                            [{"i": i, "p": p, "a": a} for i, p, a in cambios]).rowcount
+
+def _duracion(segundos: float) -> str:
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}h{minutos:02d}m{segundos:02d}s" if horas else f"{minutos}m{segundos:02d}s"
+
+def migrar(engine, lote: int, procesos: int, limite: int | None = None, dry_run: bool = False) -> dict:
+    total = contar_pendientes(engine)
+    if limite is not None:
+        total = min(total, limite)
+    print(f"🔐 {total} contraseñas por migrar con {procesos} procesos" + (" (dry-run)" if dry_run else ""))
+    estado = {"procesados": 0, "actualizados": 0, "omitidos": 0}
+    inicio = time.perf_counter()
+
+    def guardar(filas, resultados):
+        cambios = [(id_, nuevo, anterior) for (id_, anterior), nuevo in zip(filas, resultados) if nuevo]
+        estado["procesados"] += len(filas)
+        estado["omitidos"] += len(filas) - len(cambios)
+        if cambios and not dry_run:
+            estado["actualizados"] += actualizar(engine, cambios)
+        ritmo = estado["procesados"] / (time.perf_counter() - inicio)
+        print(f"  {estado['procesados']}/{total} ({estado['procesados'] / max(total, 1):.0%}) "
+              f"{ritmo:.0f} usuarios/s, faltan ~{_duracion((total - estado['procesados']) / ritmo)}", flush=True)
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        anterior, leidos = None, 0
+        for filas in lotes(engine, lote):
+            if limite is not None:
+                filas = filas[:limite - leidos]
+                if not filas:
+                    break
+            leidos += len(filas)
+            # map encola el lote entero ya, así que se hashea mientras se guarda el anterior
+            resultados = pool.map(_migrar, [f[1] for f in filas], chunksize=max(1, len(filas) // (procesos * 4)))
+            if anterior:
+                guardar(*anterior)
+            anterior = (filas, resultados)
+            if dry_run:
+                # Basta un lote para medir el ritmo y estimar el total
+                break
+        if anterior:
+            guardar(*anterior)
+
+    estado["segundos"] = round(time.perf_counter() - inicio, 2)
+    if dry_run:
+        ritmo = estado["procesados"] / estado["segundos"] if estado["segundos"] else 0
+        print(f"Dry-run: {estado['procesados']} hasheados sin guardar; "
+              f"el total tomaría ~{_duracion(total / ritmo) if ritmo else '?'}")
+    else:
+        print(f"✅ {estado['actualizados']} actualizadas, {estado['omitidos']} con formato inválido, "
+              f"en {_duracion(estado['segundos'])}")
+    return estado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--limite", type=int, help="migra como máximo esta cantidad de usuarios")
+    parser.add_argument("--dry-run", action="store_true", help="hashea un lote para estimar el tiempo, sin guardar")
+    args = parser.parse_args()
+
+    from db import engine
+    migrar(engine, args.lote, args.procesos, args.limite, args.dry_run)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+import os
+import time
+import hashlib
+import tempfile
+from email.utils import formatdate, parsedate_to_datetime
+import jinja2
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+from estaticos import asset, imagen, MANIFIESTO
+from metricas import PlantillaMedida
+import cache_compartido
+import compresion
+
+PLANTILLAS_DIR = "templates"
+BYTECODE_DIR = os.getenv("PLANTILLAS_BYTECODE_DIR",
+                         os.path.join(tempfile.gettempdir(), "preparicfes-jinja"))
+PAGINAS_CACHE_TTL = int(os.getenv("PAGINAS_CACHE_TTL", "3600"))
+
+os.makedirs(BYTECODE_DIR, exist_ok=True)
+
+# Un solo entorno de Jinja para toda la app; el bytecode compilado se guarda en
+# disco para que otros procesos (o un arranque en frío) no recompilen.
+env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(PLANTILLAS_DIR),
+    autoescape=True,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(BYTECODE_DIR),
+    auto_reload=os.getenv("PLANTILLAS_RECARGAR", "0") == "1",
+)
+env.template_class = PlantillaMedida
+env.globals["asset"] = asset
+env.globals["imagen"] = imagen
+templates = Jinja2Templates(env=env)
+
+# Las plantillas no cambian sin reiniciar, así que el arranque es su Last-Modified
+_LAST_MODIFIED = formatdate(time.time(), usegmt=True)
+
+def _version_plantillas() -> str:
+    """Hash de las plantillas y del manifiesto, para no servir páginas de un despliegue anterior"""
+    h = hashlib.blake2b(digest_size=8)
+    rutas = sorted(os.path.join(raiz, n) for raiz, _, nombres in os.walk(PLANTILLAS_DIR) for n in nombres)
+    for ruta in rutas + [MANIFIESTO]:
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                h.update(ruta.encode() + f.read())
+    return h.hexdigest()
+
+_VERSION = _version_plantillas()
+
+def _no_modificado(request: Request, etag: str) -> bool:
+    if (if_none_match := request.headers.get("if-none-match")) is not None:
+        return compresion.coincide(if_none_match, etag)
+    if if_modified_since := request.headers.get("if-modified-since"):
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(_LAST_MODIFIED)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def pagina_cacheada(request: Request, nombre: str, privada: bool = True, **contexto) -> Response:
+    """Renderiza una plantilla una vez por contexto y responde 304 si el navegador ya la tiene.
+
+    Solo para páginas cuyo HTML depende únicamente de contexto (y de la URL base,
+    porque url_for genera URLs absolutas).
+    """
+    clave = hashlib.blake2b(repr((_VERSION, nombre, str(request.base_url),
+                                  sorted(contexto.items()))).encode(), digest_size=16).hexdigest()
+    if (guardada := cache_compartido.obtener("paginas", clave)) is None:
+        html = env.get_template(nombre).render({"request": request, **contexto}).encode()
+        guardada = (html, compresion.etag(html))
+        cache_compartido.guardar("paginas", clave, guardada, PAGINAS_CACHE_TTL)
+
+    html, etag = guardada
+    headers = {"ETag": etag, "Last-Modified": _LAST_MODIFIED,
+               "Cache-Control": "private, no-cache" if privada else "no-cache"}
+    if _no_modificado(request, etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(html, headers=headers)
+
+def limpiar_paginas():
+    """Vacía la caché de páginas renderizadas"""
+    cache_compartido.invalidar("paginas")
\ No newline at end of file
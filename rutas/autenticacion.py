@@ -1,81 +1,72 @@
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import text
-from db import SessionDepends
+from db import AsyncSessionDepends
+from plantillas import templates, pagina_cacheada
 from datetime import datetime, timedelta
 from seguridad.autenticacion import crear_token
-import hashlib
-import secrets
+from seguridad.contrasenas import hash_password_async, verify_password_async, necesita_rehash
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
-
-def hash_password(password: str) -> str:
-    """Encripta una contraseña usando SHA-256 con salt"""
-    salt = secrets.token_hex(16)
-    pwd_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}:{pwd_hash}"
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica si una contraseña coincide con su hash"""
-    try:
-        salt, pwd_hash = hashed_password.split(":")
-        new_hash = hashlib.sha256((plain_password + salt).encode()).hexdigest()
-        return new_hash == pwd_hash
-    except:
-        return False
 
 @router.get("/", response_class=HTMLResponse, name="index")
 async def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    # index.html lee ?registro= de la petición, así que va en la clave de la caché
+    return pagina_cacheada(request, "index.html", privada=False,
+                           registro=request.query_params.get("registro"))
 
 @router.get("/registrate", response_class=HTMLResponse, name="registrate")
 async def registrate(request: Request):
-    return templates.TemplateResponse("registrate.html", {"request": request})
+    return pagina_cacheada(request, "registrate.html", privada=False)
 
 @router.post("/registrar")
 async def registrar(request: Request, email: str = Form(...), password: str = Form(...), 
-                   grado: str = Form(...), session: SessionDepends = None):
+                   grado: str = Form(...), session: AsyncSessionDepends = None):
     try:
         # Verificar si el usuario ya existe
-        existe = session.execute(text("SELECT id FROM usuarios WHERE email = :email"), 
-                                {"email": email}).fetchone()
+        existe = (await session.execute(text("SELECT id FROM usuarios WHERE email = :email"), 
+                                {"email": email})).fetchone()
         if existe:
             return templates.TemplateResponse("registrate.html", 
                 {"request": request, "error": "Este correo ya está registrado"})
         
         # Encriptar la contraseña
-        password_encriptada = hash_password(password)
+        password_encriptada = await hash_password_async(password)
         
         # Crear usuario
-        session.execute(text("""
+        await session.execute(text("""
             INSERT INTO usuarios (email, password, grado, fecha_registro)
             VALUES (:email, :password, :grado, :fecha)
         """), {"email": email, "password": password_encriptada, "grado": grado, "fecha": datetime.now()})
-        session.commit()
+        await session.commit()
         
         return RedirectResponse(url="/?registro=exitoso", status_code=303)
         
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         return templates.TemplateResponse("registrate.html", 
             {"request": request, "error": f"Error: {str(e)}"})
 
 @router.post("/login")
 async def login(request: Request, email: str = Form(...), password: str = Form(...), 
-               session: SessionDepends = None):
+               session: AsyncSessionDepends = None):
     try:
         # Buscar usuario
-        usuario = session.execute(text("""
+        usuario = (await session.execute(text("""
             SELECT id, password, grado FROM usuarios WHERE email = :email
-        """), {"email": email}).fetchone()
+        """), {"email": email})).fetchone()
         
         # Verificar contraseña
-        if not usuario or not verify_password(password, usuario[1]):
+        if not usuario or not await verify_password_async(password, usuario[1]):
             return templates.TemplateResponse("index.html", 
                 {"request": request, "error": "Correo o contraseña incorrectos"})
         
+        # Migrar hashes antiguos (salt:sha256) al formato actual
+        if necesita_rehash(usuario[1]):
+            await session.execute(text("UPDATE usuarios SET password = :pass WHERE id = :id"),
+                                  {"pass": await hash_password_async(password), "id": usuario[0]})
+            await session.commit()
+        
         # Crear token de sesión
         token_sesion = crear_token(
             data={"user_id": usuario[0], "grado": usuario[2]},
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse
+from db import AsyncSessionDepends
+from seguridad.autenticacion import requerir_autenticacion
+from servicios.catalogo import MATERIAS_BD, obtener_area_id, obtener_grado_id, numero_grado
+from servicios.estadisticas import obtener_tablero, resumen, ranking, TOP_N
+from esquemas import EstadisticasArea, Ranking
+
+router = APIRouter()
+
+# Directo y no con HTTPException, que el manejador global convierte en redirección a "/"
+NO_ENCONTRADO = JSONResponse({"detail": "Materia, grado o área no encontrados"}, status_code=404)
+
+async def _tablero(session, materia: str, grado: int):
+    """Tablero del (grado, área), o None si la materia o el grado no están en el catálogo"""
+    if materia not in MATERIAS_BD:
+        return None
+    area_id = await obtener_area_id(session, materia)
+    grado_id = await obtener_grado_id(session, grado)
+    if not area_id or not grado_id:
+        return None
+    return await obtener_tablero(session, grado_id, area_id)
+
+@router.get("/api/estadisticas/{materia}", response_model=EstadisticasArea)
+async def estadisticas_area(materia: str, grado: int | None = None,
+                            usuario: dict = Depends(requerir_autenticacion),
+                            session: AsyncSessionDepends = None):
+    """Intentos, promedio e histograma de puntajes de una materia (por defecto, del grado del usuario)"""
+    grado = grado if grado is not None else numero_grado(usuario["grado"])
+    if (tablero := await _tablero(session, materia, grado)) is None:
+        return NO_ENCONTRADO
+    return EstadisticasArea(materia=materia, grado=grado, **resumen(tablero))
+
+@router.get("/api/ranking/{materia}", response_model=Ranking)
+async def ranking_area(materia: str, grado: int | None = None, limite: int = Query(10, ge=1, le=TOP_N),
+                       usuario: dict = Depends(requerir_autenticacion),
+                       session: AsyncSessionDepends = None):
+    """Mejores puntajes de una materia, uno por estudiante (por defecto, del grado del usuario)"""
+    grado = grado if grado is not None else numero_grado(usuario["grado"])
+    if (tablero := await _tablero(session, materia, grado)) is None:
+        return NO_ENCONTRADO
+    return Ranking(materia=materia, grado=grado, mejores=ranking(tablero, usuario["user_id"], limite))
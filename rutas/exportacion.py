@@ -0,0 +1,32 @@
+from datetime import date
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse, PlainTextResponse
+import db
+from configuracion import ajustes
+from servicios.exportacion import crear_escritor, exportar_async, consulta, ExportacionInvalida
+
+router = APIRouter()
+
+@router.get("/api/exportar/resultados")
+async def exportar_resultados(request: Request, formato: str = "csv", grado: int | None = None,
+                              materia: str | None = None, desde: date | None = None,
+                              hasta: date | None = None):
+    """Descarga los resultados de todos los estudiantes (requiere EXPORTAR_TOKEN)"""
+    token = ajustes.exportar_token
+    if not token or request.headers.get("authorization") != f"Bearer {token}":
+        return PlainTextResponse("No autorizado", status_code=401)
+
+    filtros = {"grado": grado, "materia": materia, "desde": desde, "hasta": hasta}
+    try:
+        consulta(**filtros)
+        escritor = crear_escritor(formato)
+    except ExportacionInvalida as e:
+        # Una HTTPException acabaría en la redirección a "/" del manejador global
+        return PlainTextResponse(str(e), status_code=400)
+
+    return StreamingResponse(
+        exportar_async(db.async_engine, escritor, filtros),
+        media_type=escritor.media_type,
+        headers={"Content-Disposition": f'attachment; filename="resultados.{escritor.extension}"',
+                 "Cache-Control": "no-store"}
+    )
\ No newline at end of file
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Request, Depends, HTTPException
+from fastapi.responses import FileResponse, Response
+from db import AsyncSessionDepends
+from seguridad.autenticacion import requerir_autenticacion
+from servicios.imagenes import obtener_variante, ImagenNoDisponible, TIPOS
+
+router = APIRouter()
+
+# La URL cambia si cambia la imagen, así que el navegador la guarda un año sin revalidar.
+# Es private porque las preguntas solo se ven con sesión iniciada.
+CACHE_IMAGENES = "private, max-age=31536000, immutable"
+
+@router.get("/imagenes/preguntas/{pregunta_id}/{version}/{variante}")
+async def imagen_pregunta(request: Request, pregunta_id: int, version: str, variante: str,
+                          usuario: dict = Depends(requerir_autenticacion),
+                          session: AsyncSessionDepends = None):
+    """Imagen de una pregunta en un ancho y formato (variante = "640.webp")"""
+    ancho, _, formato = variante.partition(".")
+    if not ancho.isdigit():
+        raise HTTPException(status_code=404, detail="Variante no encontrada")
+    try:
+        ruta, etag = await obtener_variante(session, pregunta_id, version, int(ancho), formato)
+    except ImagenNoDisponible as e:
+        return Response(str(e), status_code=404, media_type="text/plain; charset=utf-8")
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_IMAGENES}
+    if etag in (e.strip() for e in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(ruta, media_type=TIPOS[formato], headers=headers)
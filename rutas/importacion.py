@@ -0,0 +1,33 @@
+import io
+from fastapi import APIRouter, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+import db
+from configuracion import ajustes
+from servicios.catalogo import CatalogoError
+from servicios.importacion import importar, formato_de, FORMATOS
+
+router = APIRouter()
+
+@router.post("/api/admin/preguntas/importar")
+async def importar_preguntas(request: Request, archivo: UploadFile = File(...),
+                             formato: str | None = Form(None), solo_validar: bool = Form(False),
+                             estricto: bool = Form(False)):
+    """Importa un banco de preguntas CSV/JSON (requiere ADMIN_TOKEN)"""
+    token = ajustes.admin_token
+    if not token or request.headers.get("authorization") != f"Bearer {token}":
+        return PlainTextResponse("No autorizado", status_code=401)
+
+    # Los errores se responden directamente: una HTTPException acabaría en la redirección a "/"
+    formato = formato or formato_de(archivo.filename or "")
+    if formato not in FORMATOS:
+        detalle = (f"Formato no soportado: {formato}" if formato else
+                   f"No se reconoce la extensión de {archivo.filename!r}; indique formato (csv, json o jsonl)")
+        return JSONResponse({"detail": detalle}, status_code=400)
+    texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    try:
+        # La carga usa el engine síncrono (COPY), así que va en un hilo aparte
+        return await run_in_threadpool(importar, db.engine, texto, formato,
+                                       solo_validar=solo_validar, estricto=estricto)
+    except (CatalogoError, ValueError, UnicodeDecodeError) as e:
+        return JSONResponse({"detail": str(e)}, status_code=400)
\ No newline at end of file
@@ -1,34 +1,24 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from seguridad.autenticacion import requerir_autenticacion
+from plantillas import pagina_cacheada
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 @router.get("/intro", response_class=HTMLResponse, name="intro")
 async def intro(request: Request, usuario: dict = Depends(requerir_autenticacion)):
     """Página de introducción - requiere estar autenticado"""
-    return templates.TemplateResponse("intro.html", {
-        "request": request,
-        "user_id": usuario["user_id"],
-        "grado": usuario["grado"]
-    })
+    return pagina_cacheada(request, "intro.html",
+                           user_id=usuario["user_id"], grado=usuario["grado"])
 
 @router.get("/criterio", response_class=HTMLResponse, name="criterio")
 async def criterio(request: Request, usuario: dict = Depends(requerir_autenticacion)):
     """Página de criterios - requiere estar autenticado"""
-    return templates.TemplateResponse("criterio.html", {
-        "request": request,
-        "user_id": usuario["user_id"],
-        "grado": usuario["grado"]
-    })
+    return pagina_cacheada(request, "criterio.html",
+                           user_id=usuario["user_id"], grado=usuario["grado"])
 
 @router.get("/competencias", response_class=HTMLResponse, name="competencias")
 async def competencias(request: Request, usuario: dict = Depends(requerir_autenticacion)):
     """Página de competencias - requiere estar autenticado"""
-    return templates.TemplateResponse("competencias.html", {
-        "request": request,
-        "user_id": usuario["user_id"],
-        "grado": usuario["grado"]
-    })
\ No newline at end of file
+    return pagina_cacheada(request, "competencias.html",
+                           user_id=usuario["user_id"], grado=usuario["grado"])
\ No newline at end of file
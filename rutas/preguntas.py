@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import text
-from db import SessionDepends
+from fastapi.responses import HTMLResponse, Response, JSONResponse
+from db import AsyncSessionDepends
+from plantillas import templates
 from seguridad.autenticacion import requerir_autenticacion
-from datetime import datetime
+from servicios.catalogo import MATERIAS_BD, obtener_area_id, obtener_grado_id
+from servicios.examenes import obtener_examen
+from servicios.ingesta import guardar_intentos, IntentoInvalido
+from servicios.resumen_resultados import obtener_ultimos
+from esquemas import Examen, RespuestasGuardadas, LoteGuardado
+import compresion
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 # Configuración de materias
 MATERIAS = {
@@ -18,14 +21,6 @@ MATERIAS = {
     "ciencias": {"nombre": "Ciencias Naturales", "color": "#C7F683", "img": "cienciasonriosa.png"}
 }
 
-MATERIAS_BD = {
-    "matematicas": ["Matemáticas", "Matematicas", "MATEMÁTICAS"],
-    "ingles": ["Inglés", "Ingles", "INGLÉS", "English"],
-    "sociales": ["Ciencias Sociales", "Sociales y Ciudadanas", "Sociales"],
-    "lectura": ["Lectura Crítica", "Lectura Critica"],
-    "ciencias": ["Ciencias Naturales", "Ciencias"]
-}
-
 @router.get("/preguntas/{materia}", response_class=HTMLResponse)
 async def preguntas(request: Request, materia: str, 
                    usuario: dict = Depends(requerir_autenticacion)):
@@ -44,164 +39,109 @@ async def preguntas(request: Request, materia: str,
         "grado": usuario["grado"]
     })
 
-@router.get("/api/preguntas/{materia}")
+@router.get("/api/preguntas/{materia}", response_model=Examen)
 async def obtener_preguntas(materia: str, usuario: dict = Depends(requerir_autenticacion),
-                           session: SessionDepends = None):
+                           session: AsyncSessionDepends = None):
     """API para obtener las preguntas de una materia"""
     try:
-        # Buscar el área
-        nombres = MATERIAS_BD.get(materia)
-        if not nombres:
-            raise HTTPException(status_code=404, detail="Materia no encontrada")
-        
-        area_id = None
-        for nombre in nombres:
-            result = session.execute(text("SELECT id FROM areas WHERE nombre_materia = :n"), 
-                                   {"n": nombre}).fetchone()
-            if result:
-                area_id = result[0]
-                break
+        # Buscar el área en el catálogo. Los 404 van directos: con HTTPException el
+        # manejador global redirigiría a "/" y el quiz recibiría HTML
+        if materia not in MATERIAS_BD:
+            return JSONResponse({"detail": "Materia no encontrada"}, status_code=404)
         
+        area_id = await obtener_area_id(session, materia)
         if not area_id:
-            raise HTTPException(status_code=404, detail="Área no encontrada")
-        
-        # Convertir grado a número
-        grados = {"9": 9, "10": 10, "11": 11}
-        grado_num = grados.get(str(usuario["grado"]), int(usuario["grado"]))
+            return JSONResponse({"detail": "Área no encontrada"}, status_code=404)
         
         # Obtener ID del grado
-        grado_id = session.execute(text("SELECT id FROM grado WHERE numero_grado = :n"), 
-                                  {"n": grado_num}).scalar()
+        grado_id = await obtener_grado_id(session, usuario["grado"])
         if not grado_id:
-            raise HTTPException(status_code=404, detail="Grado no encontrado")
+            return JSONResponse({"detail": "Grado no encontrado"}, status_code=404)
         
-        # Obtener 6 preguntas aleatorias
-        preguntas = session.execute(text("""
-            SELECT id, enunciado, opcion_a, opcion_b, opcion_c, opcion_d, 
-                   imagen, respuesta_correcta
-            FROM preguntas WHERE id_areas = :area AND id_grado = :grado
-            ORDER BY RANDOM() LIMIT 6
-        """), {"area": area_id, "grado": grado_id}).fetchall()
-        
-        return {
-            "preguntas": [{
-                "id": p[0], "numero": i+1, "enunciado": p[1],
-                "opcion_a": p[2], "opcion_b": p[3], "opcion_c": p[4], "opcion_d": p[5],
-                "imagen": p[6], "respuesta_correcta": p[7]
-            } for i, p in enumerate(preguntas)],
-            "total": len(preguntas)
-        }
+        # Examen pregenerado (JSON ya serializado, sin ir a la BD); con el ETag
+        # fuerte su versión comprimida se guarda y se reutiliza
+        examen = await obtener_examen(session, usuario["user_id"], area_id, grado_id)
+        return Response(content=examen, media_type="application/json",
+                        headers={"ETag": compresion.etag(examen), "Cache-Control": "private, no-cache"})
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/api/guardar-respuestas")
+@router.post("/api/guardar-respuestas", response_model=RespuestasGuardadas)
 async def guardar_respuestas(request: Request, usuario: dict = Depends(requerir_autenticacion),
-                            session: SessionDepends = None):
+                            session: AsyncSessionDepends = None):
     """Guarda las respuestas del estudiante"""
     try:
         data = await request.json()
-        materia = data.get("materia")
-        respuestas = data.get("respuestas", [])
-        
-        if not all([materia, respuestas]):
-            raise HTTPException(status_code=400, detail="Datos incompletos")
+        intento = {"materia": data.get("materia"), "examen": data.get("examen"),
+                   "respuestas": data.get("respuestas", [])}
         
-        user_id = usuario["user_id"]
+        # Calificar y guardar el resultado con sus respuestas
+        resumen = (await guardar_intentos(session, usuario, [intento]))[0]
+        await session.commit()
         
-        # Calcular puntaje
-        correctas = sum(1 for r in respuestas if r.get("correcta"))
-        total = len(respuestas)
-        puntaje = (correctas / total) * 100 if total > 0 else 0
+        return RespuestasGuardadas(**resumen)
         
-        # Obtener o crear estudiante
-        est = session.execute(text("SELECT id FROM estudiantes WHERE id_usuario = :id"), 
-                            {"id": user_id}).fetchone()
-        
-        if not est:
-            grados = {"9": 9, "10": 10, "11": 11}
-            grado_num = grados.get(str(usuario["grado"]), int(usuario["grado"]))
-            grado_id = session.execute(text("SELECT id FROM grado WHERE numero_grado = :n"), 
-                                     {"n": grado_num}).scalar()
-            
-            est_id = session.execute(text("""
-                INSERT INTO estudiantes (id_usuario, id_grado) VALUES (:u, :g) RETURNING id
-            """), {"u": user_id, "g": grado_id}).scalar()
-        else:
-            est_id = est[0]
-        
-        # Obtener ID del área
-        nombres = MATERIAS_BD.get(materia, [])
-        area_id = None
-        for nombre in nombres:
-            result = session.execute(text("SELECT id FROM areas WHERE nombre_materia = :n"), 
-                                   {"n": nombre}).fetchone()
-            if result:
-                area_id = result[0]
-                break
+    except IntentoInvalido as e:
+        await session.rollback()
+        # Igual que en el lote: el quiz muestra el motivo en vez de seguir la redirección
+        return JSONResponse({"detail": str(e)}, status_code=400)
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/api/guardar-respuestas/lote", response_model=LoteGuardado)
+async def guardar_respuestas_lote(request: Request, usuario: dict = Depends(requerir_autenticacion),
+                                  session: AsyncSessionDepends = None):
+    """Guarda varios intentos de una vez (p. ej. salones sin conexión que sincronizan después)"""
+    try:
+        data = await request.json()
+        intentos = data.get("intentos") or []
+        if not isinstance(intentos, list) or not intentos:
+            raise IntentoInvalido("Datos incompletos")
         
-        # Guardar resultado
-        session.execute(text("""
-            INSERT INTO resultados (id_estudiantes, id_areas, fecha, puntaje_final)
-            VALUES (:est, :area, :fecha, :puntaje)
-        """), {"est": est_id, "area": area_id, "fecha": datetime.now(), "puntaje": int(puntaje)})
-        session.commit()
+        resultados = await guardar_intentos(session, usuario, intentos)
+        await session.commit()
         
-        return {"success": True, "correctas": correctas, "total": total, "puntaje": round(puntaje, 2)}
+        return LoteGuardado(guardados=len(resultados), resultados=resultados)
         
+    except IntentoInvalido as e:
+        await session.rollback()
+        # Directo y no con HTTPException, que el manejador global convierte en redirección:
+        # quien sincroniza el lote necesita saber qué intento falló
+        return JSONResponse({"detail": str(e)}, status_code=400)
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/Resul", response_class=HTMLResponse, name="Resul")
 async def resultados(request: Request, usuario: dict = Depends(requerir_autenticacion),
-                    session: SessionDepends = None):
+                    session: AsyncSessionDepends = None):
     """Muestra los resultados del estudiante"""
     try:
-        # Buscar estudiante
-        est = session.execute(text("SELECT id FROM estudiantes WHERE id_usuario = :id"), 
-                            {"id": usuario["user_id"]}).fetchone()
+        # Último resultado por materia (tabla resumen, una sola consulta)
+        results = await obtener_ultimos(session, usuario["user_id"])
         resultados = []
         
-        if est:
-            est_id = est[0]
-            
-            # Obtener solo el resultado más reciente por materia
-            results = session.execute(text("""
-                WITH UltimosResultados AS (
-                    SELECT 
-                        id_areas,
-                        puntaje_final,
-                        ROW_NUMBER() OVER (PARTITION BY id_areas ORDER BY fecha DESC) as rn
-                    FROM resultados
-                    WHERE id_estudiantes = :id
-                )
-                SELECT a.nombre_materia, ur.puntaje_final
-                FROM UltimosResultados ur
-                JOIN areas a ON ur.id_areas = a.id
-                WHERE ur.rn = 1
-                ORDER BY a.nombre_materia
-            """), {"id": est_id}).fetchall()
+        # Calcular desempeño
+        for r in results:
+            puntaje = r[1]
+            if puntaje >= 90:
+                desempeno = "Superior"
+            elif puntaje >= 70:
+                desempeno = "Alto"
+            elif puntaje >= 50:
+                desempeno = "Medio"
+            else:
+                desempeno = "Bajo"
             
-            # Calcular desempeño
-            for r in results:
-                puntaje = r[1]
-                if puntaje >= 90:
-                    desempeno = "Superior"
-                elif puntaje >= 70:
-                    desempeno = "Alto"
-                elif puntaje >= 50:
-                    desempeno = "Medio"
-                else:
-                    desempeno = "Bajo"
-                
-                resultados.append({
-                    "materia": r[0],
-                    "puntaje": puntaje,
-                    "desempeno": desempeno
-                })
+            resultados.append({
+                "materia": r[0],
+                "puntaje": puntaje,
+                "desempeno": desempeno
+            })
         
         # Calcular promedio
         promedio = sum(r["puntaje"] for r in resultados) / len(resultados) if resultados else 0
@@ -1,38 +1,22 @@
 from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import text
-from db import SessionDepends
+from db import AsyncSessionDepends
+from plantillas import templates
 from seguridad.autenticacion import requerir_autenticacion, crear_token
+from seguridad.contrasenas import hash_password_async, verify_password_async
+from servicios.estadisticas import restar_estudiante, invalidar_estadisticas
 from datetime import timedelta
-import hashlib
-import secrets
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
-
-def hash_password(password: str) -> str:
-    """Encripta una contraseña usando SHA-256 con salt"""
-    salt = secrets.token_hex(16)
-    pwd_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-    return f"{salt}:{pwd_hash}"
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica si una contraseña coincide con su hash"""
-    try:
-        salt, pwd_hash = hashed_password.split(":")
-        new_hash = hashlib.sha256((plain_password + salt).encode()).hexdigest()
-        return new_hash == pwd_hash
-    except:
-        return False
 
 @router.get("/usuario", response_class=HTMLResponse, name="usuario")
 async def usuario(request: Request, usuario: dict = Depends(requerir_autenticacion), 
-                 session: SessionDepends = None):
+                 session: AsyncSessionDepends = None):
     """Página de gestión de usuario"""
     try:
-        datos = session.execute(text("SELECT email, grado FROM usuarios WHERE id = :id"), 
-                              {"id": usuario["user_id"]}).fetchone()
+        datos = (await session.execute(text("SELECT email, grado FROM usuarios WHERE id = :id"), 
+                              {"id": usuario["user_id"]})).fetchone()
         if not datos:
             return RedirectResponse(url="/")
         
@@ -49,24 +33,24 @@ async def usuario(request: Request, usuario: dict = Depends(requerir_autenticaci
 async def editar(request: Request, new_email: str = Form(...),
                 new_password: str = Form(None), new_grado: str = Form(...),
                 usuario: dict = Depends(requerir_autenticacion),
-                session: SessionDepends = None):
+                session: AsyncSessionDepends = None):
     """Editar datos del usuario"""
     try:
         user_id = usuario["user_id"]
         
         if new_password:
             # Si hay nueva contraseña, encriptarla
-            password_encriptada = hash_password(new_password)
-            session.execute(text("""
+            password_encriptada = await hash_password_async(new_password)
+            await session.execute(text("""
                 UPDATE usuarios SET email = :email, password = :pass, grado = :grado 
                 WHERE id = :id
             """), {"email": new_email, "pass": password_encriptada, "grado": new_grado, "id": user_id})
         else:
-            session.execute(text("""
+            await session.execute(text("""
                 UPDATE usuarios SET email = :email, grado = :grado WHERE id = :id
             """), {"email": new_email, "grado": new_grado, "id": user_id})
         
-        session.commit()
+        await session.commit()
         
         # Crear nuevo token con los datos actualizados
         nuevo_token = crear_token(
@@ -85,36 +69,40 @@ async def editar(request: Request, new_email: str = Form(...),
         
         return response
     except:
-        session.rollback()
+        await session.rollback()
         return RedirectResponse(url="/usuario", status_code=303)
 
 @router.post("/eliminar-usuario")
 async def eliminar(request: Request, confirm_password: str = Form(...),
                   usuario: dict = Depends(requerir_autenticacion),
-                  session: SessionDepends = None):
+                  session: AsyncSessionDepends = None):
     """Eliminar cuenta de usuario"""
     try:
         user_id = usuario["user_id"]
         
         # Verificar contraseña antes de eliminar
-        datos_usuario = session.execute(text("SELECT password FROM usuarios WHERE id = :id"), 
-                                {"id": user_id}).fetchone()
+        datos_usuario = (await session.execute(text("SELECT password FROM usuarios WHERE id = :id"), 
+                                {"id": user_id})).fetchone()
         
-        if not datos_usuario or not verify_password(confirm_password, datos_usuario[0]):
+        if not datos_usuario or not await verify_password_async(confirm_password, datos_usuario[0]):
             return RedirectResponse(url="/usuario", status_code=303)
         
         # Eliminar estudiante y resultados
-        estudiante = session.execute(text("SELECT id FROM estudiantes WHERE id_usuario = :id"), 
-                                    {"id": user_id}).fetchone()
+        estudiante = (await session.execute(text("SELECT id FROM estudiantes WHERE id_usuario = :id"), 
+                                    {"id": user_id})).fetchone()
         
         if estudiante:
             est_id = estudiante[0]
-            session.execute(text("DELETE FROM resultados WHERE id_estudiantes = :id"), {"id": est_id})
-            session.execute(text("DELETE FROM estudiantes WHERE id = :id"), {"id": est_id})
+            await session.execute(text("DELETE FROM ultimos_resultados WHERE id_estudiantes = :id"), {"id": est_id})
+            await restar_estudiante(session, est_id)
+            await session.execute(text("DELETE FROM resultados WHERE id_estudiantes = :id"), {"id": est_id})
+            await session.execute(text("DELETE FROM estudiantes WHERE id = :id"), {"id": est_id})
         
         # Eliminar usuario
-        session.execute(text("DELETE FROM usuarios WHERE id = :id"), {"id": user_id})
-        session.commit()
+        await session.execute(text("DELETE FROM usuarios WHERE id = :id"), {"id": user_id})
+        await session.commit()
+        if estudiante:
+            invalidar_estadisticas()
         
         # Cerrar sesión
         response = RedirectResponse(url="/", status_code=303)
@@ -122,5 +110,5 @@ async def eliminar(request: Request, confirm_password: str = Form(...),
         return response
         
     except:
-        session.rollback()
+        await session.rollback()
         return RedirectResponse(url="/usuario", status_code=303)
\ No newline at end of file
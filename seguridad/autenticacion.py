@@ -1,51 +1,67 @@
 import os
+import time
 import hashlib
-import secrets
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from fastapi import Request, HTTPException
-from jose import JWTError, jwt
-from dotenv import load_dotenv
+from configuracion import ajustes
 
-load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
+SECRET_KEY = ajustes.secret_key
+ALGORITHM = ajustes.algoritmo_jwt
+JWT_CACHE_TAMANO = int(os.getenv("JWT_CACHE_TAMANO", "10000"))
 
-def hash_password(password: str) -> str:
-    """Encripta contraseña con SHA-256 y salt"""
-    salt = secrets.token_hex(16)
-    pwd_hash = hashlib.sha256(f"{password}{salt}".encode()).hexdigest()
-    return f"{salt}:{pwd_hash}"
-
-def verify_password(plain: str, hashed: str) -> bool:
-    """Verifica contraseña"""
-    try:
-        salt, pwd_hash = hashed.split(":")
-        return hashlib.sha256(f"{plain}{salt}".encode()).hexdigest() == pwd_hash
-    except:
-        return False
+# sha256(token) -> (usuario, exp). Solo guarda tokens válidos, hasta su exp.
+_tokens: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+_tokens_lock = threading.Lock()
 
 def crear_token(data: dict, expires_delta: timedelta = None) -> str:
     """Crea JWT"""
+    # jose (y cryptography) se importan al primer uso: la página de inicio no los necesita
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=480))
     to_encode["exp"] = expire
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def verificar_token(token: str) -> dict | None:
-    """Decodifica JWT"""
+def _decodificar_token(token: str) -> tuple[dict, float] | None:
+    """Verifica la firma del JWT y devuelve (usuario, exp)"""
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if (user_id := payload.get("user_id")) and (grado := payload.get("grado")):
-            return {"user_id": user_id, "grado": grado}
+            return {"user_id": user_id, "grado": grado}, float(payload.get("exp", 0))
     except JWTError:
         pass
     return None
 
+def verificar_token(token: str) -> dict | None:
+    """Decodifica JWT, usando la caché LRU de tokens ya verificados"""
+    clave = hashlib.sha256(token.encode()).digest()
+    with _tokens_lock:
+        if (guardado := _tokens.get(clave)) is not None:
+            if guardado[1] > time.time():
+                _tokens.move_to_end(clave)
+                return dict(guardado[0])
+            del _tokens[clave]
+
+    if not (decodificado := _decodificar_token(token)):
+        return None
+    with _tokens_lock:
+        _tokens[clave] = decodificado
+        if len(_tokens) > JWT_CACHE_TAMANO:
+            _tokens.popitem(last=False)
+    return dict(decodificado[0])
+
 def obtener_usuario_actual(request: Request) -> dict | None:
-    """Obtiene usuario del token en cookies"""
+    """Obtiene usuario del token en cookies (una sola vez por petición)"""
+    if hasattr(request.state, "usuario"):
+        return request.state.usuario
+    usuario = None
     if token := request.cookies.get("access_token"):
-        return verificar_token(token)
-    return None
+        usuario = verificar_token(token)
+    request.state.usuario = usuario
+    return usuario
 
 def requerir_autenticacion(request: Request) -> dict:
     """Valida autenticación o redirige"""
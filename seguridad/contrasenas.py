@@ -0,0 +1,69 @@
+import os
+import hmac
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+# Costo de scrypt: n=2**14, r=8 usa 16 MiB por hash
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SCRYPT_P", "1"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# hashlib.scrypt suelta el GIL, así que un pool de hilos usa varios núcleos
+_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash")
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=2 * 128 * n * r * p + 1024 * 1024, dklen=32)
+
+def hash_password(password: str) -> str:
+    """Encripta contraseña con scrypt: scrypt$n$r$p$salt$hash"""
+    salt = secrets.token_bytes(16)
+    pwd_hash = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${pwd_hash.hex()}"
+
+def _sha256_legado(plain: str, salt: str) -> str:
+    return hashlib.sha256(f"{plain}{salt}".encode()).hexdigest()
+
+def envolver_legado(hashed: str) -> str:
+    """Pasa un hash antiguo salt:sha256 por scrypt sin conocer la contraseña.
+
+    Formato: scrypt-sha256$n$r$p$salt_antiguo$salt$hash. Al iniciar sesión se
+    reemplaza por un scrypt normal (necesita_rehash lo marca).
+    """
+    salt_legado, pwd_legado = hashed.split(":")
+    if "$" in salt_legado:
+        raise ValueError("Salt antiguo con '$'")
+    salt = secrets.token_bytes(16)
+    pwd_hash = _scrypt(pwd_legado, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt-sha256${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt_legado}${salt.hex()}${pwd_hash.hex()}"
+
+def verify_password(plain: str, hashed: str) -> bool:
+    """Verifica contraseña en formato scrypt, scrypt-sha256 o en el antiguo salt:sha256"""
+    try:
+        if hashed.startswith("scrypt$"):
+            _, n, r, p, salt, pwd_hash = hashed.split("$")
+            calculado = _scrypt(plain, bytes.fromhex(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(calculado.hex(), pwd_hash)
+        if hashed.startswith("scrypt-sha256$"):
+            _, n, r, p, salt_legado, salt, pwd_hash = hashed.split("$")
+            calculado = _scrypt(_sha256_legado(plain, salt_legado), bytes.fromhex(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(calculado.hex(), pwd_hash)
+        salt, pwd_hash = hashed.split(":")
+        return hmac.compare_digest(_sha256_legado(plain, salt), pwd_hash)
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+def necesita_rehash(hashed: str) -> bool:
+    """True si el hash es del formato antiguo (o envuelto) o tiene otro costo"""
+    return not hashed.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+async def hash_password_async(password: str) -> str:
+    """hash_password en el pool de hilos, sin bloquear el event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_pool, hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password en el pool de hilos, sin bloquear el event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_pool, verify_password, plain, hashed)
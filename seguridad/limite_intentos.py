@@ -0,0 +1,117 @@
+"""Límite de intentos de contraseña por IP y por cuenta (ventana deslizante).
+
+Es un middleware ASGI: rechaza con 429 antes de que la petición llegue a la
+ruta, así que un ataque de fuerza bruta no consume conexiones de la BD ni
+tiempo de scrypt. La ventana deslizante se aproxima con dos contadores fijos
+(ventana actual y anterior, ponderada por el tiempo transcurrido), así que
+cada clave ocupa dos enteros.
+
+Con un solo worker los contadores viven en memoria; si CACHE_BACKEND es
+compartido (sqlite o redis) se usan sus contadores atómicos.
+"""
+import os
+import time
+import math
+from urllib.parse import parse_qs
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+import cache_compartido
+from configuracion import ajustes
+from plantillas import templates
+from seguridad.autenticacion import verificar_token
+
+LIMITE_IP = int(os.getenv("LIMITE_LOGIN_IP", "300"))
+VENTANA_IP = int(os.getenv("LIMITE_LOGIN_IP_VENTANA", "60"))
+LIMITE_CUENTA = int(os.getenv("LIMITE_LOGIN_CUENTA", "10"))
+VENTANA_CUENTA = int(os.getenv("LIMITE_LOGIN_CUENTA_VENTANA", "900"))
+LIMITE_CLAVES = int(os.getenv("LIMITE_CLAVES", "200000"))
+# Detrás de un proxy de confianza (Vercel) la IP real llega en X-Forwarded-For
+CONFIAR_PROXY = os.getenv("LIMITE_CONFIAR_PROXY", "1" if ajustes.vercel else "0") == "1"
+# Proxies propios delante de la app: cada uno agrega una IP a la derecha del
+# X-Forwarded-For, y lo que queda a su izquierda lo puede inventar el cliente
+PROXIES_CONFIABLES = max(1, int(os.getenv("LIMITE_PROXIES_CONFIABLES", "1")))
+# Formularios de login más grandes que esto no son de la app
+MAX_CUERPO = 16 * 1024
+
+_backend = (cache_compartido.BackendMemoria(LIMITE_CLAVES)
+            if isinstance(cache_compartido.backend, cache_compartido.BackendMemoria)
+            else cache_compartido.backend)
+
+def registrar_intento(clave: str, limite: int, ventana: int, ahora: float | None = None) -> int:
+    """Cuenta un intento y devuelve 0 si está dentro del límite o los segundos a esperar"""
+    ahora = time.time() if ahora is None else ahora
+    indice, transcurrido = divmod(ahora, ventana)
+    actual = _backend.incrementar(f"limite:{clave}:{int(indice)}", ventana * 2)
+    anterior = _backend.contador(f"limite:{clave}:{int(indice) - 1}") if actual <= limite else 0
+    if actual + anterior * (1 - transcurrido / ventana) <= limite:
+        return 0
+    return max(1, math.ceil(ventana - transcurrido))
+
+def ip_cliente(scope) -> str:
+    """IP que agregó el proxy de confianza más externo, o la del socket"""
+    if CONFIAR_PROXY:
+        # Varias cabeceras X-Forwarded-For equivalen a una sola unida con comas
+        ips = [ip.strip() for nombre, valor in scope["headers"] if nombre == b"x-forwarded-for"
+               for ip in valor.decode("latin-1").split(",") if ip.strip()]
+        if len(ips) >= PROXIES_CONFIABLES:
+            return ips[-PROXIES_CONFIABLES]
+    return scope["client"][0] if scope.get("client") else "desconocida"
+
+def _cuenta_login(cuerpo: bytes) -> str | None:
+    emails = parse_qs(cuerpo.decode("utf-8", "replace")).get("email")
+    return emails[0].strip().lower() if emails else None
+
+def _cuenta_sesion(scope) -> str | None:
+    cookies = Request(scope).cookies
+    usuario = verificar_token(cookies["access_token"]) if "access_token" in cookies else None
+    return f"usuario:{usuario['user_id']}" if usuario else None
+
+# Ruta -> cómo obtener la cuenta a la que apunta el intento
+RUTAS = {
+    "/login": lambda scope, cuerpo: _cuenta_login(cuerpo),
+    "/eliminar-usuario": lambda scope, cuerpo: _cuenta_sesion(scope),
+}
+
+class LimiteIntentos:
+    """Middleware ASGI que aplica los límites a las rutas de RUTAS"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in RUTAS:
+            return await self.app(scope, receive, send)
+
+        # Leer el formulario (es pequeño) para saber la cuenta y luego reenviarlo a la ruta
+        cuerpo = b""
+        while True:
+            mensaje = await receive()
+            cuerpo += mensaje.get("body", b"")
+            if len(cuerpo) > MAX_CUERPO:
+                return await PlainTextResponse("Formulario demasiado grande", status_code=413)(scope, receive, send)
+            if not mensaje.get("more_body"):
+                break
+
+        espera = registrar_intento(f"ip:{ip_cliente(scope)}", LIMITE_IP, VENTANA_IP)
+        if not espera and (cuenta := RUTAS[scope["path"]](scope, cuerpo)):
+            espera = registrar_intento(f"cuenta:{cuenta}", LIMITE_CUENTA, VENTANA_CUENTA)
+        if espera:
+            mensaje = f"Demasiados intentos. Intenta de nuevo en {math.ceil(espera / 60)} minuto(s)."
+            headers = {"Retry-After": str(espera)}
+            if scope["path"] == "/login":
+                respuesta = templates.TemplateResponse(Request(scope), "index.html", {"error": mensaje},
+                                                       status_code=429, headers=headers)
+            else:
+                respuesta = PlainTextResponse(mensaje, status_code=429, headers=headers)
+            return await respuesta(scope, receive, send)
+
+        enviado = False
+
+        async def reenviar():
+            nonlocal enviado
+            if not enviado:
+                enviado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            return await receive()
+
+        await self.app(scope, reenviar, send)
\ No newline at end of file
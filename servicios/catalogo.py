@@ -0,0 +1,74 @@
+import os
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import cache_compartido
+
+# Nombres con los que cada materia puede estar guardada en la tabla areas
+MATERIAS_BD = {
+    "matematicas": ["Matemáticas", "Matematicas", "MATEMÁTICAS"],
+    "ingles": ["Inglés", "Ingles", "INGLÉS", "English"],
+    "sociales": ["Ciencias Sociales", "Sociales y Ciudadanas", "Sociales"],
+    "lectura": ["Lectura Crítica", "Lectura Critica"],
+    "ciencias": ["Ciencias Naturales", "Ciencias"]
+}
+
+CATALOGO_TTL = int(os.getenv("CATALOGO_TTL", "600"))
+
+logger = logging.getLogger("preparicfes.catalogo")
+
+class CatalogoError(RuntimeError):
+    """El catálogo de la BD no coincide con la configuración de materias"""
+
+def numero_grado(grado) -> int:
+    """Convierte el grado del token a número"""
+    return int(grado)
+
+def resolver_areas(por_nombre: dict[str, int], estricto: bool = True) -> dict[str, int]:
+    """Slug de materia -> id de área, probando los alias de MATERIAS_BD.
+
+    Con estricto, una materia sin área es un CatalogoError; si no, se avisa en
+    el log y esa materia queda fuera (sus rutas responden 404).
+    """
+    areas = {}
+    for materia, nombres in MATERIAS_BD.items():
+        area_id = next((por_nombre[n] for n in nombres if n in por_nombre), None)
+        if area_id is None:
+            mensaje = f"La materia '{materia}' no tiene área en la BD (alias probados: {', '.join(nombres)})"
+            if estricto:
+                raise CatalogoError(mensaje)
+            logger.warning(mensaje)
+            continue
+        areas[materia] = area_id
+    return areas
+
+async def cargar_catalogo(session: AsyncSession, estricto: bool = False) -> dict:
+    """Lee areas y grado en dos consultas y resuelve los alias de MATERIAS_BD.
+
+    Solo el arranque lo llama con estricto: ahí conviene fallar enseguida. Las
+    recargas (TTL, o la primera petición en Vercel) no tiran todas las rutas
+    por una fila de areas mal escrita.
+    """
+    por_nombre = {nombre: id_ for id_, nombre in
+                  (await session.execute(text("SELECT id, nombre_materia FROM areas"))).fetchall()}
+    grados = {int(numero): id_ for id_, numero in
+              (await session.execute(text("SELECT id, numero_grado FROM grado"))).fetchall()}
+
+    catalogo = {"areas": resolver_areas(por_nombre, estricto), "grados": grados}
+    cache_compartido.guardar("catalogo", "ids", catalogo, CATALOGO_TTL)
+    return catalogo
+
+def invalidar_catalogo():
+    """Obliga a recargar el catálogo en la próxima consulta"""
+    cache_compartido.invalidar("catalogo")
+
+async def _vigente(session: AsyncSession) -> dict:
+    return cache_compartido.obtener("catalogo", "ids") or await cargar_catalogo(session)
+
+async def obtener_area_id(session: AsyncSession, materia: str) -> int | None:
+    """ID del área para el slug de la materia"""
+    return (await _vigente(session))["areas"].get(materia)
+
+async def obtener_grado_id(session: AsyncSession, grado) -> int | None:
+    """ID del grado para el número de grado del usuario"""
+    return (await _vigente(session))["grados"].get(numero_grado(grado))
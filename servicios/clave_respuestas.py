@@ -0,0 +1,63 @@
+import os
+import hmac
+import time
+import hashlib
+import threading
+from sqlalchemy import text, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from configuracion import ajustes
+
+CLAVE_TTL = int(os.getenv("CLAVE_RESPUESTAS_TTL", "3600"))
+
+_lock = threading.Lock()
+# id de pregunta -> (id_areas, id_grado, opción correcta normalizada o "" si no tiene)
+_clave: dict[int, tuple[int, int, str]] = {}
+_desde = time.monotonic()
+
+def normalizar_opcion(opcion) -> str:
+    return opcion.strip().upper() if isinstance(opcion, str) else ""
+
+def firmar_examen(area_id: int, grado_id: int, ids) -> str:
+    """Firma del conjunto de preguntas de un examen entregado (HMAC con SECRET_KEY).
+
+    Viaja con el examen y vuelve con las respuestas: sin ella no se puede
+    calificar un subconjunto elegido por el cliente.
+    """
+    mensaje = f"{area_id}:{grado_id}:{','.join(map(str, sorted(ids)))}".encode()
+    return hmac.new(ajustes.secret_key.encode(), mensaje, hashlib.sha256).hexdigest()[:32]
+
+def examen_firmado(firma, area_id: int, grado_id: int, ids) -> bool:
+    """Si las preguntas son exactamente las de un examen entregado para ese área y grado"""
+    return isinstance(firma, str) and hmac.compare_digest(firma, firmar_examen(area_id, grado_id, ids))
+
+def registrar_clave(filas):
+    """Agrega a la clave preguntas ya leídas de la BD (con columnas id, id_areas, id_grado y respuesta_correcta)"""
+    with _lock:
+        _clave.update({f.id: (f.id_areas, f.id_grado, normalizar_opcion(f.respuesta_correcta)) for f in filas})
+
+def invalidar_clave(ids: list[int] | None = None):
+    """Olvida la respuesta de esas preguntas (o de todas) para releerla al calificar"""
+    global _desde
+    with _lock:
+        if ids is None:
+            _clave.clear()
+            _desde = time.monotonic()
+        else:
+            for i in ids:
+                _clave.pop(i, None)
+
+async def obtener_clave(session: AsyncSession, ids: list[int]) -> dict[int, tuple[int, int, str]]:
+    """(área, grado, respuesta correcta) de esas preguntas; solo consulta las que no estén en memoria.
+
+    Las preguntas que no existen no aparecen en el resultado.
+    """
+    if time.monotonic() - _desde > CLAVE_TTL:
+        invalidar_clave()
+    faltantes = [i for i in set(ids) if i not in _clave]
+    if faltantes:
+        registrar_clave((await session.execute(
+            text("SELECT id, id_areas, id_grado, respuesta_correcta FROM preguntas WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": faltantes}
+        )).fetchall())
+    return {i: _clave[i] for i in ids if i in _clave}
\ No newline at end of file
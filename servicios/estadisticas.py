@@ -0,0 +1,250 @@
+"""Estadísticas y ranking por grado y área, mantenidos de forma incremental.
+
+guardar_intentos suma cada resultado a dos tablas resumen (sql/0004_estadisticas.sql):
+- estadisticas_area: intentos y suma de puntajes por (grado, área, tramo de
+  10 puntos), de donde salen el total, el promedio y el histograma.
+- mejores_resultados: el mejor puntaje de cada estudiante por (grado, área),
+  de donde sale el ranking.
+
+Cada proceso guarda en memoria un Tablero por (grado, área) con esos datos y
+el top TOP_N, así que las rutas responden sin consultar la BD. Los resultados
+guardados por este proceso se aplican al tablero al hacer commit; los de
+otros workers se ven al recargarlo (cada ESTADISTICAS_TTL segundos).
+Reconstruir las tablas desde resultados: python -m servicios.estadisticas
+"""
+import os
+import time
+import threading
+from sqlalchemy import text, event, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TRAMOS = 10
+TOP_N = int(os.getenv("ESTADISTICAS_TOP_N", "20"))
+ESTADISTICAS_TTL = int(os.getenv("ESTADISTICAS_TTL", "60"))
+
+UPSERT_AREA = """
+    INSERT INTO estadisticas_area (id_grado, id_areas, tramo, intentos, suma_puntajes)
+    VALUES (:id_grado, :id_areas, :tramo, :intentos, :suma_puntajes)
+    ON CONFLICT (id_grado, id_areas, tramo) DO UPDATE
+    SET intentos = estadisticas_area.intentos + EXCLUDED.intentos,
+        suma_puntajes = estadisticas_area.suma_puntajes + EXCLUDED.suma_puntajes
+"""
+
+UPSERT_MEJOR = """
+    INSERT INTO mejores_resultados (id_grado, id_areas, id_estudiantes, puntaje_final, fecha)
+    VALUES (:id_grado, :id_areas, :id_estudiantes, :puntaje_final, :fecha)
+    ON CONFLICT (id_grado, id_areas, id_estudiantes) DO UPDATE
+    SET puntaje_final = EXCLUDED.puntaje_final, fecha = EXCLUDED.fecha
+    WHERE EXCLUDED.puntaje_final > mejores_resultados.puntaje_final
+"""
+
+# Resta los resultados de un estudiante antes de borrarlos (eliminar cuenta)
+RESTAR_ESTUDIANTE = """
+    UPDATE estadisticas_area SET intentos = estadisticas_area.intentos - d.intentos,
+                                 suma_puntajes = estadisticas_area.suma_puntajes - d.suma
+    FROM (SELECT r.id_grado, r.id_areas, {tramo} AS tramo, COUNT(*) AS intentos,
+                 SUM(r.puntaje_final) AS suma
+          FROM resultados r
+          WHERE r.id_estudiantes = :id
+          GROUP BY r.id_grado, r.id_areas, {tramo}) d
+    WHERE estadisticas_area.id_grado = d.id_grado AND estadisticas_area.id_areas = d.id_areas
+      AND estadisticas_area.tramo = d.tramo
+"""
+
+_TRAMO_SQL = f"CASE WHEN r.puntaje_final >= 100 THEN {TRAMOS - 1} ELSE r.puntaje_final / 10 END"
+
+BACKFILL = [
+    "DELETE FROM estadisticas_area",
+    "DELETE FROM mejores_resultados",
+    f"""
+    INSERT INTO estadisticas_area (id_grado, id_areas, tramo, intentos, suma_puntajes)
+    SELECT r.id_grado, r.id_areas, {_TRAMO_SQL}, COUNT(*), SUM(r.puntaje_final)
+    FROM resultados r
+    GROUP BY r.id_grado, r.id_areas, {_TRAMO_SQL}
+    """,
+    """
+    INSERT INTO mejores_resultados (id_grado, id_areas, id_estudiantes, puntaje_final, fecha)
+    SELECT id_grado, id_areas, id_estudiantes, puntaje_final, fecha FROM (
+        SELECT r.id_grado, r.id_areas, r.id_estudiantes, r.puntaje_final, r.fecha,
+               ROW_NUMBER() OVER (PARTITION BY r.id_grado, r.id_areas, r.id_estudiantes
+                                  ORDER BY r.puntaje_final DESC, r.fecha) AS rn
+        FROM resultados r
+    ) r
+    WHERE rn = 1
+    """,
+]
+
+def tramo(puntaje: int) -> int:
+    """Tramo del histograma: 0-9 -> 0, ..., 90-100 -> 9"""
+    return min(max(puntaje, 0) // 10, TRAMOS - 1)
+
+def enmascarar(email: str | None) -> str:
+    """Nombre para el ranking sin exponer el correo completo"""
+    usuario = (email or "").split("@")[0]
+    return f"{usuario[:2]}***" if usuario else "***"
+
+class Tablero:
+    """Total, suma, histograma y top TOP_N de un (grado, área)"""
+
+    def __init__(self):
+        self.histograma = [0] * TRAMOS
+        self.suma = 0
+        # (puntaje, fecha, id del usuario, nombre) ordenado de mejor a peor
+        self.mejores: list[tuple] = []
+        self.cargado = time.monotonic()
+
+    @property
+    def intentos(self) -> int:
+        return sum(self.histograma)
+
+    def necesita_nombre(self, user_id: int, puntaje: int) -> bool:
+        """Si sumar ese puntaje agregaría al top a alguien que no estaba"""
+        if any(m[2] == user_id for m in self.mejores):
+            return False
+        return len(self.mejores) < TOP_N or puntaje > self.mejores[-1][0]
+
+    def sumar(self, user_id: int, puntaje: int, fecha, nombre: str | None):
+        self.histograma[tramo(puntaje)] += 1
+        self.suma += puntaje
+        actual = next((m for m in self.mejores if m[2] == user_id), None)
+        if actual is not None:
+            if puntaje <= actual[0]:
+                return
+            self.mejores.remove(actual)
+            nombre = actual[3]
+        elif len(self.mejores) >= TOP_N and puntaje <= self.mejores[-1][0]:
+            return
+        # Como el mejor puntaje de un estudiante solo sube, quien sale del top no hace falta recordarlo
+        self.mejores.append((puntaje, fecha, user_id, nombre))
+        self.mejores.sort(key=lambda m: (-m[0], m[1]))
+        del self.mejores[TOP_N:]
+
+_tableros: dict[tuple[int, int], Tablero] = {}
+_lock = threading.Lock()
+
+async def _cargar(session: AsyncSession, grado_id: int, area_id: int) -> Tablero:
+    tablero = Tablero()
+    params = {"g": grado_id, "a": area_id}
+    for tramo_, intentos, suma in (await session.execute(text("""
+        SELECT tramo, intentos, suma_puntajes FROM estadisticas_area
+        WHERE id_grado = :g AND id_areas = :a
+    """), params)).fetchall():
+        tablero.histograma[tramo_] = intentos
+        tablero.suma += suma
+    filas = (await session.execute(text("""
+        SELECT u.id, m.puntaje_final, m.fecha, u.email
+        FROM mejores_resultados m
+        JOIN estudiantes e ON e.id = m.id_estudiantes
+        JOIN usuarios u ON u.id = e.id_usuario
+        WHERE m.id_grado = :g AND m.id_areas = :a
+        ORDER BY m.puntaje_final DESC, m.fecha
+        LIMIT :n
+    """).columns(fecha=DateTime), {**params, "n": TOP_N})).fetchall()
+    tablero.mejores = [(puntaje, fecha, user_id, enmascarar(email)) for user_id, puntaje, fecha, email in filas]
+    return tablero
+
+async def obtener_tablero(session: AsyncSession, grado_id: int, area_id: int) -> Tablero:
+    """Tablero en memoria; lo carga (dos consultas pequeñas) si no está o venció"""
+    tablero = _tableros.get((grado_id, area_id))
+    if tablero is None or time.monotonic() - tablero.cargado > ESTADISTICAS_TTL:
+        tablero = await _cargar(session, grado_id, area_id)
+        with _lock:
+            _tableros[(grado_id, area_id)] = tablero
+    return tablero
+
+def _al_commit(sync_session):
+    pendientes = sync_session.info.pop("estadisticas", [])
+    with _lock:
+        for grado_id, area_id, user_id, puntaje, fecha, nombre in pendientes:
+            if (tablero := _tableros.get((grado_id, area_id))) is None:
+                continue
+            if nombre is None and tablero.necesita_nombre(user_id, puntaje):
+                # El tablero se cargó o cambió después de buscar el nombre: que se relea de la BD
+                del _tableros[(grado_id, area_id)]
+            else:
+                tablero.sumar(user_id, puntaje, fecha, nombre)
+
+def _al_rollback(sync_session):
+    sync_session.info.pop("estadisticas", None)
+
+def _pendientes(session: AsyncSession) -> list:
+    """Resultados a aplicar a los tableros cuando la transacción haga commit"""
+    sync_session = session.sync_session
+    if "estadisticas" not in sync_session.info:
+        if not event.contains(sync_session, "after_commit", _al_commit):
+            event.listen(sync_session, "after_commit", _al_commit)
+            event.listen(sync_session, "after_rollback", _al_rollback)
+        sync_session.info["estadisticas"] = []
+    return sync_session.info["estadisticas"]
+
+def _entra_al_top(grado_id: int, area_id: int, puntaje: int) -> bool:
+    tablero = _tableros.get((grado_id, area_id))
+    return tablero is not None and (len(tablero.mejores) < TOP_N or puntaje > tablero.mejores[-1][0])
+
+async def actualizar_estadisticas(session: AsyncSession, user_id: int, est_id: int, grado_id: int,
+                                  filas: list[dict]):
+    """Suma los resultados recién insertados a las tablas resumen (y al tablero al hacer commit)"""
+    if not filas:
+        return
+    por_tramo, mejores = {}, {}
+    for f in filas:
+        clave = (f["id_areas"], tramo(f["puntaje_final"]))
+        intentos, suma = por_tramo.get(clave, (0, 0))
+        por_tramo[clave] = (intentos + 1, suma + f["puntaje_final"])
+        if f["id_areas"] not in mejores or f["puntaje_final"] > mejores[f["id_areas"]]["puntaje_final"]:
+            mejores[f["id_areas"]] = f
+
+    await session.execute(text(UPSERT_AREA), [
+        {"id_grado": grado_id, "id_areas": area, "tramo": t, "intentos": n, "suma_puntajes": s}
+        for (area, t), (n, s) in por_tramo.items()
+    ])
+    await session.execute(text(UPSERT_MEJOR), [
+        {"id_grado": grado_id, "id_areas": area, "id_estudiantes": est_id,
+         "puntaje_final": f["puntaje_final"], "fecha": f["fecha"]} for area, f in mejores.items()
+    ])
+
+    # El nombre solo hace falta si entra al top de un tablero ya cargado
+    nombre = None
+    if any(_entra_al_top(grado_id, area, f["puntaje_final"]) for area, f in mejores.items()):
+        nombre = enmascarar((await session.execute(text("SELECT email FROM usuarios WHERE id = :id"),
+                                                   {"id": user_id})).scalar())
+    _pendientes(session).extend((grado_id, f["id_areas"], user_id, f["puntaje_final"], f["fecha"], nombre)
+                                for f in filas)
+
+async def restar_estudiante(session: AsyncSession, est_id: int):
+    """Quita de las tablas resumen los resultados de un estudiante (antes de borrarlos)"""
+    await session.execute(text(RESTAR_ESTUDIANTE.format(tramo=_TRAMO_SQL)), {"id": est_id})
+    await session.execute(text("DELETE FROM mejores_resultados WHERE id_estudiantes = :id"), {"id": est_id})
+
+def invalidar_estadisticas():
+    """Obliga a recargar todos los tableros desde la BD"""
+    with _lock:
+        _tableros.clear()
+
+def resumen(tablero: Tablero) -> dict:
+    """Total, promedio e histograma de un tablero"""
+    intentos = tablero.intentos
+    return {
+        "intentos": intentos,
+        "promedio": round(tablero.suma / intentos, 2) if intentos else None,
+        "histograma": [{"desde": t * 10, "hasta": 100 if t == TRAMOS - 1 else t * 10 + 9, "intentos": n}
+                       for t, n in enumerate(tablero.histograma)],
+    }
+
+def ranking(tablero: Tablero, user_id: int | None = None, limite: int = TOP_N) -> list[dict]:
+    """Top del tablero; marca al usuario user_id si aparece"""
+    return [{"posicion": i + 1, "nombre": nombre, "puntaje": puntaje, "fecha": fecha,
+             "es_usted": usuario == user_id}
+            for i, (puntaje, fecha, usuario, nombre) in enumerate(tablero.mejores[:limite])]
+
+def backfill(engine):
+    """Reconstruye estadisticas_area y mejores_resultados desde todo el historial"""
+    with engine.begin() as conn:
+        for sentencia in BACKFILL:
+            conn.execute(text(sentencia))
+    invalidar_estadisticas()
+
+if __name__ == "__main__":
+    from db import engine
+    backfill(engine)
+    print("✅ estadisticas_area y mejores_resultados reconstruidas")
@@ -0,0 +1,91 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from configuracion import ajustes
+from esquemas import Examen
+from servicios.muestreo import cargar_pool, preguntas_por_ids, invalidar_pool
+from servicios.clave_respuestas import registrar_clave, invalidar_clave, firmar_examen
+
+EXAMENES_POR_GRUPO = int(os.getenv("EXAMENES_POR_GRUPO", "200"))
+EXAMENES_ROTACION = int(os.getenv("EXAMENES_ROTACION", "900"))
+# Generar todo al arrancar; en Vercel cada arranque en frío lo pagaría, así que se hace al primer uso
+EXAMENES_AL_ARRANCAR = os.getenv("EXAMENES_AL_ARRANCAR", "0" if ajustes.vercel else "1") == "1"
+PREGUNTAS_POR_EXAMEN = 6
+ULTIMOS_TAMANO = 100_000
+
+_lock = threading.Lock()
+# (area_id, grado_id) -> (exámenes ya serializados a JSON, momento de generación)
+_grupos: dict[tuple[int, int], tuple[list[bytes], float]] = {}
+# Regeneraciones en segundo plano en curso (se guarda la tarea para que no la recoja el GC)
+_rotando: dict[tuple[int, int], asyncio.Task] = {}
+# (user_id, area_id, grado_id) -> índice del último examen entregado
+_ultimos: OrderedDict[tuple, int] = OrderedDict()
+_rng = random.SystemRandom()
+
+def _serializar(filas: list, area_id: int, grado_id: int) -> bytes:
+    firma = firmar_examen(area_id, grado_id, [f.id for f in filas])
+    return Examen.de_filas(filas, firma).model_dump_json().encode()
+
+async def generar_examenes(session: AsyncSession, area_id: int, grado_id: int) -> list[bytes]:
+    """Arma EXAMENES_POR_GRUPO exámenes al azar con dos consultas y los deja en memoria"""
+    ids = await cargar_pool(session, area_id, grado_id)
+    elegidos = [_rng.sample(ids, min(PREGUNTAS_POR_EXAMEN, len(ids)))
+                for _ in range(EXAMENES_POR_GRUPO)] if ids else [[]]
+    filas = await preguntas_por_ids(session, list({i for e in elegidos for i in e}))
+    registrar_clave(filas)
+    por_id = {f[0]: f for f in filas}
+    examenes = [_serializar([por_id[i] for i in e if i in por_id], area_id, grado_id) for e in elegidos]
+    with _lock:
+        _grupos[(area_id, grado_id)] = (examenes, time.monotonic())
+    return examenes
+
+async def generar_todos(session: AsyncSession, areas, grados):
+    """Genera los exámenes de todas las combinaciones de área y grado"""
+    for area_id in areas:
+        for grado_id in grados:
+            await generar_examenes(session, area_id, grado_id)
+
+async def _rotar(clave: tuple[int, int]):
+    from db import AsyncSessionLocal
+    try:
+        async with AsyncSessionLocal() as session:
+            await generar_examenes(session, *clave)
+    finally:
+        _rotando.pop(clave, None)
+
+def invalidar_examenes(area_id: int | None = None, grado_id: int | None = None):
+    """Descarta exámenes, pools y la clave de respuestas (llamar cuando cambia el banco de preguntas)"""
+    invalidar_pool(area_id, grado_id)
+    invalidar_clave()
+    with _lock:
+        for clave in list(_grupos):
+            if area_id in (None, clave[0]) and grado_id in (None, clave[1]):
+                del _grupos[clave]
+
+async def obtener_examen(session: AsyncSession, user_id: int, area_id: int, grado_id: int) -> bytes:
+    """JSON de un examen para el estudiante, distinto del último que recibió en esa área.
+
+    Los exámenes vencidos se siguen entregando mientras se regeneran en segundo plano.
+    """
+    clave = (area_id, grado_id)
+    if (grupo := _grupos.get(clave)) is None:
+        examenes = await generar_examenes(session, area_id, grado_id)
+    else:
+        examenes = grupo[0]
+        if time.monotonic() - grupo[1] > EXAMENES_ROTACION and clave not in _rotando:
+            _rotando[clave] = asyncio.create_task(_rotar(clave))
+
+    clave_usuario = (user_id, area_id, grado_id)
+    indice = _rng.randrange(len(examenes))
+    with _lock:
+        if len(examenes) > 1 and _ultimos.get(clave_usuario) == indice:
+            indice = (indice + 1) % len(examenes)
+        _ultimos[clave_usuario] = indice
+        _ultimos.move_to_end(clave_usuario)
+        if len(_ultimos) > ULTIMOS_TAMANO:
+            _ultimos.popitem(last=False)
+    return examenes[indice]
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""Exportación de resultados (con estudiante, área y grado) en CSV o Parquet.
+
+Las filas se leen con un cursor del lado del servidor y se escriben por
+bloques, así que la memoria no crece con el tamaño de la exportación.
+
+Uso: python -m servicios.exportacion --formato csv --salida resultados.csv [--grado 11]
+     [--materia matematicas] [--desde 2025-01-01] [--hasta 2025-12-31]
+Parquet solo se ofrece si está instalado pyarrow (pip install pyarrow).
+"""
+import io
+import csv
+import sys
+import argparse
+from functools import cache
+from datetime import datetime, date
+from sqlalchemy import text, DateTime
+from servicios.catalogo import MATERIAS_BD
+
+FILAS_POR_BLOQUE = 5000
+COLUMNAS = ("id_resultado", "email", "grado", "materia", "fecha", "puntaje")
+
+class ExportacionInvalida(ValueError):
+    """Filtros o formato de exportación no válidos"""
+
+def consulta(grado: int | None = None, materia: str | None = None,
+             desde: date | None = None, hasta: date | None = None):
+    """SELECT de resultados con sus uniones y los filtros pedidos"""
+    condiciones, params = [], {}
+    if grado is not None:
+        condiciones.append("g.numero_grado = :grado")
+        params["grado"] = grado
+    if materia is not None:
+        if materia not in MATERIAS_BD:
+            raise ExportacionInvalida(f"Materia desconocida: {materia}")
+        condiciones.append("a.nombre_materia IN ({})".format(
+            ", ".join(f":materia{i}" for i in range(len(MATERIAS_BD[materia])))))
+        params.update({f"materia{i}": n for i, n in enumerate(MATERIAS_BD[materia])})
+    if desde is not None:
+        condiciones.append("r.fecha >= :desde")
+        params["desde"] = datetime.combine(desde, datetime.min.time())
+    if hasta is not None:
+        condiciones.append("r.fecha <= :hasta")
+        params["hasta"] = datetime.combine(hasta, datetime.max.time())
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    sql = text(f"""
+        SELECT r.id, u.email, g.numero_grado, a.nombre_materia, r.fecha, r.puntaje_final
+        FROM resultados r
+        JOIN estudiantes e ON e.id = r.id_estudiantes
+        JOIN usuarios u ON u.id = e.id_usuario
+        JOIN areas a ON a.id = r.id_areas
+        JOIN grado g ON g.id = r.id_grado
+        {where}
+        ORDER BY r.id
+    """).columns(fecha=DateTime)
+    return sql, params
+
+class EscritorCSV:
+    media_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+
+    def _vaciar(self) -> bytes:
+        datos = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return datos
+
+    def inicio(self) -> bytes:
+        # BOM para que Excel reconozca UTF-8 (tildes en materias y correos)
+        self._csv.writerow(COLUMNAS)
+        return b"\xef\xbb\xbf" + self._vaciar()
+
+    def bloque(self, filas) -> bytes:
+        self._csv.writerows(filas)
+        return self._vaciar()
+
+    def fin(self) -> bytes:
+        return b""
+
+class _Sumidero(io.RawIOBase):
+    """Archivo de solo escritura que acumula lo escrito hasta que se vacía"""
+
+    def __init__(self):
+        self._datos = bytearray()
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._datos += datos
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def vaciar(self) -> bytes:
+        datos = bytes(self._datos)
+        self._datos.clear()
+        return datos
+
+class EscritorParquet:
+    """Un row group por bloque; el pie del archivo se escribe al final"""
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportacionInvalida("Parquet necesita pyarrow instalado")
+        self._pa = pa
+        self._esquema = pa.schema([("id_resultado", pa.int64()), ("email", pa.string()),
+                                   ("grado", pa.int32()), ("materia", pa.string()),
+                                   ("fecha", pa.timestamp("us")), ("puntaje", pa.int32())])
+        self._salida = _Sumidero()
+        self._writer = pq.ParquetWriter(self._salida, self._esquema, compression="zstd")
+
+    def inicio(self) -> bytes:
+        return self._salida.vaciar()
+
+    def bloque(self, filas) -> bytes:
+        columnas = list(zip(*filas)) or [[] for _ in COLUMNAS]
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(c, type=campo.type) for c, campo in zip(columnas, self._esquema)],
+            schema=self._esquema))
+        return self._salida.vaciar()
+
+    def fin(self) -> bytes:
+        self._writer.close()
+        return self._salida.vaciar()
+
+@cache
+def escritores() -> dict:
+    """formato -> escritor, solo con los que se pueden usar (Parquet si hay pyarrow)"""
+    disponibles = {"csv": EscritorCSV}
+    try:
+        import pyarrow.parquet  # noqa: F401
+        disponibles["parquet"] = EscritorParquet
+    except ImportError:
+        pass
+    return disponibles
+
+def crear_escritor(formato: str):
+    if formato not in escritores():
+        raise ExportacionInvalida(f"Formato no soportado: {formato} "
+                                  f"(disponibles: {', '.join(escritores())})")
+    return escritores()[formato]()
+
+def exportar(conn, escritor, filtros: dict, tamano: int = FILAS_POR_BLOQUE):
+    """Genera los bytes de la exportación con una conexión síncrona"""
+    sql, params = consulta(**filtros)
+    yield escritor.inicio()
+    resultado = conn.execution_options(stream_results=True, yield_per=tamano).execute(sql, params)
+    for filas in resultado.partitions():
+        yield escritor.bloque(filas)
+    yield escritor.fin()
+
+async def exportar_async(async_engine, escritor, filtros: dict, tamano: int = FILAS_POR_BLOQUE):
+    """Igual que exportar() pero con el engine asíncrono, para StreamingResponse"""
+    sql, params = consulta(**filtros)
+    yield escritor.inicio()
+    async with async_engine.connect() as conn:
+        resultado = await conn.stream(sql.execution_options(yield_per=tamano), params)
+        async for filas in resultado.partitions():
+            yield escritor.bloque(filas)
+    yield escritor.fin()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formato", choices=list(escritores()), default="csv")
+    parser.add_argument("--salida", help="archivo de salida (por defecto, stdout)")
+    parser.add_argument("--grado", type=int)
+    parser.add_argument("--materia", choices=list(MATERIAS_BD))
+    parser.add_argument("--desde", type=date.fromisoformat)
+    parser.add_argument("--hasta", type=date.fromisoformat)
+    parser.add_argument("--bloque", type=int, default=FILAS_POR_BLOQUE, help="filas por bloque")
+    args = parser.parse_args()
+
+    from db import engine
+    filtros = {"grado": args.grado, "materia": args.materia, "desde": args.desde, "hasta": args.hasta}
+    salida = open(args.salida, "wb") if args.salida else sys.stdout.buffer
+    try:
+        with engine.connect() as conn:
+            for datos in exportar(conn, crear_escritor(args.formato), filtros, args.bloque):
+                salida.write(datos)
+    finally:
+        if args.salida:
+            salida.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
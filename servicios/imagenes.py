@@ -0,0 +1,232 @@
+"""Imágenes de las preguntas redimensionadas y en formatos modernos.
+
+preguntas.imagen puede ser una URL http(s), una URL del sitio bajo /static/
+(lo que antes iba directo al <img src>) o una ruta dentro de
+IMAGENES_PREGUNTAS_DIR. Para esas la API de preguntas devuelve URLs
+/imagenes/preguntas/{id}/{version}/{ancho}.{formato} (ver url y srcset), y
+cada variante se genera la primera vez que se pide y queda en una caché LRU
+en disco limitada a IMAGENES_CACHE_MB. Cualquier otro valor (ver resoluble)
+se sigue enviando tal cual.
+
+version es un hash de preguntas.imagen, así que si la imagen de una pregunta
+cambia, cambia la URL y las variantes se pueden cachear para siempre.
+Necesita Pillow, que se importa al generar la primera variante.
+"""
+import io
+import os
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+from functools import cache
+from collections import OrderedDict
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from estaticos import ESTATICOS_DIR
+
+IMAGENES_DIR = os.getenv("IMAGENES_PREGUNTAS_DIR", os.path.join("static", "preguntas"))
+CACHE_DIR = os.getenv("IMAGENES_CACHE_DIR", os.path.join(tempfile.gettempdir(), "preparicfes-imagenes"))
+CACHE_BYTES = int(os.getenv("IMAGENES_CACHE_MB", "512")) * 1024 * 1024
+MAX_ORIGINAL = 20 * 1024 * 1024
+# Solo estos anchos, para que no se pueda llenar la caché pidiendo anchos arbitrarios
+ANCHOS = (320, 480, 640, 960, 1280)
+ANCHO_DEFECTO = 640
+CALIDAD = {"avif": 55, "webp": 80, "jpeg": 82}
+TIPOS = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+OPCIONES = {"webp": {"method": 4}, "jpeg": {"optimize": True, "progressive": True}}
+
+class ImagenNoDisponible(LookupError):
+    """La pregunta no tiene esa imagen o no se pudo leer el original"""
+
+def _dentro(base: str, relativa: str) -> str | None:
+    """Ruta del archivo si existe y no se sale de base"""
+    base = os.path.realpath(base)
+    ruta = os.path.realpath(os.path.join(base, relativa))
+    return ruta if os.path.commonpath((base, ruta)) == base and os.path.isfile(ruta) else None
+
+def ruta_local(imagen: str) -> str | None:
+    """Archivo en disco de una imagen /static/... o relativa a IMAGENES_DIR"""
+    if imagen.startswith("/static/"):
+        # Lo que el navegador pedía al montaje /static
+        return _dentro(ESTATICOS_DIR, imagen.removeprefix("/static/"))
+    if imagen.startswith(("/", "http://", "https://")) or ":" in imagen.split("/")[0]:
+        return None
+    return _dentro(IMAGENES_DIR, imagen)
+
+def resoluble(imagen: str) -> bool:
+    """Si el servicio puede generar variantes de esa imagen"""
+    return imagen.startswith(("http://", "https://")) or ruta_local(imagen) is not None
+
+def version(imagen: str) -> str:
+    return hashlib.blake2b(imagen.encode(), digest_size=6).hexdigest()
+
+def url(pregunta_id: int, imagen: str, ancho: int = ANCHO_DEFECTO, formato: str = "webp") -> str:
+    return f"/imagenes/preguntas/{pregunta_id}/{version(imagen)}/{ancho}.{formato}"
+
+def srcset(pregunta_id: int, imagen: str, formato: str = "webp") -> str:
+    """Valor para el atributo srcset con todos los ANCHOS"""
+    return ", ".join(f"{url(pregunta_id, imagen, a, formato)} {a}w" for a in ANCHOS)
+
+@cache
+def formatos() -> tuple[str, ...]:
+    """Formatos que puede codificar el Pillow instalado"""
+    from PIL import features
+    return tuple(f for f in TIPOS if f == "jpeg" or features.check(f))
+
+class CacheDisco:
+    """LRU de archivos en un directorio, limitada en bytes.
+
+    El orden sale del mtime (se actualiza en cada uso, como mucho una vez por
+    minuto), así que sobrevive a reinicios y lo comparten los workers que
+    usan el mismo directorio.
+    """
+
+    def __init__(self, directorio: str, max_bytes: int):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._archivos: OrderedDict[str, list] = OrderedDict()  # nombre -> [bytes, último uso]
+        self._total = 0
+        self._cargado = False
+
+    def _cargar(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        entradas = []
+        for entrada in os.scandir(self.directorio):
+            if entrada.is_file() and not entrada.name.endswith(".tmp"):
+                stat = entrada.stat()
+                entradas.append((stat.st_mtime, entrada.name, stat.st_size))
+        for mtime, nombre, tamano in sorted(entradas):
+            self._archivos[nombre] = [tamano, mtime]
+            self._total += tamano
+        self._cargado = True
+
+    def ruta(self, nombre: str) -> str | None:
+        """Ruta del archivo si está en caché (y lo marca como usado)"""
+        with self._lock:
+            if not self._cargado:
+                self._cargar()
+            if (entrada := self._archivos.get(nombre)) is None:
+                return None
+            self._archivos.move_to_end(nombre)
+            ruta = os.path.join(self.directorio, nombre)
+            if (ahora := time.time()) - entrada[1] > 60:
+                entrada[1] = ahora
+                try:
+                    os.utime(ruta)
+                except FileNotFoundError:
+                    # Lo borró otro worker al hacer espacio
+                    self._total -= self._archivos.pop(nombre)[0]
+                    return None
+            return ruta
+
+    def guardar(self, nombre: str, datos: bytes) -> str:
+        ruta = os.path.join(self.directorio, nombre)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, ruta)
+        with self._lock:
+            if not self._cargado:
+                self._cargar()
+            if nombre in self._archivos:
+                self._total -= self._archivos[nombre][0]
+            self._archivos[nombre] = [len(datos), time.time()]
+            self._total += len(datos)
+            while self._total > self.max_bytes and len(self._archivos) > 1:
+                viejo, (tamano, _) = self._archivos.popitem(last=False)
+                self._total -= tamano
+                try:
+                    os.remove(os.path.join(self.directorio, viejo))
+                except FileNotFoundError:
+                    pass
+        return ruta
+
+cache_disco = CacheDisco(CACHE_DIR, CACHE_BYTES)
+_generando: dict[str, asyncio.Task] = {}
+
+def _leer_original(imagen: str) -> bytes:
+    nombre = f"original-{hashlib.blake2b(imagen.encode(), digest_size=16).hexdigest()}"
+    if ruta := cache_disco.ruta(nombre):
+        with open(ruta, "rb") as f:
+            return f.read()
+
+    if imagen.startswith(("http://", "https://")):
+        import httpx
+        try:
+            with httpx.stream("GET", imagen, timeout=15, follow_redirects=True) as r:
+                r.raise_for_status()
+                datos = bytearray()
+                for bloque in r.iter_bytes():
+                    datos += bloque
+                    if len(datos) > MAX_ORIGINAL:
+                        raise ImagenNoDisponible("La imagen original es demasiado grande")
+        except httpx.HTTPError as e:
+            raise ImagenNoDisponible(f"No se pudo descargar la imagen: {e}")
+        datos = bytes(datos)
+    else:
+        if (ruta := ruta_local(imagen)) is None:
+            raise ImagenNoDisponible("Imagen no encontrada")
+        if os.path.getsize(ruta) > MAX_ORIGINAL:
+            raise ImagenNoDisponible("La imagen original es demasiado grande")
+        with open(ruta, "rb") as f:
+            return f.read()
+    # Las remotas se guardan para no descargarlas otra vez por cada variante
+    cache_disco.guardar(nombre, datos)
+    return datos
+
+def redimensionar(original: bytes, ancho: int, formato: str) -> bytes:
+    """Variante de la imagen de a lo sumo `ancho` px (nunca la agranda)"""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+    try:
+        imagen = Image.open(io.BytesIO(original))
+        # En JPEG decodifica directamente a una escala menor (mucho más rápido)
+        imagen.draft("RGB", (ancho, ancho))
+        imagen = ImageOps.exif_transpose(imagen)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ImagenNoDisponible(f"Imagen inválida: {e}")
+    transparente = imagen.mode in ("RGBA", "LA", "PA") or "transparency" in imagen.info
+    if transparente and formato == "jpeg":
+        # JPEG no tiene transparencia: se pone sobre fondo blanco
+        rgba = imagen.convert("RGBA")
+        imagen = Image.new("RGB", imagen.size, "white")
+        imagen.paste(rgba, mask=rgba.getchannel("A"))
+    elif imagen.mode not in ("RGB", "RGBA"):
+        imagen = imagen.convert("RGBA" if transparente else "RGB")
+    if imagen.width > ancho:
+        imagen = imagen.resize((ancho, max(1, round(imagen.height * ancho / imagen.width))), Image.LANCZOS)
+
+    salida = io.BytesIO()
+    imagen.save(salida, format=formato.upper(), quality=CALIDAD[formato], **OPCIONES.get(formato, {}))
+    return salida.getvalue()
+
+def _generar(nombre: str, imagen: str, ancho: int, formato: str) -> str:
+    return cache_disco.guardar(nombre, redimensionar(_leer_original(imagen), ancho, formato))
+
+async def _imagen_de(session: AsyncSession, pregunta_id: int) -> str | None:
+    return (await session.execute(text("SELECT imagen FROM preguntas WHERE id = :id"),
+                                  {"id": pregunta_id})).scalar()
+
+async def obtener_variante(session: AsyncSession, pregunta_id: int, version_: str,
+                           ancho: int, formato: str) -> tuple[str, str]:
+    """(ruta en disco, ETag) de la variante; la genera si no está en caché"""
+    if ancho not in ANCHOS or formato not in TIPOS:
+        raise ImagenNoDisponible("Variante no soportada")
+    nombre = f"{pregunta_id}-{version_}-{ancho}.{formato}"
+    etag = f'"{pregunta_id}-{version_}-{ancho}-{formato}"'
+    if ruta := cache_disco.ruta(nombre):
+        return ruta, etag
+
+    if formato not in formatos():
+        raise ImagenNoDisponible("Formato no soportado en este servidor")
+    imagen = await _imagen_de(session, pregunta_id)
+    if not imagen or version(imagen) != version_:
+        raise ImagenNoDisponible("Imagen no encontrada")
+
+    # Varias peticiones de la misma variante esperan a una sola generación
+    if (tarea := _generando.get(nombre)) is None:
+        tarea = _generando[nombre] = asyncio.create_task(
+            asyncio.to_thread(_generar, nombre, imagen, ancho, formato))
+        tarea.add_done_callback(lambda _: _generando.pop(nombre, None))
+    return await asyncio.shield(tarea), etag
@@ -0,0 +1,281 @@
+"""Importación masiva del banco de preguntas desde CSV, JSON o JSON Lines.
+
+Cada fila necesita enunciado, opcion_a..opcion_d, respuesta_correcta (A-D),
+materia (slug o cualquier alias de MATERIAS_BD, sin importar tildes ni
+mayúsculas) y grado (número); imagen es opcional. Las filas se validan por
+lotes a medida que se leen y se cargan con COPY en Postgres (INSERT
+multi-fila en otros motores), todo en una sola transacción. El JSON (un
+arreglo, o un objeto con el arreglo en "preguntas") también se lee por
+partes, así que la memoria no crece con el tamaño del archivo.
+
+Uso: python -m servicios.importacion banco.csv [--formato csv|json|jsonl] [--lote 5000]
+     [--solo-validar] [--estricto] [--rechazadas rechazadas.csv]
+"""
+import io
+import csv
+import sys
+import json
+import time
+import argparse
+import unicodedata
+from sqlalchemy import text, insert, MetaData, Table, Column, Integer, String, Text
+from servicios.catalogo import MATERIAS_BD, resolver_areas
+from servicios.examenes import invalidar_examenes
+
+FILAS_POR_LOTE = 5000
+MAX_ERRORES_REPORTE = 100
+COLUMNAS = ("enunciado", "opcion_a", "opcion_b", "opcion_c", "opcion_d",
+            "imagen", "respuesta_correcta", "id_areas", "id_grado")
+COPY_SQL = f"COPY preguntas ({', '.join(COLUMNAS)}) FROM STDIN"
+
+_metadata = MetaData()
+preguntas_t = Table("preguntas", _metadata, Column("id", Integer, primary_key=True),
+                    *(Column(c, Text) for c in COLUMNAS[:6]), Column("respuesta_correcta", String(1)),
+                    Column("id_areas", Integer), Column("id_grado", Integer))
+
+class FilaInvalida(ValueError):
+    """Una fila del banco no se puede importar"""
+
+def _normalizar(nombre: str) -> str:
+    sin_tildes = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode()
+    return " ".join(sin_tildes.lower().split())
+
+# Nombre normalizado (slug o alias) -> slug de la materia
+ALIAS = {_normalizar(n): materia for materia, nombres in MATERIAS_BD.items() for n in (materia, *nombres)}
+
+class _LectorJSON:
+    """Lee valores JSON de un archivo de texto por bloques, sin cargarlo entero"""
+
+    def __init__(self, archivo, tamano: int = 64 * 1024):
+        self.archivo = archivo
+        self.tamano = tamano
+        self.buffer = ""
+        self.pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _leer_mas(self) -> bool:
+        datos = self.archivo.read(self.tamano)
+        if not datos:
+            return False
+        self.buffer = self.buffer[self.pos:] + datos
+        self.pos = 0
+        return True
+
+    def siguiente(self) -> str:
+        """Próximo carácter que no es espacio (sin consumirlo); "" al final del archivo"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._leer_mas():
+                return ""
+
+    def consumir(self, esperado: str):
+        if (encontrado := self.siguiente()) != esperado:
+            raise ValueError(f"JSON inválido: se esperaba {esperado!r} y llegó {encontrado or 'el final'!r}")
+        self.pos += 1
+
+    def valor(self):
+        self.siguiente()
+        while True:
+            try:
+                valor, fin = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Puede ser un valor cortado por el bloque: se lee más y se reintenta
+                if self._leer_mas():
+                    continue
+                raise ValueError(f"JSON inválido: {e}") from None
+            # Un número al final del bloque podría seguir en el siguiente
+            if fin == len(self.buffer) and self._leer_mas():
+                continue
+            self.pos = fin
+            return valor
+
+    def arreglo(self):
+        self.consumir("[")
+        if self.siguiente() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.valor()
+            if self.siguiente() != ",":
+                self.consumir("]")
+                return
+            self.pos += 1
+
+def leer_json(archivo):
+    """Preguntas de un arreglo JSON o de la clave "preguntas" de un objeto, una a la vez"""
+    lector = _LectorJSON(archivo)
+    if lector.siguiente() == "[":
+        yield from lector.arreglo()
+    else:
+        lector.consumir("{")
+        encontrado = False
+        while lector.siguiente() != "}":
+            clave = lector.valor()
+            lector.consumir(":")
+            if clave == "preguntas" and lector.siguiente() == "[":
+                encontrado = True
+                yield from lector.arreglo()
+            else:
+                lector.valor()
+            if lector.siguiente() != ",":
+                break
+            lector.pos += 1
+        lector.consumir("}")
+        if not encontrado:
+            raise ValueError('El JSON no tiene el arreglo "preguntas"')
+    if lector.siguiente():
+        raise ValueError("JSON inválido: hay datos después del final")
+
+def leer_filas(archivo, formato: str):
+    """(número de línea o posición, dict | None) por cada pregunta del archivo de texto"""
+    if formato == "csv":
+        yield from enumerate(csv.DictReader(archivo), start=2)
+    elif formato == "jsonl":
+        for numero, linea in enumerate(archivo, start=1):
+            if linea.strip():
+                try:
+                    yield numero, json.loads(linea)
+                except json.JSONDecodeError:
+                    yield numero, None
+    elif formato == "json":
+        yield from enumerate(leer_json(archivo), start=1)
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+
+def _texto(fila: dict, campo: str, obligatorio: bool = True) -> str | None:
+    valor = fila.get(campo)
+    valor = str(valor).strip() if valor is not None else ""
+    if not valor and obligatorio:
+        raise FilaInvalida(f"falta {campo}")
+    return valor or None
+
+def validar_fila(fila, areas: dict[str, int], grados: dict[int, int]) -> tuple:
+    """Fila lista para insertar (en el orden de COLUMNAS) o FilaInvalida con el motivo"""
+    if fila is None:
+        raise FilaInvalida("JSON inválido")
+    if not isinstance(fila, dict):
+        raise FilaInvalida("no es un objeto con los campos de la pregunta")
+    fila = {str(k).strip().lower(): v for k, v in fila.items() if k is not None}
+    respuesta = _texto(fila, "respuesta_correcta").upper()
+    if respuesta not in ("A", "B", "C", "D"):
+        raise FilaInvalida(f"respuesta_correcta inválida: {respuesta}")
+    materia = ALIAS.get(_normalizar(_texto(fila, "materia")))
+    if materia is None:
+        raise FilaInvalida(f"materia desconocida: {fila['materia']}")
+    if materia not in areas:
+        raise FilaInvalida(f"la materia {materia} no tiene área en la BD")
+    try:
+        grado_id = grados[int(_texto(fila, "grado"))]
+    except (ValueError, KeyError):
+        raise FilaInvalida(f"grado desconocido: {fila['grado']}")
+    return (_texto(fila, "enunciado"), _texto(fila, "opcion_a"), _texto(fila, "opcion_b"),
+            _texto(fila, "opcion_c"), _texto(fila, "opcion_d"), _texto(fila, "imagen", False),
+            respuesta, areas[materia], grado_id)
+
+def _cargar_lote(conn, filas: list[tuple]):
+    if conn.dialect.name != "postgresql":
+        conn.execute(insert(preguntas_t), [dict(zip(COLUMNAS, f)) for f in filas])
+        return
+    cursor = conn.connection.cursor()
+    if hasattr(cursor, "copy"):
+        # psycopg 3
+        with cursor.copy(COPY_SQL) as copy:
+            for fila in filas:
+                copy.write_row(fila)
+    else:
+        # psycopg2: las celdas vacías sin comillas llegan como NULL en formato csv
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(filas)
+        buffer.seek(0)
+        cursor.copy_expert(f"{COPY_SQL} WITH (FORMAT csv)", buffer)
+
+def importar(engine, archivo, formato: str, lote: int = FILAS_POR_LOTE, solo_validar: bool = False,
+             estricto: bool = False, rechazadas=None) -> dict:
+    """Valida e inserta el banco en una transacción y devuelve el reporte.
+
+    Con estricto, una sola fila rechazada cancela toda la importación.
+    rechazadas puede ser un csv.writer que recibe (línea, motivo) de cada fila rechazada.
+    """
+    inicio = time.perf_counter()
+    reporte = {"leidas": 0, "validas": 0, "rechazadas": 0, "importadas": 0, "errores": []}
+    with engine.connect() as conn:
+        with conn.begin() as transaccion:
+            por_nombre = dict(conn.execute(text("SELECT nombre_materia, id FROM areas")).fetchall())
+            areas = resolver_areas(por_nombre, estricto=False)
+            grados = {int(n): id_ for id_, n in conn.execute(text("SELECT id, numero_grado FROM grado")).fetchall()}
+
+            pendientes = []
+            for numero, fila in leer_filas(archivo, formato):
+                reporte["leidas"] += 1
+                try:
+                    pendientes.append(validar_fila(fila, areas, grados))
+                except FilaInvalida as e:
+                    reporte["rechazadas"] += 1
+                    if len(reporte["errores"]) < MAX_ERRORES_REPORTE:
+                        reporte["errores"].append({"linea": numero, "motivo": str(e)})
+                    if rechazadas is not None:
+                        rechazadas.writerow((numero, str(e)))
+                    continue
+                if len(pendientes) >= lote:
+                    if not solo_validar:
+                        _cargar_lote(conn, pendientes)
+                    reporte["validas"] += len(pendientes)
+                    pendientes = []
+            if pendientes and not solo_validar:
+                _cargar_lote(conn, pendientes)
+            reporte["validas"] += len(pendientes)
+
+            if solo_validar or (estricto and reporte["rechazadas"]):
+                transaccion.rollback()
+            else:
+                reporte["importadas"] = reporte["validas"]
+
+    if reporte["importadas"]:
+        invalidar_examenes()
+    reporte["segundos"] = round(time.perf_counter() - inicio, 3)
+    reporte["filas_s"] = round(reporte["leidas"] / reporte["segundos"]) if reporte["segundos"] else None
+    return reporte
+
+FORMATOS = ("csv", "json", "jsonl")
+EXTENSIONES = {"csv": "csv", "json": "json", "jsonl": "jsonl", "ndjson": "jsonl"}
+
+def formato_de(nombre: str) -> str | None:
+    """Formato según la extensión del archivo (None si no es una conocida)"""
+    return EXTENSIONES.get(nombre.rsplit(".", 1)[-1].lower()) if "." in nombre else None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archivo")
+    parser.add_argument("--formato", choices=FORMATOS)
+    parser.add_argument("--lote", type=int, default=FILAS_POR_LOTE)
+    parser.add_argument("--solo-validar", action="store_true", help="valida sin insertar nada")
+    parser.add_argument("--estricto", action="store_true", help="no importa nada si hay filas rechazadas")
+    parser.add_argument("--rechazadas", help="CSV con la línea y el motivo de cada fila rechazada")
+    args = parser.parse_args()
+
+    if (formato := args.formato or formato_de(args.archivo)) is None:
+        parser.error(f"No se reconoce la extensión de {args.archivo}; use --formato")
+    from db import engine
+    salida = open(args.rechazadas, "w", newline="", encoding="utf-8") if args.rechazadas else None
+    try:
+        rechazadas = csv.writer(salida) if salida else None
+        if rechazadas:
+            rechazadas.writerow(("linea", "motivo"))
+        with open(args.archivo, encoding="utf-8-sig", newline="") as archivo:
+            reporte = importar(engine, archivo, formato, args.lote,
+                               args.solo_validar, args.estricto, rechazadas)
+    finally:
+        if salida:
+            salida.close()
+
+    print(f"Leídas {reporte['leidas']}, válidas {reporte['validas']}, importadas {reporte['importadas']}, "
+          f"rechazadas {reporte['rechazadas']} en {reporte['segundos']} s ({reporte['filas_s']} filas/s)")
+    for error in reporte["errores"][:20]:
+        print(f"  línea {error['linea']}: {error['motivo']}")
+    sys.exit(1 if args.estricto and reporte["rechazadas"] else 0)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
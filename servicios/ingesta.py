@@ -0,0 +1,116 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import text, insert, MetaData, Table, Column, Integer, String, Boolean, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from servicios.catalogo import MATERIAS_BD, obtener_area_id, obtener_grado_id
+from servicios.resumen_resultados import actualizar_ultimos
+from servicios.estadisticas import actualizar_estadisticas
+from servicios.clave_respuestas import obtener_clave, normalizar_opcion, examen_firmado
+
+# Los intentos del lote pueden haberse hecho sin conexión, pero no en el futuro
+# (más allá del desfase de un reloj) ni hace más de INTENTOS_MAX_DIAS
+TOLERANCIA_FUTURO = timedelta(minutes=5)
+ANTIGUEDAD_MAXIMA = timedelta(days=int(os.getenv("INTENTOS_MAX_DIAS", "30")))
+
+_metadata = MetaData()
+resultados_t = Table("resultados", _metadata, Column("id", Integer, primary_key=True),
+                     Column("id_estudiantes", Integer), Column("id_areas", Integer),
+                     Column("fecha", DateTime), Column("puntaje_final", Integer), Column("id_grado", Integer))
+respuestas_t = Table("respuestas", _metadata, Column("id", Integer, primary_key=True),
+                     Column("id_resultado", Integer), Column("id_pregunta", Integer),
+                     Column("respuesta", String(1)), Column("correcta", Boolean))
+
+class IntentoInvalido(ValueError):
+    """Un intento del payload no se puede guardar"""
+
+def _opcion(valor) -> str | None:
+    """Opción marcada (A-D) en mayúscula, o None si la dejó en blanco"""
+    opcion = normalizar_opcion(valor)
+    if len(opcion) > 1:
+        raise ValueError(f"Opción inválida: {valor!r}")
+    return opcion or None
+
+def calificar(respuestas: list[dict], clave: dict[int, tuple[int, int, str]]) -> tuple[int, int, float]:
+    """Marca cada respuesta como correcta o no según la clave y devuelve (correctas, total, puntaje de 0 a 100)"""
+    correctas = 0
+    for r in respuestas:
+        r["correcta"] = r["respuesta"] is not None and r["respuesta"] == clave[r["id_pregunta"]][2]
+        correctas += r["correcta"]
+    total = len(respuestas)
+    return correctas, total, (correctas / total) * 100 if total > 0 else 0
+
+async def obtener_estudiante(session: AsyncSession, usuario: dict) -> tuple[int, int]:
+    """(id, id_grado) del estudiante del usuario; lo crea si no existe, en una sola consulta.
+
+    El grado queda en el del token, con el que se califica: si el usuario cambió
+    de grado, sus resultados nuevos cuentan en el grado nuevo.
+    """
+    return tuple((await session.execute(text("""
+        INSERT INTO estudiantes (id_usuario, id_grado) VALUES (:u, :g)
+        ON CONFLICT (id_usuario) DO UPDATE SET id_grado = EXCLUDED.id_grado
+        RETURNING id, id_grado
+    """), {"u": usuario["user_id"], "g": await obtener_grado_id(session, usuario["grado"])})).one())
+
+async def guardar_intentos(session: AsyncSession, usuario: dict, intentos: list[dict]) -> list[dict]:
+    """Califica y guarda varios intentos con sus respuestas en la transacción actual.
+
+    Son seis sentencias sin importar cuántos intentos lleguen: el upsert del
+    estudiante, un INSERT multi-fila en resultados, otro en respuestas y los
+    upserts de ultimos_resultados, estadisticas_area y mejores_resultados.
+    """
+    validados = []
+    for i, intento in enumerate(intentos):
+        materia, respuestas = intento.get("materia"), intento.get("respuestas") or []
+        if materia not in MATERIAS_BD or not respuestas:
+            raise IntentoInvalido(f"Intento {i}: datos incompletos")
+        ahora = datetime.now()
+        try:
+            fecha = datetime.fromisoformat(intento["fecha"]) if intento.get("fecha") else ahora
+            if fecha.tzinfo:
+                # Se guarda en hora local sin zona, como datetime.now()
+                fecha = fecha.astimezone().replace(tzinfo=None)
+            detalle = [{"id_pregunta": int(r["pregunta_id"]), "respuesta": _opcion(r.get("respuesta"))}
+                       for r in respuestas]
+        except (TypeError, ValueError, AttributeError, KeyError, OverflowError):
+            raise IntentoInvalido(f"Intento {i}: formato inválido")
+        if not ahora - ANTIGUEDAD_MAXIMA <= fecha <= ahora + TOLERANCIA_FUTURO:
+            raise IntentoInvalido(f"Intento {i}: fecha fuera de rango")
+        validados.append((materia, fecha, detalle, intento.get("examen")))
+
+    # La calificación se hace aquí; lo que diga el cliente sobre "correcta" se ignora.
+    # Solo cuentan las preguntas de un examen entregado, todas y sin repetir
+    clave = await obtener_clave(session, [r["id_pregunta"] for _, _, d, _ in validados for r in d])
+    grado_usuario = await obtener_grado_id(session, usuario["grado"])
+    filas, calificados = [], []
+    for i, (materia, fecha, detalle, firma) in enumerate(validados):
+        if (area_id := await obtener_area_id(session, materia)) is None:
+            raise IntentoInvalido(f"Intento {i}: materia sin área en la BD")
+        ids = [r["id_pregunta"] for r in detalle]
+        if len(set(ids)) != len(ids):
+            raise IntentoInvalido(f"Intento {i}: preguntas repetidas")
+        if any(i_ not in clave for i_ in ids):
+            raise IntentoInvalido(f"Intento {i}: pregunta inexistente")
+        if any(clave[i_][:2] != (area_id, grado_usuario) for i_ in ids):
+            raise IntentoInvalido(f"Intento {i}: pregunta de otra materia o grado")
+        if not examen_firmado(firma, area_id, grado_usuario, ids):
+            raise IntentoInvalido(f"Intento {i}: las preguntas no son las del examen entregado")
+        correctas, total, puntaje = calificar(detalle, clave)
+        filas.append({"id_areas": area_id, "id_grado": grado_usuario, "fecha": fecha,
+                      "puntaje_final": int(puntaje)})
+        calificados.append((detalle, {"correctas": correctas, "total": total,
+                                      "puntaje": round(puntaje, 2)}))
+
+    est_id, _ = await obtener_estudiante(session, usuario)
+    ids = (await session.execute(
+        insert(resultados_t).returning(resultados_t.c.id, sort_by_parameter_order=True),
+        [{**f, "id_estudiantes": est_id} for f in filas]
+    )).scalars().all()
+
+    detalle = [{**r, "id_resultado": id_resultado}
+               for id_resultado, (respuestas, _) in zip(ids, calificados) for r in respuestas]
+    if detalle:
+        await session.execute(insert(respuestas_t), detalle)
+    await actualizar_ultimos(session, est_id, filas)
+    await actualizar_estadisticas(session, usuario["user_id"], est_id, grado_usuario, filas)
+
+    return [resumen for _, resumen in calificados]
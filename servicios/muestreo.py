@@ -0,0 +1,55 @@
+import os
+import random
+from sqlalchemy import text, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+import cache_compartido
+
+POOL_TTL = int(os.getenv("POOL_PREGUNTAS_TTL", "300"))
+
+COLUMNAS_PREGUNTA = """id, enunciado, opcion_a, opcion_b, opcion_c, opcion_d,
+                   imagen, respuesta_correcta, id_areas, id_grado"""
+
+_rng = random.SystemRandom()
+
+async def cargar_pool(session: AsyncSession, area_id: int, grado_id: int) -> list[int]:
+    """Lee los ids de las preguntas de un área y grado (usa solo el índice)"""
+    ids = (await session.execute(text("""
+        SELECT id FROM preguntas WHERE id_areas = :area AND id_grado = :grado
+    """), {"area": area_id, "grado": grado_id})).scalars().all()
+    cache_compartido.guardar("pool", f"{area_id}:{grado_id}", ids, POOL_TTL)
+    return ids
+
+def invalidar_pool(area_id: int | None = None, grado_id: int | None = None):
+    """Descarta los pools afectados para que se recarguen al siguiente uso"""
+    if area_id is None:
+        cache_compartido.invalidar("pool")
+    else:
+        cache_compartido.invalidar("pool", f"{area_id}:" if grado_id is None else f"{area_id}:{grado_id}")
+
+async def obtener_pool(session: AsyncSession, area_id: int, grado_id: int) -> list[int]:
+    """Pool de ids vigente, recargándolo si venció el TTL"""
+    ids = cache_compartido.obtener("pool", f"{area_id}:{grado_id}")
+    if ids is None:
+        return await cargar_pool(session, area_id, grado_id)
+    return ids
+
+async def muestrear_ids(session: AsyncSession, area_id: int, grado_id: int, k: int = 6) -> list[int]:
+    """Elige k ids distintos al azar en O(k)"""
+    ids = await obtener_pool(session, area_id, grado_id)
+    return _rng.sample(ids, min(k, len(ids)))
+
+async def preguntas_por_ids(session: AsyncSession, ids: list[int]) -> list:
+    """Trae las preguntas por clave primaria, conservando el orden de ids"""
+    if not ids:
+        return []
+    filas = (await session.execute(
+        text(f"SELECT {COLUMNAS_PREGUNTA} FROM preguntas WHERE id IN :ids")
+        .bindparams(bindparam("ids", expanding=True)),
+        {"ids": ids}
+    )).fetchall()
+    por_id = {f[0]: f for f in filas}
+    return [por_id[i] for i in ids if i in por_id]
+
+async def preguntas_aleatorias(session: AsyncSession, area_id: int, grado_id: int, k: int = 6) -> list:
+    """Devuelve k preguntas aleatorias de un área y grado"""
+    return await preguntas_por_ids(session, await muestrear_ids(session, area_id, grado_id, k))
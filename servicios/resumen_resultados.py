@@ -0,0 +1,55 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+UPSERT_ULTIMO = """
+    INSERT INTO ultimos_resultados (id_estudiantes, id_areas, puntaje_final, fecha)
+    VALUES (:id_estudiantes, :id_areas, :puntaje_final, :fecha)
+    ON CONFLICT (id_estudiantes, id_areas) DO UPDATE
+    SET puntaje_final = EXCLUDED.puntaje_final, fecha = EXCLUDED.fecha
+    WHERE EXCLUDED.fecha >= ultimos_resultados.fecha
+"""
+
+BACKFILL = """
+    INSERT INTO ultimos_resultados (id_estudiantes, id_areas, puntaje_final, fecha)
+    SELECT id_estudiantes, id_areas, puntaje_final, fecha FROM (
+        SELECT id_estudiantes, id_areas, puntaje_final, fecha,
+               ROW_NUMBER() OVER (PARTITION BY id_estudiantes, id_areas
+                                  ORDER BY fecha DESC, id DESC) AS rn
+        FROM resultados
+    ) r
+    WHERE rn = 1
+    ON CONFLICT (id_estudiantes, id_areas) DO UPDATE
+    SET puntaje_final = EXCLUDED.puntaje_final, fecha = EXCLUDED.fecha
+"""
+
+async def actualizar_ultimos(session: AsyncSession, est_id: int, filas: list[dict]):
+    """Actualiza el último resultado por área con los resultados recién insertados"""
+    ultimos = {}
+    for f in filas:
+        if f["id_areas"] not in ultimos or f["fecha"] >= ultimos[f["id_areas"]]["fecha"]:
+            ultimos[f["id_areas"]] = f
+    if ultimos:
+        await session.execute(text(UPSERT_ULTIMO), [
+            {"id_estudiantes": est_id, "id_areas": area, "puntaje_final": f["puntaje_final"],
+             "fecha": f["fecha"]} for area, f in ultimos.items()
+        ])
+
+async def obtener_ultimos(session: AsyncSession, user_id: int) -> list:
+    """(materia, puntaje) del último intento por área del usuario"""
+    return (await session.execute(text("""
+        SELECT a.nombre_materia, u.puntaje_final
+        FROM estudiantes e
+        JOIN ultimos_resultados u ON u.id_estudiantes = e.id
+        JOIN areas a ON a.id = u.id_areas
+        WHERE e.id_usuario = :id
+        ORDER BY a.nombre_materia
+    """), {"id": user_id})).fetchall()
+
+def backfill(engine) -> int:
+    """Reconstruye ultimos_resultados a partir de todo el historial de resultados"""
+    with engine.begin() as conn:
+        return conn.execute(text(BACKFILL)).rowcount
+
+if __name__ == "__main__":
+    from db import engine
+    print(f"✅ ultimos_resultados actualizado: {backfill(engine)} filas")
@@ -0,0 +1,47 @@
+-- Tablas principales. En las BD creadas antes de las migraciones ya existen
+-- (IF NOT EXISTS las deja como están); los índices que faltan van en 0005.
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id SERIAL PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    grado VARCHAR(5) NOT NULL,
+    fecha_registro TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS grado (
+    id SERIAL PRIMARY KEY,
+    numero_grado INTEGER NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS areas (
+    id SERIAL PRIMARY KEY,
+    nombre_materia VARCHAR(100) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS estudiantes (
+    id SERIAL PRIMARY KEY,
+    id_usuario INTEGER NOT NULL REFERENCES usuarios(id),
+    id_grado INTEGER NOT NULL REFERENCES grado(id)
+);
+
+CREATE TABLE IF NOT EXISTS preguntas (
+    id SERIAL PRIMARY KEY,
+    enunciado TEXT NOT NULL,
+    opcion_a TEXT NOT NULL,
+    opcion_b TEXT NOT NULL,
+    opcion_c TEXT NOT NULL,
+    opcion_d TEXT NOT NULL,
+    imagen TEXT,
+    respuesta_correcta VARCHAR(1) NOT NULL,
+    id_areas INTEGER NOT NULL REFERENCES areas(id),
+    id_grado INTEGER NOT NULL REFERENCES grado(id)
+);
+
+CREATE TABLE IF NOT EXISTS resultados (
+    id SERIAL PRIMARY KEY,
+    id_estudiantes INTEGER NOT NULL REFERENCES estudiantes(id),
+    id_areas INTEGER NOT NULL REFERENCES areas(id),
+    fecha TIMESTAMP NOT NULL,
+    puntaje_final INTEGER NOT NULL
+);
@@ -0,0 +1,12 @@
+-- Respuestas por pregunta de cada resultado
+CREATE TABLE IF NOT EXISTS respuestas (
+    id SERIAL PRIMARY KEY,
+    id_resultado INTEGER NOT NULL REFERENCES resultados(id) ON DELETE CASCADE,
+    id_pregunta INTEGER NOT NULL,
+    respuesta VARCHAR(1),
+    correcta BOOLEAN NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_respuestas_resultado ON respuestas (id_resultado);
+
+-- Un estudiante por usuario (lo necesita el INSERT ... ON CONFLICT de la ingesta)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_estudiantes_id_usuario ON estudiantes (id_usuario);
@@ -0,0 +1,12 @@
+-- Último resultado de cada estudiante por área, mantenido por guardar_intentos.
+-- Llenar con: python -m servicios.resumen_resultados
+CREATE TABLE IF NOT EXISTS ultimos_resultados (
+    id_estudiantes INTEGER NOT NULL REFERENCES estudiantes(id) ON DELETE CASCADE,
+    id_areas INTEGER NOT NULL REFERENCES areas(id),
+    puntaje_final INTEGER NOT NULL,
+    fecha TIMESTAMP NOT NULL,
+    PRIMARY KEY (id_estudiantes, id_areas)
+);
+
+CREATE INDEX IF NOT EXISTS idx_resultados_estudiante_area_fecha
+    ON resultados (id_estudiantes, id_areas, fecha DESC);
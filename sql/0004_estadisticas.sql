@@ -0,0 +1,25 @@
+-- Resúmenes para estadísticas y ranking por grado y área, mantenidos por guardar_intentos.
+-- Llenar (o reconstruir) con: python -m servicios.estadisticas
+
+-- Intentos y suma de puntajes por tramo de 10 puntos (0-9, ..., 90-100 en el tramo 9)
+CREATE TABLE IF NOT EXISTS estadisticas_area (
+    id_grado INTEGER NOT NULL REFERENCES grado(id),
+    id_areas INTEGER NOT NULL REFERENCES areas(id),
+    tramo SMALLINT NOT NULL CHECK (tramo BETWEEN 0 AND 9),
+    intentos INTEGER NOT NULL DEFAULT 0,
+    suma_puntajes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_grado, id_areas, tramo)
+);
+
+-- Mejor puntaje de cada estudiante por grado y área (el ranking)
+CREATE TABLE IF NOT EXISTS mejores_resultados (
+    id_grado INTEGER NOT NULL REFERENCES grado(id),
+    id_areas INTEGER NOT NULL REFERENCES areas(id),
+    id_estudiantes INTEGER NOT NULL REFERENCES estudiantes(id) ON DELETE CASCADE,
+    puntaje_final INTEGER NOT NULL,
+    fecha TIMESTAMP NOT NULL,
+    PRIMARY KEY (id_grado, id_areas, id_estudiantes)
+);
+
+CREATE INDEX IF NOT EXISTS idx_mejores_resultados_ranking
+    ON mejores_resultados (id_grado, id_areas, puntaje_final DESC, fecha);
@@ -0,0 +1,12 @@
+-- Índices de las búsquedas frecuentes que no tenían uno.
+-- Revisar con: python -m benchmarks.planes_consultas
+
+-- Login, registro y editar usuario buscan por email; también evita cuentas duplicadas.
+-- Si falla por duplicados: SELECT email, COUNT(*) FROM usuarios GROUP BY email HAVING COUNT(*) > 1
+CREATE UNIQUE INDEX IF NOT EXISTS uq_usuarios_email ON usuarios (email);
+
+-- Pool de ids de muestreo.preguntas_aleatorias
+CREATE INDEX IF NOT EXISTS idx_preguntas_area_grado ON preguntas (id_areas, id_grado);
+
+-- Borrar los mejores resultados de un estudiante (eliminar cuenta y ON DELETE CASCADE)
+CREATE INDEX IF NOT EXISTS idx_mejores_resultados_estudiante ON mejores_resultados (id_estudiantes);
@@ -0,0 +1,7 @@
+-- Grado con el que se calificó cada resultado. Las estadísticas y el ranking
+-- se agrupan por él, así que no cambian si el estudiante cambia de grado.
+ALTER TABLE resultados ADD COLUMN IF NOT EXISTS id_grado INTEGER REFERENCES grado(id);
+
+-- Los resultados anteriores quedan con el grado actual de su estudiante
+UPDATE resultados SET id_grado = (SELECT e.id_grado FROM estudiantes e WHERE e.id = resultados.id_estudiantes)
+WHERE id_grado IS NULL;